@@ -10,6 +10,18 @@ def create_app():
     
     db.init_app(app)
     
+    from app.export_jobs import export_jobs
+    export_jobs.init_app(app)
+    
+    from app.cache import result_cache
+    result_cache.init_app(app)
+    
+    from app.events import notification_events
+    notification_events.init_app(app)
+    
+    from app.notifier import notification_dispatcher
+    notification_dispatcher.init_app(app)
+    
     # Register blueprints
     from app.auth import bp as auth_bp
     app.register_blueprint(auth_bp, url_prefix='/auth')
@@ -25,4 +37,6 @@ def create_app():
     
     return app
 
-from app import models
\ No newline at end of file
+from app import models
+from app import search  # Keeps the text search index in sync with users and stores
+from app import counters  # Keeps the dashboard counters in sync with reports, users, branches and regions
@@ -1,13 +1,37 @@
-from flask import render_template, request, redirect, url_for, session, flash, jsonify, send_file
+from flask import render_template, request, redirect, url_for, session, flash, jsonify, send_file, current_app
 from werkzeug.security import generate_password_hash
 from app.admin import bp
-from app.models import User, Area, Store, Report, Region, Branch, Notification, AuditLog, ReportComment, db
+from app.models import User, Area, Store, Report, Region, Branch, Notification, NotificationCounter, AuditLog, ReportComment, Vacation, db
+from app.models import user_areas, user_stores, user_regions, user_branches
+from app.export_jobs import export_jobs
+from app.governorates import get_governorate_resolver
+from app.search import matching_ids, normalize, remove_from_index
+from app.pagination import encode_report_cursor, decode_report_cursor, page_limit, after_cursor
+from app.cache import result_cache, bump_generation, REPORTS_NAMESPACE
+from app.events import stream_response, ADMINS_CHANNEL
+from app.notifier import notification_dispatcher
+from app.counters import get_counters, get_counter, adjust_counters, adjust_unread_notifications, refresh_counters, status_counter, REPORT_STATUSES, TOTAL_USERS, TOTAL_REPORTS, TOTAL_BRANCHES, TOTAL_REGIONS, UNREAD_REPORTS
 from functools import wraps
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
+from sqlalchemy.orm import contains_eager
 import pandas as pd
 import io
+import os
+import hashlib
+import json
+import itertools
+import tempfile
+import time
+from copy import copy
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from app.excel_styles import (
+    register_export_styles, report_main_header, report_header, summary_row,
+    AM_SPVR_COLOR, SALES_COLOR, PRODUCT_COLOR, ACTIVITIES_COLOR, VOD_RESULT_COLOR, BRIGHT_YELLOW,
+    REPORT_DATA, SUMMARY_TITLE, SUMMARY_HEADER, SUMMARY_DATE_HEADER, SUMMARY_SECTION_TITLE,
+    SUMMARY_STATUS_ACTIVE, SUMMARY_LABEL, SUMMARY_VALUE, SUMMARY_VALUE_VACATION, SUMMARY_VALUE_MISSING,
+    GRID_BLANK, GRID_VACATION_MARK
+)
 from openpyxl.utils import get_column_letter
 import pytz
 from zoneinfo import ZoneInfo
@@ -108,12 +132,8 @@ def admin_required(f):
 @bp.route('/dashboard')
 @admin_required
 def dashboard():
-    total_users = User.query.filter_by(is_admin=False).count()
-    total_reports = Report.query.count()
-    # Count unique branches by code (actual branches, not duplicates per supervisor)
-    total_branches = db.session.query(db.func.count(db.func.distinct(Branch.code))).scalar() or 0
-    # Count unique regions by name (actual regions, not duplicates per supervisor)
-    total_regions = db.session.query(db.func.count(db.func.distinct(Region.name))).scalar() or 0
+    # Precomputed totals (see app/counters.py)
+    counters = get_counters()
     
     # Recent reports with timezone conversion
     recent_reports_raw = Report.query.order_by(Report.created_at.desc()).limit(5).all()
@@ -124,10 +144,10 @@ def dashboard():
         recent_reports.append(report)
     
     return render_template('admin/dashboard.html', 
-                         total_users=total_users,
-                         total_reports=total_reports,
-                         total_branches=total_branches,
-                         total_regions=total_regions,
+                         total_users=counters[TOTAL_USERS],
+                         total_reports=counters[TOTAL_REPORTS],
+                         total_branches=counters[TOTAL_BRANCHES],
+                         total_regions=counters[TOTAL_REGIONS],
                          recent_reports=recent_reports,
                          utc_to_egypt_time=utc_to_egypt_time)
 
@@ -136,21 +156,16 @@ def dashboard():
 def get_dashboard_stats():
     """API endpoint to get real-time dashboard statistics"""
     try:
-        # Get fresh counts from database using COUNT queries
-        total_users = db.session.query(db.func.count(User.id)).filter(User.is_admin == False).scalar() or 0
-        total_reports = db.session.query(db.func.count(Report.id)).scalar() or 0
-        # Count unique branches by code (actual branches, not duplicates per supervisor)
-        total_branches = db.session.query(db.func.count(db.func.distinct(Branch.code))).scalar() or 0
-        # Count unique regions by name (actual regions, not duplicates per supervisor)
-        total_regions = db.session.query(db.func.count(db.func.distinct(Region.name))).scalar() or 0
+        # Precomputed totals, kept in step with every write (see app/counters.py)
+        counters = get_counters()
         
         return jsonify({
             'success': True,
             'stats': {
-                'total_users': total_users,
-                'total_reports': total_reports,
-                'total_branches': total_branches,
-                'total_regions': total_regions
+                'total_users': counters[TOTAL_USERS],
+                'total_reports': counters[TOTAL_REPORTS],
+                'total_branches': counters[TOTAL_BRANCHES],
+                'total_regions': counters[TOTAL_REGIONS]
             }
         })
     except Exception as e:
@@ -180,48 +195,91 @@ def admin_users():
 # USERS API - Clean and Simple
 # ============================================================================
 
+# Pagination settings for the users management API
+USERS_PAGE_SIZE = 50
+USERS_MAX_PAGE_SIZE = 200
+
+def _serialize_users_with_regions(users, owner_ids):
+    """Users with their owned regions and branches, from two bulk queries
+    
+    owner_ids selects the owners to load (a list of ids or a subquery).
+    """
+    regions_by_user = {}
+    regions_by_key = {}
+    for region in db.session.query(Region.id, Region.name, Region.owner_user_id).filter(
+        Region.owner_user_id.in_(owner_ids)
+    ).order_by(Region.id):
+        region_data = {'id': region.id, 'name': region.name, 'branches': []}
+        regions_by_user.setdefault(region.owner_user_id, []).append(region_data)
+        regions_by_key[(region.owner_user_id, region.id)] = region_data
+    
+    # Branches are listed under their region only when both have the same owner
+    for branch in db.session.query(
+        Branch.id, Branch.name, Branch.code, Branch.governorate, Branch.owner_user_id, Branch.region_id
+    ).filter(Branch.owner_user_id.in_(owner_ids), Branch.region_id.isnot(None)).order_by(Branch.id):
+        region_data = regions_by_key.get((branch.owner_user_id, branch.region_id))
+        if region_data is not None:
+            region_data['branches'].append({
+                'id': branch.id,
+                'name': branch.name,
+                'code': branch.code,
+                'governorate': branch.governorate
+            })
+    
+    return [{
+        'id': user.id,
+        'spvr_name': user.employee_name,
+        'spvr_code': user.employee_code,
+        'username': user.username,
+        'created_at': user.created_at.isoformat(),
+        'regions': regions_by_user.get(user.id, [])
+    } for user in users]
+
 @bp.route('/api/users', methods=['GET'])
 @admin_required
 def api_get_users():
-    """Get all non-admin users with their regions and branches"""
+    """Get non-admin users with their regions and branches
+    
+    Optional search matches the name, code or username. Without page the whole
+    roster is returned as a list; with page (1-based) and limit the response
+    is a page object with the total.
+    """
     try:
-        users = User.query.filter_by(is_admin=False).all()
-        users_data = []
+        query = db.session.query(User).filter(User.is_admin == False)
+        
+        search = request.args.get('search', '').strip()
+        if search:
+            query = query.filter(db.or_(
+                User.id.in_(matching_ids('employee_name', search)),
+                User.id.in_(matching_ids('employee_code', search)),
+                User.username.contains(search, autoescape=True)
+            ))
+        query = query.order_by(User.id)
+        
+        page = request.args.get('page')
+        if page is None:
+            users = query.all()
+            owner_ids = query.with_entities(User.id).order_by(None).scalar_subquery()
+            return jsonify(_serialize_users_with_regions(users, owner_ids))
         
-        for user in users:
-            # Get user's owned regions and branches
-            user_regions = Region.query.filter_by(owner_user_id=user.id).all()
-            regions_data = []
-            
-            for region in user_regions:
-                region_branches = Branch.query.filter_by(
-                    owner_user_id=user.id, 
-                    region_id=region.id
-                ).all()
-                
-                branches_data = [{
-                    'id': branch.id,
-                    'name': branch.name,
-                    'code': branch.code,
-                    'governorate': branch.governorate
-                } for branch in region_branches]
-                
-                regions_data.append({
-                    'id': region.id,
-                    'name': region.name,
-                    'branches': branches_data
-                })
-            
-            users_data.append({
-                'id': user.id,
-                'spvr_name': user.employee_name,
-                'spvr_code': user.employee_code,
-                'username': user.username,
-                'created_at': user.created_at.isoformat(),
-                'regions': regions_data
-            })
+        try:
+            page = max(1, int(page))
+            limit = int(request.args.get('limit', USERS_PAGE_SIZE))
+        except ValueError:
+            return jsonify({'success': False, 'message': 'Invalid page or limit'}), 400
+        limit = max(1, min(limit, USERS_MAX_PAGE_SIZE))
         
-        return jsonify(users_data)
+        total = query.with_entities(db.func.count(User.id)).order_by(None).scalar() or 0
+        users = query.offset((page - 1) * limit).limit(limit).all()
+        
+        return jsonify({
+            'success': True,
+            'users': _serialize_users_with_regions(users, [user.id for user in users]),
+            'total': total,
+            'page': page,
+            'limit': limit,
+            'has_more': page * limit < total
+        })
         
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
@@ -503,6 +561,75 @@ def api_update_user(user_id):
         db.session.rollback()
         return jsonify({'success': False, 'message': str(e)}), 500
 
+def _purge_user(user, delete_reports=False):
+    """Delete a user and everything that belongs to them with set-based statements
+    
+    Runs in the caller's transaction; the cost does not depend on how many rows
+    the user owns. Returns the number of deleted rows per kind.
+    """
+    user_id = user.id
+    deleted = {'reports': 0, 'branches': 0, 'regions': 0, 'vacations': 0, 'comments': 0}
+    counter_deltas = {}
+    
+    if delete_reports:
+        user_reports = db.select(Report.id).where(Report.user_id == user_id)
+        report_counts = db.session.query(Report.status, Report.is_read, db.func.count(Report.id)).filter(
+            Report.user_id == user_id
+        ).group_by(Report.status, Report.is_read).all()
+        
+        deleted['comments'] += ReportComment.query.filter(
+            ReportComment.report_id.in_(user_reports)
+        ).delete(synchronize_session=False)
+        # Notifications of other users keep existing without the report link
+        Notification.query.filter(Notification.related_report_id.in_(user_reports)).update(
+            {'related_report_id': None}, synchronize_session=False
+        )
+        deleted['reports'] = Report.query.filter(Report.user_id == user_id).delete(synchronize_session=False)
+        
+        counter_deltas[TOTAL_REPORTS] = -deleted['reports']
+        for status, is_read, count in report_counts:
+            counter_deltas[status_counter(status)] = counter_deltas.get(status_counter(status), 0) - count
+            if is_read == False:
+                counter_deltas[UNREAD_REPORTS] = counter_deltas.get(UNREAD_REPORTS, 0) - count
+    
+    # Owned branches and regions, with their associations; branches of other
+    # owners inside the user's regions become standalone
+    owned_branches = db.select(Branch.id).where(Branch.owner_user_id == user_id)
+    db.session.execute(user_branches.delete().where(user_branches.c.branch_id.in_(owned_branches)))
+    deleted['branches'] = Branch.query.filter(Branch.owner_user_id == user_id).delete(synchronize_session=False)
+    
+    owned_regions = db.select(Region.id).where(Region.owner_user_id == user_id)
+    Branch.query.filter(Branch.region_id.in_(owned_regions)).update({'region_id': None}, synchronize_session=False)
+    db.session.execute(user_regions.delete().where(user_regions.c.region_id.in_(owned_regions)))
+    deleted['regions'] = Region.query.filter(Region.owner_user_id == user_id).delete(synchronize_session=False)
+    
+    deleted['vacations'] = Vacation.query.filter(Vacation.user_id == user_id).delete(synchronize_session=False)
+    Notification.query.filter(Notification.user_id == user_id).delete(synchronize_session=False)
+    NotificationCounter.query.filter(NotificationCounter.user_id == user_id).delete(synchronize_session=False)
+    deleted['comments'] += ReportComment.query.filter(ReportComment.user_id == user_id).delete(synchronize_session=False)
+    AuditLog.query.filter(AuditLog.user_id == user_id).delete(synchronize_session=False)
+    
+    # Associations (backward compatibility)
+    for table in (user_areas, user_stores, user_regions, user_branches):
+        db.session.execute(table.delete().where(table.c.user_id == user_id))
+    
+    is_admin = user.is_admin
+    db.session.expunge(user)
+    User.query.filter(User.id == user_id).delete(synchronize_session=False)
+    
+    # Bulk statements bypass the ORM events: update the search index, the
+    # dashboard counters and the listing cache here
+    remove_from_index(User, [user_id])
+    if not is_admin:
+        counter_deltas[TOTAL_USERS] = -1
+    adjust_counters(counter_deltas)
+    if deleted['branches'] or deleted['regions']:
+        refresh_counters([TOTAL_BRANCHES, TOTAL_REGIONS])
+    if deleted['reports'] or deleted['comments']:
+        bump_generation(REPORTS_NAMESPACE)
+    
+    return deleted
+
 @bp.route('/api/users/<int:user_id>', methods=['DELETE'])
 @admin_required
 def api_delete_user(user_id):
@@ -528,60 +655,19 @@ def api_delete_user(user_id):
                 }), 400
         
         # Check if user has reports
-        reports_count = len(user.reports)
-        if reports_count > 0:
-            if force_delete:
-                # Delete all reports associated with this user
-                for report in user.reports:
-                    db.session.delete(report)
-            else:
-                # Return info about reports and force delete option
-                return jsonify({
-                    'success': False, 
-                    'message': f'Cannot delete user. User has {reports_count} report(s). Use force delete to remove user and all reports.',
-                    'reports_count': reports_count,
-                    'force_delete_required': True
-                }), 400
-        
-        # Delete user's branches first (due to foreign key constraints)
-        user_branches = Branch.query.filter_by(owner_user_id=user.id).all()
-        for branch in user_branches:
-            db.session.delete(branch)
-        
-        # Delete user's regions
-        user_regions = Region.query.filter_by(owner_user_id=user.id).all()
-        for region in user_regions:
-            db.session.delete(region)
+        reports_count = db.session.query(db.func.count(Report.id)).filter(Report.user_id == user.id).scalar() or 0
+        if reports_count > 0 and not force_delete:
+            # Return info about reports and force delete option
+            return jsonify({
+                'success': False, 
+                'message': f'Cannot delete user. User has {reports_count} report(s). Use force delete to remove user and all reports.',
+                'reports_count': reports_count,
+                'force_delete_required': True
+            }), 400
         
-        # Delete user's vacations (to avoid NOT NULL constraint error)
-        from app.models import Vacation
-        user_vacations = Vacation.query.filter_by(user_id=user.id).all()
-        for vacation in user_vacations:
-            db.session.delete(vacation)
-        
-        # Delete user's notifications (to avoid NOT NULL constraint error)
-        user_notifications = Notification.query.filter_by(user_id=user.id).all()
-        for notification in user_notifications:
-            db.session.delete(notification)
-        
-        # Delete user's comments (to avoid NOT NULL constraint error)
-        user_comments = ReportComment.query.filter_by(user_id=user.id).all()
-        for comment in user_comments:
-            db.session.delete(comment)
-        
-        # Delete user's audit logs (optional, but good for cleanup)
-        user_audit_logs = AuditLog.query.filter_by(user_id=user.id).all()
-        for audit_log in user_audit_logs:
-            db.session.delete(audit_log)
-        
-        # Clear any associations (backward compatibility)
-        user.assigned_areas.clear()
-        user.assigned_stores.clear()
-        user.assigned_regions.clear()
-        user.assigned_branches.clear()
-        
-        # Delete user
-        db.session.delete(user)
+        # Delete the user with their reports (when forced), regions, branches,
+        # vacations, notifications, comments and audit logs in one transaction
+        deleted = _purge_user(user, delete_reports=force_delete)
         db.session.commit()
         
         action_taken = "deleted"
@@ -591,10 +677,10 @@ def api_delete_user(user_id):
         return jsonify({
             'success': True,
             'message': f'User {action_taken} successfully',
-            'regions_deleted': len(user_regions),
-            'branches_deleted': len(user_branches),
-            'vacations_deleted': len(user_vacations),
-            'reports_deleted': reports_count if force_delete else 0
+            'regions_deleted': deleted['regions'],
+            'branches_deleted': deleted['branches'],
+            'vacations_deleted': deleted['vacations'],
+            'reports_deleted': deleted['reports']
         })
         
     except Exception as e:
@@ -673,58 +759,58 @@ def api_delete_report(report_id):
 @bp.route('/api/reports/delete-all', methods=['DELETE'])
 @admin_required
 def api_delete_all_reports():
-    """Delete all reports (with optional filters)"""
+    """Delete all reports (with optional filters)
+    
+    dry_run=true only counts the matching reports. Deletions larger than
+    REPORT_DELETE_SYNC_LIMIT run as a background job and return its handle.
+    """
     try:
-        # Get filter parameters (same as in api_reports)
-        employee_name = request.args.get('employee_name', '')
-        employee_code = request.args.get('employee_code', '')
-        store_name = request.args.get('store_name', '')
-        start_date = request.args.get('start_date', '')
-        end_date = request.args.get('end_date', '')
-        
-        print(f"🗑️ Delete all reports request received")
-        print(f"   Filters: employee_name={employee_name}, employee_code={employee_code}, store_name={store_name}")
-        print(f"   Date range: {start_date} to {end_date}")
-        
-        # Build query with same filters as api_reports
-        query = db.session.query(Report).join(User).join(Store).join(Area)
+        # Same filters as api_reports
+        report_query = ReportQuery.from_request(request.args)
+        filters = report_query.filters
+        dry_run = request.args.get('dry_run', '').lower() == 'true'
         
-        if employee_name:
-            query = query.filter(User.employee_name.contains(employee_name))
-        if employee_code:
-            query = query.filter(User.employee_code.contains(employee_code))
-        if store_name:
-            query = query.filter(Store.name.contains(store_name))
-        
-        # Date filtering
-        if start_date:
-            start_datetime = parse_date_filter(start_date, is_end_date=False)
-            if start_datetime:
-                query = query.filter(Report.report_date >= start_datetime)
-        
-        if end_date:
-            end_datetime = parse_date_filter(end_date, is_end_date=True)
-            if end_datetime:
-                query = query.filter(Report.report_date <= end_datetime)
+        print(f"🗑️ Delete all reports request received{' (dry run)' if dry_run else ''}")
+        print(f"   Filters: employee_name={filters['employee_name']}, employee_code={filters['employee_code']}, store_name={filters['store_name']}")
+        print(f"   Date range: {filters['start_date']} to {filters['end_date']}")
         
-        # Get all matching reports
-        reports_to_delete = query.all()
-        deleted_count = len(reports_to_delete)
+        matched_count = report_query.count()
+        print(f"   Found {matched_count} reports to delete")
         
-        print(f"   Found {deleted_count} reports to delete")
+        if dry_run:
+            return jsonify({
+                'success': True,
+                'dry_run': True,
+                'matched_count': matched_count
+            })
         
-        if deleted_count == 0:
+        if matched_count == 0:
             return jsonify({
                 'success': False,
                 'message': 'No reports found matching the criteria',
                 'deleted_count': 0
             }), 404
         
-        # Delete all matching reports
-        for report in reports_to_delete:
-            db.session.delete(report)
+        if matched_count > current_app.config['REPORT_DELETE_SYNC_LIMIT']:
+            job = export_jobs.submit(
+                _run_delete_job,
+                {'filters': filters, 'total': matched_count},
+                owner_id=session['user_id'],
+                filename=None,
+                kind='delete'
+            )
+            print(f"⏳ Deleting {matched_count} reports in background job {job['id']}")
+            
+            return jsonify({
+                'success': True,
+                'message': f'Deleting {matched_count} report(s) in the background',
+                'matched_count': matched_count,
+                'job_id': job['id'],
+                'status': job['status'],
+                'status_url': url_for('admin.api_get_delete_job', job_id=job['id'])
+            }), 202
         
-        db.session.commit()
+        deleted_count = _delete_reports_chunked(report_query, total=matched_count)
         
         print(f"✅ Successfully deleted {deleted_count} reports")
         
@@ -741,6 +827,80 @@ def api_delete_all_reports():
         db.session.rollback()
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@bp.route('/api/reports/delete-jobs/<job_id>', methods=['GET'])
+@admin_required
+def api_get_delete_job(job_id):
+    """Get the progress of a background report deletion"""
+    job = export_jobs.get(job_id, kind='delete')
+    if not job or job.get('owner_id') != session['user_id']:
+        return jsonify({'success': False, 'message': 'Delete job not found or expired'}), 404
+    
+    return jsonify({'success': True, 'job': {
+        'id': job['id'],
+        'status': job['status'],
+        'progress': job['progress'],
+        'deleted_count': job['processed'],
+        'total': job['total'],
+        'error': job['error']
+    }})
+
+
+def _delete_reports_chunked(report_query, progress=None, total=None):
+    """Delete the matching reports in id order, one chunk per transaction
+    
+    Each chunk removes the comments and notifications of its reports and the
+    reports themselves with three bulk statements, so rows are never loaded
+    into the session and locks are held only for one chunk. total is the
+    number of matching reports if the caller already counted them.
+    """
+    chunk_size = current_app.config['REPORT_DELETE_CHUNK_SIZE']
+    if total is None:
+        total = report_query.count()
+    ids_query = report_query.query().with_entities(Report.id).order_by(Report.id)
+    deleted_count = 0
+    last_id = 0
+    
+    while True:
+        report_ids = [row[0] for row in ids_query.filter(Report.id > last_id).limit(chunk_size).all()]
+        if not report_ids:
+            break
+        last_id = report_ids[-1]
+        
+        report_counts = db.session.query(Report.status, Report.is_read, db.func.count(Report.id)).filter(
+            Report.id.in_(report_ids)
+        ).group_by(Report.status, Report.is_read).all()
+        unread_notifications = db.session.query(Notification.user_id, db.func.count(Notification.id)).filter(
+            Notification.related_report_id.in_(report_ids),
+            Notification.is_read == False
+        ).group_by(Notification.user_id).all()
+        
+        ReportComment.query.filter(ReportComment.report_id.in_(report_ids)).delete(synchronize_session=False)
+        Notification.query.filter(Notification.related_report_id.in_(report_ids)).delete(synchronize_session=False)
+        chunk_deleted = Report.query.filter(Report.id.in_(report_ids)).delete(synchronize_session=False)
+        
+        # Bulk statements bypass the flush events (see app/counters.py and app/cache.py)
+        counter_deltas = {TOTAL_REPORTS: -chunk_deleted}
+        for status, is_read, count in report_counts:
+            counter_deltas[status_counter(status)] = counter_deltas.get(status_counter(status), 0) - count
+            if is_read == False:
+                counter_deltas[UNREAD_REPORTS] = counter_deltas.get(UNREAD_REPORTS, 0) - count
+        adjust_counters(counter_deltas)
+        adjust_unread_notifications({user_id: -count for user_id, count in unread_notifications})
+        bump_generation(REPORTS_NAMESPACE)
+        db.session.commit()
+        
+        deleted_count += chunk_deleted
+        if progress:
+            progress(deleted_count, max(total, deleted_count))
+    
+    return deleted_count
+
+
+def _run_delete_job(params, path, progress):
+    """Background delete job: delete the reports matching the filters (path is unused)"""
+    deleted_count = _delete_reports_chunked(ReportQuery(params['filters']), progress, params['total'])
+    print(f"✅ Deleted {deleted_count} reports in the background")
+
 # ============================================================================
 # ADMIN USERS MANAGEMENT API
 # ============================================================================
@@ -914,23 +1074,8 @@ def api_delete_admin_user(admin_id):
                 'message': 'Cannot delete the last administrator account'
             }), 400
         
-        # Delete admin's notifications (to avoid NOT NULL constraint error)
-        admin_notifications = Notification.query.filter_by(user_id=admin.id).all()
-        for notification in admin_notifications:
-            db.session.delete(notification)
-        
-        # Delete admin's comments (to avoid NOT NULL constraint error)
-        admin_comments = ReportComment.query.filter_by(user_id=admin.id).all()
-        for comment in admin_comments:
-            db.session.delete(comment)
-        
-        # Delete admin's audit logs (optional, but good for cleanup)
-        admin_audit_logs = AuditLog.query.filter_by(user_id=admin.id).all()
-        for audit_log in admin_audit_logs:
-            db.session.delete(audit_log)
-        
-        # Delete admin
-        db.session.delete(admin)
+        # Delete the admin with their notifications, comments and audit logs
+        _purge_user(admin)
         db.session.commit()
         
         return jsonify({
@@ -964,49 +1109,148 @@ def view_report_detail(report_id):
     
     return render_template('admin/view_report_detail.html', report=report)
 
+class ReportQuery:
+    """Filtered reports query shared by the listing, preview, export and bulk delete
+    
+    Owns filter parsing, joins, eager loading and ordering, so every view runs
+    the same query shape, and exposes a stable cache key for the filter set.
+    """
+    
+    FILTER_KEYS = ('employee_name', 'employee_code', 'store_name', 'start_date', 'end_date')
+    
+    def __init__(self, filters=None):
+        filters = filters or {}
+        self.filters = {key: (filters.get(key) or '').strip() for key in self.FILTER_KEYS}
+        
+        # Dates are entered in Egypt local time and stored in UTC
+        self.start_datetime = parse_date_filter(self.filters['start_date'], is_end_date=False)
+        self.end_datetime = parse_date_filter(self.filters['end_date'], is_end_date=True)
+    
+    @classmethod
+    def from_request(cls, source):
+        """Read the filters from request args, a form or a JSON body"""
+        return cls({key: source.get(key, '') for key in cls.FILTER_KEYS})
+    
+    @property
+    def start_date(self):
+        return self.filters['start_date']
+    
+    @property
+    def end_date(self):
+        return self.filters['end_date']
+    
+    @property
+    def cache_key(self):
+        """Stable key of the effective filter set (equivalent filters share a key)"""
+        effective = {
+            'employee_name': normalize(self.filters['employee_name']),
+            'employee_code': normalize(self.filters['employee_code']),
+            'store_name': normalize(self.filters['store_name']),
+            'start': self.start_datetime.isoformat() if self.start_datetime else '',
+            'end': self.end_datetime.isoformat() if self.end_datetime else ''
+        }
+        digest = hashlib.sha1(json.dumps(effective, sort_keys=True).encode('utf-8')).hexdigest()
+        return f'reports:{digest}'
+    
+    def query(self):
+        """Reports matching the filters, joined to their employee, store and area"""
+        query = db.session.query(Report).join(User).join(Store).join(Area)
+        
+        # Text filters are served by the search index (see app/search.py)
+        if self.filters['employee_name']:
+            query = query.filter(Report.user_id.in_(matching_ids('employee_name', self.filters['employee_name'])))
+        if self.filters['employee_code']:
+            query = query.filter(Report.user_id.in_(matching_ids('employee_code', self.filters['employee_code'])))
+        if self.filters['store_name']:
+            query = query.filter(Report.store_id.in_(matching_ids('store_name', self.filters['store_name'])))
+        
+        if self.start_datetime:
+            query = query.filter(Report.report_date >= self.start_datetime)
+        if self.end_datetime:
+            query = query.filter(Report.report_date <= self.end_datetime)
+        
+        return query
+    
+    @staticmethod
+    def eager(query):
+        """Load employee, store and area from the joins already in the query"""
+        return query.options(
+            contains_eager(Report.employee),
+            contains_eager(Report.store),
+            contains_eager(Report.area)
+        )
+    
+    @staticmethod
+    def newest_first(query):
+        """Newest reports first, with the id as a stable tie-breaker"""
+        return query.order_by(Report.created_at.desc(), Report.id.desc())
+    
+    @property
+    def is_filtered(self):
+        return any(self.filters.values())
+    
+    def count(self):
+        return self.query().with_entities(db.func.count(Report.id)).scalar() or 0
+    
+    def status_counts(self):
+        """Number of matching reports per status, in one GROUP BY query"""
+        return dict(
+            self.query().with_entities(Report.status, db.func.count(Report.id)).group_by(Report.status).all()
+        )
+
+
 @bp.route('/api/reports')
 @admin_required
 def api_reports():
-    # Get filter parameters
-    employee_name = request.args.get('employee_name', '')
-    employee_code = request.args.get('employee_code', '')
-    store_name = request.args.get('store_name', '')
-    start_date = request.args.get('start_date', '')
-    end_date = request.args.get('end_date', '')
-    
-    # Build query
-    query = db.session.query(Report).join(User).join(Store)
-    
-    if employee_name:
-        query = query.filter(User.employee_name.contains(employee_name))
-    if employee_code:
-        query = query.filter(User.employee_code.contains(employee_code))
-    if store_name:
-        query = query.filter(Store.name.contains(store_name))
-    
-    # Fixed date filtering with proper timezone handling
-    if start_date:
-        start_datetime = parse_date_filter(start_date, is_end_date=False)
-        if start_datetime:
-            query = query.filter(Report.report_date >= start_datetime)
-    
-    if end_date:
-        end_datetime = parse_date_filter(end_date, is_end_date=True)
-        if end_datetime:
-            query = query.filter(Report.report_date <= end_datetime)
-    
-    reports = query.order_by(Report.created_at.desc()).all()
+    report_query = ReportQuery.from_request(request.args)
+    
+    # Pagination parameters
+    cursor = request.args.get('cursor', '')
+    limit = page_limit(request.args.get('limit'))
+    
+    # Pages are cached per filter set until the next report write
+    page_key = f'{report_query.cache_key}:{cursor}:{limit}'
+    page = result_cache.get(REPORTS_NAMESPACE, page_key)
+    if page is not None:
+        return jsonify({'success': True, **page})
+    
+    query = report_query.query()
+    
+    # Total count is only computed for the first page so that following
+    # pages cost the same regardless of the table size
+    total = None
+    if not cursor:
+        total = query.with_entities(db.func.count(Report.id)).scalar() or 0
+    else:
+        position = decode_report_cursor(cursor)
+        if position is None:
+            return jsonify({'success': False, 'message': 'Invalid cursor'}), 400
+        query = after_cursor(query, position)
+    
+    # Comment counts come from one grouped subquery instead of a COUNT per row
+    comments_subquery = db.session.query(
+        ReportComment.report_id,
+        db.func.count(ReportComment.id).label('comments_count')
+    ).group_by(ReportComment.report_id).subquery()
+    
+    query = report_query.eager(query.outerjoin(comments_subquery, comments_subquery.c.report_id == Report.id).add_columns(
+        db.func.coalesce(comments_subquery.c.comments_count, 0)
+    ))
+    
+    # Fetch one extra row to know whether another page exists
+    rows = report_query.newest_first(query).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    governorates = get_governorate_resolver()
+    governorates.prefetch_reports([report for report, _ in rows])
     
     reports_data = []
-    for report in reports:
+    for report, comments_count in rows:
         # Convert UTC times to Egypt local time for display
         report_date_local = utc_to_egypt_time(report.report_date)
         created_at_local = utc_to_egypt_time(report.created_at)
         
-        # Count comments
-        from app.models import ReportComment
-        comments_count = ReportComment.query.filter_by(report_id=report.id).count()
-        
         reports_data.append({
             'id': report.id,
             'employee_name': report.employee.employee_name,
@@ -1014,6 +1258,7 @@ def api_reports():
             'store_name': report.store.name,
             'store_code': report.store.code,
             'area': report.area.name,
+            'governorate': governorates.resolve(report),
             'report_date': report_date_local.strftime('%Y-%m-%d') if report_date_local else '',
             'created_at': created_at_local.strftime('%Y-%m-%d %H:%M') if created_at_local else '',
             'status': report.status if hasattr(report, 'status') else 'new',
@@ -1021,66 +1266,31 @@ def api_reports():
             'comments_count': comments_count
         })
     
-    return jsonify(reports_data)
+    page = {
+        'reports': reports_data,
+        'total': total,
+        'limit': limit,
+        'has_more': has_more,
+        'next_cursor': encode_report_cursor(rows[-1][0]) if has_more else None
+    }
+    result_cache.set(REPORTS_NAMESPACE, page_key, page)
+    
+    return jsonify({'success': True, **page})
 
 @bp.route('/preview_export')
 @admin_required
 def preview_export():
     """Preview export data before downloading"""
     # Get same filters as API
-    employee_name = request.args.get('employee_name', '')
-    employee_code = request.args.get('employee_code', '')
-    store_name = request.args.get('store_name', '')
-    start_date = request.args.get('start_date', '')
-    end_date = request.args.get('end_date', '')
-    
-    # Build query
-    query = db.session.query(Report).join(User).join(Store).join(Area)
-    
-    if employee_name:
-        query = query.filter(User.employee_name.contains(employee_name))
-    if employee_code:
-        query = query.filter(User.employee_code.contains(employee_code))
-    if store_name:
-        query = query.filter(Store.name.contains(store_name))
-    
-    # Fixed date filtering with proper timezone handling
-    if start_date:
-        start_datetime = parse_date_filter(start_date, is_end_date=False)
-        if start_datetime:
-            query = query.filter(Report.report_date >= start_datetime)
-    
-    if end_date:
-        end_datetime = parse_date_filter(end_date, is_end_date=True)
-        if end_datetime:
-            query = query.filter(Report.report_date <= end_datetime)
-    
-    reports_raw = query.order_by(Report.created_at.desc()).limit(100).all()  # Limit for preview
-    
-    # Add governorate to each report
-    reports = []
-    for report in reports_raw:
-        # Get governorate from store, area, or user's branch assignments
-        governorate = ''
-        
-        # First try to get from store
-        if hasattr(report, 'store') and hasattr(report.store, 'governorate') and report.store.governorate:
-            governorate = report.store.governorate
-        # Then try to get from area
-        elif hasattr(report, 'area') and hasattr(report.area, 'governorate') and report.area.governorate:
-            governorate = report.area.governorate
-        # Finally try to get from user's branch assignments
-        else:
-            # Get the first branch with a governorate for this user
-            user_branches = Branch.query.filter_by(owner_user_id=report.user_id).all()
-            for branch in user_branches:
-                if branch.governorate:
-                    governorate = branch.governorate
-                    break
-        
-        # Add governorate as attribute
-        report.governorate_display = governorate
-        reports.append(report)
+    report_query = ReportQuery.from_request(request.args)
+    
+    reports = report_query.newest_first(report_query.eager(report_query.query())).limit(100).all()  # Limit for preview
+    
+    # Add governorate to each report (store, then the user's branches)
+    governorates = get_governorate_resolver()
+    governorates.prefetch_reports(reports)
+    for report in reports:
+        report.governorate_display = governorates.resolve(report)
     
     return render_template('admin/export_preview.html', reports=reports)
 
@@ -1089,38 +1299,23 @@ def preview_export():
 def export_reports():
     """Export reports with professional formatting and separate sheets per SPVR"""
     # Get same filters as API
-    employee_name = request.args.get('employee_name', '')
-    employee_code = request.args.get('employee_code', '')
-    store_name = request.args.get('store_name', '')
-    start_date = request.args.get('start_date', '')
-    end_date = request.args.get('end_date', '')
-    
-    # Build query
-    query = db.session.query(Report).join(User).join(Store).join(Area)
-    
-    if employee_name:
-        query = query.filter(User.employee_name.contains(employee_name))
-    if employee_code:
-        query = query.filter(User.employee_code.contains(employee_code))
-    if store_name:
-        query = query.filter(Store.name.contains(store_name))
-    
-    # Fixed date filtering with proper timezone handling
-    if start_date:
-        start_datetime = parse_date_filter(start_date, is_end_date=False)
-        if start_datetime:
-            query = query.filter(Report.report_date >= start_datetime)
-    
-    if end_date:
-        end_datetime = parse_date_filter(end_date, is_end_date=True)
-        if end_datetime:
-            query = query.filter(Report.report_date <= end_datetime)
-    
-    reports = query.order_by(Report.created_at.desc()).all()
-    
-    # Generate filename with current Egypt local date and time
-    current_egypt_time = get_current_egypt_time()
-    filename = f'Report_{current_egypt_time.strftime("%Y%m%d_%H%M%S")}.xlsx'
+    report_query = ReportQuery.from_request(request.args)
+    start_date = report_query.start_date
+    end_date = report_query.end_date
+    
+    query = report_query.query()
+    
+    filename = _export_filename()
+    
+    # Large exports go through the streaming engine to keep worker memory flat
+    export_mode = request.args.get('mode', '')
+    if export_mode == 'stream' or (
+        export_mode != 'memory' and query.count() > current_app.config['EXPORT_STREAMING_THRESHOLD']
+    ):
+        return _stream_export(query, start_date, end_date, filename)
+    
+    reports = report_query.newest_first(report_query.eager(query)).all()
+    get_governorate_resolver().prefetch_reports(reports)
     
     if not reports:
         # Even if no reports, create summary sheet to show vacation status
@@ -1132,7 +1327,7 @@ def export_reports():
         
         # Create summary sheet with empty reports data
         summary_ws = wb.create_sheet(title="Reports Summary")
-        _create_summary_sheet(summary_ws, {}, start_date, end_date)  # Empty spvr_reports dict
+        _create_summary_sheet(summary_ws, {}, start_date, end_date)  # Empty spvr_stats dict
         
         # Create a "No Reports" sheet for information
         no_reports_ws = wb.create_sheet(title="No Reports Found")
@@ -1166,7 +1361,7 @@ def export_reports():
     
     # Create summary sheet first
     summary_ws = wb.create_sheet(title="Reports Summary")
-    _create_summary_sheet(summary_ws, spvr_reports, start_date, end_date)
+    _create_summary_sheet(summary_ws, _collect_spvr_stats(spvr_reports), start_date, end_date)
     
     # Create a sheet for each SPVR with enhanced naming
     used_sheet_names = set()
@@ -1195,50 +1390,288 @@ def export_reports():
     )
 
 
-def _create_summary_sheet(ws, spvr_reports, start_date, end_date):
+@bp.route('/api/export-jobs', methods=['POST'])
+@admin_required
+def api_create_export_job():
+    """Queue a background Excel export for the given filters"""
+    try:
+        report_query = ReportQuery.from_request(request.get_json(silent=True) or request.args)
+        job = export_jobs.submit(
+            _run_export_job,
+            report_query.filters,
+            owner_id=session['user_id'],
+            filename=_export_filename()
+        )
+        
+        return jsonify({
+            'success': True,
+            'job_id': job['id'],
+            'status': job['status'],
+            'status_url': url_for('admin.api_get_export_job', job_id=job['id'])
+        }), 202
+        
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@bp.route('/api/export-jobs/<job_id>', methods=['GET'])
+@admin_required
+def api_get_export_job(job_id):
+    """Get the progress of a background export"""
+    job = export_jobs.get(job_id)
+    if not job or job.get('owner_id') != session['user_id']:
+        return jsonify({'success': False, 'message': 'Export job not found or expired'}), 404
+    
+    job_data = {
+        'id': job['id'],
+        'status': job['status'],
+        'progress': job['progress'],
+        'processed': job['processed'],
+        'total': job['total'],
+        'error': job['error'],
+        'expires_in': int(job['expires_at'] - time.time()) if job['expires_at'] else None
+    }
+    if job['status'] == export_jobs.STATUS_COMPLETED:
+        job_data['download_url'] = url_for('admin.download_export_job', job_id=job['id'])
+    
+    return jsonify({'success': True, 'job': job_data})
+
+@bp.route('/api/export-jobs/<job_id>/download', methods=['GET'])
+@admin_required
+def download_export_job(job_id):
+    """Download the workbook of a completed background export"""
+    job = export_jobs.get(job_id)
+    if not job or job.get('owner_id') != session['user_id'] or job['status'] != export_jobs.STATUS_COMPLETED:
+        return jsonify({'success': False, 'message': 'Export file not available'}), 404
+    
+    return send_file(
+        export_jobs.file_path(job_id),
+        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        as_attachment=True,
+        download_name=job['filename']
+    )
+
+
+def _export_filename():
+    """Generate filename with current Egypt local date and time"""
+    current_egypt_time = get_current_egypt_time()
+    return f'Report_{current_egypt_time.strftime("%Y%m%d_%H%M%S")}.xlsx'
+
+
+def _stream_export(query, start_date, end_date, filename):
+    """Build the export with write-only worksheets and stream it from a temp file"""
+    fd, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(fd)
+    try:
+        _write_streaming_workbook(query, start_date, end_date, path)
+    except Exception:
+        os.remove(path)
+        raise
+    
+    response = send_file(
+        path,
+        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        as_attachment=True,
+        download_name=filename
+    )
+    response.call_on_close(lambda: os.remove(path))
+    return response
+
+
+def _run_export_job(filters, path, progress):
+    """Background export job: write the workbook for the given filters to path"""
+    report_query = ReportQuery(filters)
+    _write_streaming_workbook(report_query.query(), report_query.start_date, report_query.end_date, path, progress)
+
+
+def _write_streaming_workbook(query, start_date, end_date, path, progress=None):
+    """Write the export workbook to path using write-only worksheets"""
+    spvr_stats = _query_spvr_stats(query)
+    total_reports = sum(stats['reports_count'] for stats in spvr_stats.values())
+    chunk_size = current_app.config['EXPORT_CHUNK_SIZE']
+    
+    wb = Workbook(write_only=True)
+    
+    # The summary sheet is bounded by the number of employees, so it is staged
+    # in a regular worksheet and then copied into the write-only workbook
+    staging_ws = Workbook().active
+    _create_summary_sheet(staging_ws, spvr_stats, start_date, end_date)
+    _copy_sheet_to_write_only(staging_ws, wb.create_sheet(title="Reports Summary"))
+    
+    if not spvr_stats:
+        no_reports_ws = wb.create_sheet(title="No Reports Found")
+        no_reports_ws.append(["No reports found for the selected criteria"])
+        no_reports_ws.append([f"Date range: {start_date or 'All'} to {end_date or 'All'}"])
+        no_reports_ws.append(["Check the 'Reports Summary' sheet for employee vacation status"])
+    else:
+        # Governorates of every exported report are loaded up front in two queries
+        get_governorate_resolver().prefetch_query(query)
+        
+        # Reports are loaded in chunks, grouped by SPVR so each sheet is written once
+        reports_iter = ReportQuery.eager(query).order_by(
+            User.employee_code, Report.user_id, Report.created_at.desc(), Report.id.desc()
+        ).yield_per(chunk_size)
+        
+        # Report progress once per loaded chunk
+        def track_progress(reports):
+            for processed, report in enumerate(reports, 1):
+                yield report
+                if progress and processed % chunk_size == 0:
+                    progress(processed, total_reports)
+        
+        reports_iter = track_progress(reports_iter)
+        
+        used_sheet_names = {"Reports Summary"}
+        for _, spvr_report_iter in itertools.groupby(reports_iter, key=lambda report: report.user_id):
+            first_report = next(spvr_report_iter)
+            spvr_code = first_report.employee.employee_code
+            spvr_name = first_report.employee.employee_name
+            
+            sheet_name = _create_sheet_name(spvr_code, spvr_name, len(spvr_stats) > 1, used_sheet_names)
+            used_sheet_names.add(sheet_name)
+            
+            ws = wb.create_sheet(title=sheet_name)
+            _write_excel_sheet_streaming(
+                ws, itertools.chain([first_report], spvr_report_iter), spvr_name, spvr_code,
+                content_lengths=spvr_stats[f"{spvr_code}_{spvr_name}"]['content_lengths']
+            )
+    
+    wb.save(path)
+    
+    if progress:
+        progress(total_reports, total_reports)
+
+
+# Columns of the report sheets whose longest value is measured by the database,
+# in sheet order after Date, SPVR Code and SPVR Name
+EXPORT_LENGTH_COLUMNS = (
+    Store.code, Store.name, Area.name, Store.governorate,
+    Report.samsung_sales, Report.competitors_sales, Report.tv_availability, Report.ha_availability,
+    Report.sfo_pmt, Report.display_activities, Report.store_issues, Report.complaints, Report.actions_taken
+)
+
+def _text_length(column):
+    """Character length of a column (LENGTH counts bytes on MySQL)"""
+    if db.session.get_bind().dialect.name == 'mysql':
+        return db.func.char_length(column)
+    return db.func.length(column)
+
+
+def _query_spvr_stats(query):
+    """Aggregate per-SPVR statistics for the summary sheet in a single query
+    
+    The longest value of every report sheet column is measured in the same
+    query so streamed sheets can fit their column widths up front.
+    """
+    rows = query.with_entities(
+        User.employee_code,
+        User.employee_name,
+        db.func.count(Report.id),
+        db.func.count(db.func.distinct(Report.store_id)),
+        db.func.max(Report.report_date),
+        *[db.func.max(_text_length(column)) for column in EXPORT_LENGTH_COLUMNS]
+    ).group_by(User.id, User.employee_code, User.employee_name).all()
+    
+    return {
+        f"{code}_{name}": {
+            'stores_count': stores_count,
+            'reports_count': reports_count,
+            'last_report': last_report,
+            'content_lengths': [len('YYYY-MM-DD'), len(code), len(name), *max_lengths]
+        }
+        for code, name, reports_count, stores_count, last_report, *max_lengths in rows
+    }
+
+
+def _collect_spvr_stats(spvr_reports):
+    """Compute per-SPVR statistics from already loaded report lists"""
+    spvr_stats = {}
+    for spvr_key, reports in spvr_reports.items():
+        unique_stores = set()
+        last_report_date = None
+        
+        for report in reports:
+            unique_stores.add(report.store_id)
+            if not last_report_date or report.report_date > last_report_date:
+                last_report_date = report.report_date
+        
+        spvr_stats[spvr_key] = {
+            'stores_count': len(unique_stores),
+            'reports_count': len(reports),
+            'last_report': last_report_date
+        }
+    return spvr_stats
+
+
+def _copy_sheet_to_write_only(src_ws, dst_ws):
+    """Copy a regular worksheet (values, styles, merges, layout) into a write-only one"""
+    register_export_styles(dst_ws.parent)
+    
+    # Column widths must be set before the first row is written
+    for col_letter, dimension in src_ws.column_dimensions.items():
+        if dimension.width:
+            dst_ws.column_dimensions[col_letter].width = dimension.width
+    
+    for row_idx, row in enumerate(src_ws.iter_rows(min_row=1, max_row=src_ws.max_row), 1):
+        if row_idx in src_ws.row_dimensions and src_ws.row_dimensions[row_idx].height:
+            dst_ws.row_dimensions[row_idx].height = src_ws.row_dimensions[row_idx].height
+        
+        row_cells = []
+        for cell in row:
+            out_cell = WriteOnlyCell(dst_ws, value=cell.value)
+            if cell.has_style and cell.style != 'Normal':
+                # Export styles are registered on both workbooks, so the name is enough
+                out_cell.style = cell.style
+            elif cell.has_style:
+                out_cell.font = copy(cell.font)
+                out_cell.fill = copy(cell.fill)
+                out_cell.border = copy(cell.border)
+                out_cell.alignment = copy(cell.alignment)
+            row_cells.append(out_cell)
+        dst_ws.append(row_cells)
+    
+    for merged_range in src_ws.merged_cells.ranges:
+        dst_ws.merged_cells.add(str(merged_range))
+    
+    dst_ws.freeze_panes = src_ws.freeze_panes
+
+
+# Vacation grids up to this many days show every day of the range
+VACATION_GRID_FULL_RANGE_DAYS = 31
+
+def _load_vacation_index(start_date, end_date):
+    """Load all vacations between two dates (and on start_date) as {user_id: set of dates}"""
+    rows = db.session.query(Vacation.user_id, Vacation.vacation_date).filter(
+        db.or_(
+            Vacation.vacation_date == start_date,
+            db.and_(Vacation.vacation_date >= start_date, Vacation.vacation_date <= end_date)
+        )
+    ).all()
+    
+    vacation_index = {}
+    for user_id, vacation_date in rows:
+        vacation_index.setdefault(user_id, set()).add(vacation_date)
+    return vacation_index
+
+
+def _create_summary_sheet(ws, spvr_stats, start_date, end_date):
     """Create summary sheet with employee statistics and missing employees in red"""
-    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
     from openpyxl.utils import get_column_letter
-    from app.models import User, Store, Branch, Vacation
-    from datetime import datetime, date
-    
-    # Define colors and styles
-    header_color = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')  # Blue header
-    summary_color = PatternFill(start_color='E2EFDA', end_color='E2EFDA', fill_type='solid')  # Light green for active employees
-    missing_color = PatternFill(start_color='FFE6E6', end_color='FFE6E6', fill_type='solid')  # Light red for missing employees
-    vacation_color = PatternFill(start_color='FFF2CC', end_color='FFF2CC', fill_type='solid')  # Light yellow for vacation
-    
-    header_font = Font(name='Calibri', size=12, bold=True, color='FFFFFF')
-    data_font = Font(name='Calibri', size=10, bold=False, color='000000')
-    missing_font = Font(name='Calibri', size=10, bold=True, color='CC0000')  # Red bold for missing
-    vacation_font = Font(name='Calibri', size=10, bold=True, color='FF8C00')  # Orange bold for vacation
-    
-    center_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-    left_alignment = Alignment(horizontal='left', vertical='center', wrap_text=True)
-    
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
+    
+    # Styles are shared by every sheet of the workbook and applied by name
+    register_export_styles(ws.parent)
     
     # Title
     ws.merge_cells('A1:F1')
     title_cell = ws.cell(row=1, column=1)
     title_cell.value = f"Reports Summary - From {start_date or 'Beginning'} To {end_date or 'End'}"
-    title_cell.font = Font(name='Calibri', size=14, bold=True, color='000000')
-    title_cell.alignment = center_alignment
+    title_cell.style = SUMMARY_TITLE
     
     # Headers
     headers = ['Employee Code', 'Employee Name', 'Stores Count', 'Reports Count', 'Last Report', 'Status']
     for col_idx, header in enumerate(headers, 1):
         cell = ws.cell(row=3, column=col_idx)
         cell.value = header
-        cell.font = header_font
-        cell.fill = header_color
-        cell.alignment = center_alignment
-        cell.border = thin_border
+        cell.style = SUMMARY_HEADER
     
     # Get all employees (non-admin users)
     all_employees = User.query.filter_by(is_admin=False).all()
@@ -1247,66 +1680,46 @@ def _create_summary_sheet(ws, spvr_reports, start_date, end_date):
     vacation_start_date = None
     vacation_end_date = None
     
-    if start_date:
-        try:
-            vacation_start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
-        except:
-            # If parsing fails, get earliest vacation date or use 30 days ago
-            earliest_vacation = Vacation.query.order_by(Vacation.vacation_date.asc()).first()
-            if earliest_vacation:
-                vacation_start_date = earliest_vacation.vacation_date
-            else:
-                vacation_start_date = date.today() - timedelta(days=30)
-    else:
-        # If no start date provided, get earliest vacation date or use 30 days ago
-        earliest_vacation = Vacation.query.order_by(Vacation.vacation_date.asc()).first()
-        if earliest_vacation:
-            vacation_start_date = earliest_vacation.vacation_date
-        else:
-            vacation_start_date = date.today() - timedelta(days=30)
-        
-    if end_date:
-        try:
-            vacation_end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
-        except:
-            # If parsing fails, get latest vacation date or use today
-            latest_vacation = Vacation.query.order_by(Vacation.vacation_date.desc()).first()
-            if latest_vacation:
-                vacation_end_date = latest_vacation.vacation_date
-            else:
-                vacation_end_date = date.today()
-    else:
-        # If no end date provided, get latest vacation date or use today
-        latest_vacation = Vacation.query.order_by(Vacation.vacation_date.desc()).first()
-        if latest_vacation:
-            vacation_end_date = latest_vacation.vacation_date
-        else:
-            vacation_end_date = date.today()
+    try:
+        vacation_start_date = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None
+    except ValueError:
+        vacation_start_date = None
+    
+    try:
+        vacation_end_date = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+    except ValueError:
+        vacation_end_date = None
+    
+    if vacation_start_date is None or vacation_end_date is None:
+        # Missing or invalid dates fall back to the earliest/latest vacation
+        # (one aggregate query), or to the last 30 days if there are none
+        earliest_vacation_date, latest_vacation_date = db.session.query(
+            db.func.min(Vacation.vacation_date),
+            db.func.max(Vacation.vacation_date)
+        ).one()
+        if vacation_start_date is None:
+            vacation_start_date = earliest_vacation_date or date.today() - timedelta(days=30)
+        if vacation_end_date is None:
+            vacation_end_date = latest_vacation_date or date.today()
     
     print(f"🏖️ Checking vacations from {vacation_start_date} to {vacation_end_date}")
     
+    # Load every vacation of the range in one query, indexed by user
+    vacation_index = _load_vacation_index(vacation_start_date, vacation_end_date)
+    
     # Create employee statistics
     employee_stats = {}
     
     # Process employees who submitted reports
-    for spvr_key, reports in spvr_reports.items():
+    for spvr_key, stats in spvr_stats.items():
         spvr_code, spvr_name = spvr_key.split('_', 1)
         
-        # Get unique stores reported by this employee
-        unique_stores = set()
-        last_report_date = None
-        
-        for report in reports:
-            unique_stores.add(report.store.id)
-            if not last_report_date or report.report_date > last_report_date:
-                last_report_date = report.report_date
-        
         employee_stats[spvr_code] = {
             'name': spvr_name,
             'code': spvr_code,
-            'stores_count': len(unique_stores),
-            'reports_count': len(reports),
-            'last_report': last_report_date,
+            'stores_count': stats['stores_count'],
+            'reports_count': stats['reports_count'],
+            'last_report': stats['last_report'],
             'has_reports': True,
             'has_vacation': False
         }
@@ -1329,26 +1742,13 @@ def _create_summary_sheet(ws, spvr_reports, start_date, end_date):
         if employee.employee_code in employee_stats:
             # Check if employee has vacation on the START DATE (the selected/target date)
             # This is the date we're checking the status for
-            vacation_on_target_date = Vacation.query.filter(
-                Vacation.user_id == employee.id,
-                Vacation.vacation_date == vacation_start_date
-            ).first()
-            
-            has_vacation = vacation_on_target_date is not None
+            vacation_dates = vacation_index.get(employee.id, set())
+            has_vacation = vacation_start_date in vacation_dates
             employee_stats[employee.employee_code]['has_vacation'] = has_vacation
-            
-            # Also get all vacations in range for the vacation details table
-            vacations = Vacation.query.filter(
-                Vacation.user_id == employee.id,
-                Vacation.vacation_date >= vacation_start_date,
-                Vacation.vacation_date <= vacation_end_date
-            ).all()
-            employee_stats[employee.employee_code]['vacations'] = vacations
-            
-            if has_vacation:
-                print(f"🏖️ Employee {employee.employee_name} ({employee.employee_code}) is on vacation on {vacation_start_date}")
-            else:
-                print(f"💼 Employee {employee.employee_name} ({employee.employee_code}) is NOT on vacation on {vacation_start_date}")
+            employee_stats[employee.employee_code]['vacation_dates'] = vacation_dates
+    
+    vacation_count = sum(1 for emp in employee_stats.values() if emp['has_vacation'])
+    print(f"🏖️ {vacation_count} employee(s) on vacation on {vacation_start_date}")
     
     # Sort employees by name
     sorted_employees = sorted(employee_stats.values(), key=lambda x: x['name'])
@@ -1356,71 +1756,37 @@ def _create_summary_sheet(ws, spvr_reports, start_date, end_date):
     # Write data
     row_idx = 4
     for emp in sorted_employees:
-        # Employee code
-        cell = ws.cell(row=row_idx, column=1)
-        cell.value = emp['code']
-        cell.border = thin_border
-        cell.alignment = center_alignment
-        
-        # Employee name
-        cell = ws.cell(row=row_idx, column=2)
-        cell.value = emp['name']
-        cell.border = thin_border
-        cell.alignment = left_alignment
-        
-        # Stores count
-        cell = ws.cell(row=row_idx, column=3)
-        cell.value = emp['stores_count']
-        cell.border = thin_border
-        cell.alignment = center_alignment
-        
-        # Reports count
-        cell = ws.cell(row=row_idx, column=4)
-        cell.value = emp['reports_count']
-        cell.border = thin_border
-        cell.alignment = center_alignment
-        
-        # Last report date
-        cell = ws.cell(row=row_idx, column=5)
+        # Rows are colored by state: vacation, active or missing (no reports)
+        if emp['has_vacation']:
+            row_state = 'vacation'
+        elif emp['has_reports']:
+            row_state = 'active'
+        else:
+            row_state = 'missing'
+        
         if emp['last_report']:
             last_report_local = utc_to_egypt_time(emp['last_report'])
-            cell.value = last_report_local.strftime('%Y-%m-%d') if last_report_local else ''
+            last_report_value = last_report_local.strftime('%Y-%m-%d') if last_report_local else ''
         else:
-            cell.value = 'No Reports'
-        cell.border = thin_border
-        cell.alignment = center_alignment
+            last_report_value = 'No Reports'
         
-        # Status
-        cell = ws.cell(row=row_idx, column=6)
         if emp['has_vacation']:
-            cell.value = 'On Vacation'
-            cell.fill = vacation_color
-            cell.font = vacation_font
+            status_value = 'On Vacation'
         elif emp['has_reports']:
-            cell.value = 'Active'
-            cell.fill = summary_color
-            cell.font = data_font
+            status_value = 'Active'
         else:
-            cell.value = 'No Reports'
-            cell.fill = missing_color
-            cell.font = missing_font
-        cell.border = thin_border
-        cell.alignment = center_alignment
-        
-        # Apply row formatting
-        for col in range(1, 7):
-            row_cell = ws.cell(row=row_idx, column=col)
-            if emp['has_vacation']:
-                if col != 6:  # Don't override status cell
-                    row_cell.fill = vacation_color
-                    row_cell.font = vacation_font
-            elif not emp['has_reports']:
-                if col != 6:  # Don't override status cell
-                    row_cell.fill = missing_color
-                    row_cell.font = missing_font
-            else:
-                if col != 6:  # Don't override status cell
-                    row_cell.font = data_font
+            status_value = 'No Reports'
+        
+        row_values = [emp['code'], emp['name'], emp['stores_count'], emp['reports_count'], last_report_value]
+        for col_idx, value in enumerate(row_values, 1):
+            cell = ws.cell(row=row_idx, column=col_idx)
+            cell.value = value
+            cell.style = summary_row(row_state, 'left' if col_idx == 2 else 'center')
+        
+        # Status
+        cell = ws.cell(row=row_idx, column=6)
+        cell.value = status_value
+        cell.style = SUMMARY_STATUS_ACTIVE if row_state == 'active' else summary_row(row_state)
         
         row_idx += 1
     
@@ -1430,7 +1796,7 @@ def _create_summary_sheet(ws, spvr_reports, start_date, end_date):
         ws.column_dimensions[get_column_letter(col_idx)].width = width
     
     # Add summary statistics at the bottom
-    summary_row = row_idx + 2
+    statistics_row = row_idx + 2
     
     total_employees = len(sorted_employees)
     active_employees = sum(1 for emp in sorted_employees if emp['has_reports'])
@@ -1440,11 +1806,10 @@ def _create_summary_sheet(ws, spvr_reports, start_date, end_date):
     total_stores = sum(emp['stores_count'] for emp in sorted_employees)
     
     # Summary headers
-    ws.merge_cells(f'A{summary_row}:B{summary_row}')
-    summary_header = ws.cell(row=summary_row, column=1)
+    ws.merge_cells(f'A{statistics_row}:B{statistics_row}')
+    summary_header = ws.cell(row=statistics_row, column=1)
     summary_header.value = "General Statistics"
-    summary_header.font = Font(name='Calibri', size=12, bold=True, color='000000')
-    summary_header.alignment = center_alignment
+    summary_header.style = SUMMARY_SECTION_TITLE
     
     # Summary data
     summary_data = [
@@ -1457,21 +1822,20 @@ def _create_summary_sheet(ws, spvr_reports, start_date, end_date):
     ]
     
     for i, (label, value) in enumerate(summary_data):
-        label_cell = ws.cell(row=summary_row + 1 + i, column=1)
+        label_cell = ws.cell(row=statistics_row + 1 + i, column=1)
         label_cell.value = label
-        label_cell.font = Font(name='Calibri', size=10, bold=True)
-        label_cell.alignment = left_alignment
+        label_cell.style = SUMMARY_LABEL
         
-        value_cell = ws.cell(row=summary_row + 1 + i, column=2)
+        value_cell = ws.cell(row=statistics_row + 1 + i, column=2)
         value_cell.value = value
-        value_cell.font = data_font
-        value_cell.alignment = center_alignment
         
         # Highlight different categories
         if label == 'On Vacation:' and value > 0:
-            value_cell.font = Font(name='Calibri', size=10, bold=True, color='FF8C00')
+            value_cell.style = SUMMARY_VALUE_VACATION
         elif label == 'Missing Employees:' and value > 0:
-            value_cell.font = Font(name='Calibri', size=10, bold=True, color='CC0000')
+            value_cell.style = SUMMARY_VALUE_MISSING
+        else:
+            value_cell.style = SUMMARY_VALUE
     
     # Freeze panes
     ws.freeze_panes = 'A4'
@@ -1481,28 +1845,21 @@ def _create_summary_sheet(ws, spvr_reports, start_date, end_date):
     # ============================================================================
     
     # Add vacation details table below the summary statistics
-    vacation_table_start_row = summary_row + len(summary_data) + 3
-    
-    # Get all vacations in the date range for all employees
-    from datetime import timedelta
-    
-    all_vacations = Vacation.query.filter(
-        Vacation.vacation_date >= vacation_start_date,
-        Vacation.vacation_date <= vacation_end_date
-    ).order_by(Vacation.user_id, Vacation.vacation_date).all()
+    vacation_table_start_row = statistics_row + len(summary_data) + 3
     
-    # Group vacations by employee
+    # Group vacations in the date range by employee (served from the vacation index)
     employee_vacations = {}
-    for vacation in all_vacations:
-        user = User.query.get(vacation.user_id)
-        if user and not user.is_admin:
-            if user.employee_code not in employee_vacations:
-                employee_vacations[user.employee_code] = {
-                    'name': user.employee_name,
-                    'code': user.employee_code,
-                    'vacation_dates': []
-                }
-            employee_vacations[user.employee_code]['vacation_dates'].append(vacation.vacation_date)
+    for employee in all_employees:
+        vacation_dates = {
+            vacation_date for vacation_date in vacation_index.get(employee.id, ())
+            if vacation_start_date <= vacation_date <= vacation_end_date
+        }
+        if vacation_dates:
+            employee_vacations[employee.employee_code] = {
+                'name': employee.employee_name,
+                'code': employee.employee_code,
+                'vacation_dates': vacation_dates
+            }
     
     # Only create vacation table if there are vacations
     if employee_vacations:
@@ -1510,15 +1867,17 @@ def _create_summary_sheet(ws, spvr_reports, start_date, end_date):
         ws.merge_cells(f'A{vacation_table_start_row}:F{vacation_table_start_row}')
         vacation_title_cell = ws.cell(row=vacation_table_start_row, column=1)
         vacation_title_cell.value = f"Vacation Details - From {start_date or 'Beginning'} To {end_date or 'End'}"
-        vacation_title_cell.font = Font(name='Calibri', size=14, bold=True, color='000000')
-        vacation_title_cell.alignment = center_alignment
-        
-        # Calculate all dates in the range
-        date_range = []
-        current_date = vacation_start_date
-        while current_date <= vacation_end_date:
-            date_range.append(current_date)
-            current_date += timedelta(days=1)
+        vacation_title_cell.style = SUMMARY_TITLE
+        
+        # Short ranges show every day; wide ranges only show the days that have
+        # vacations so the grid grows with the vacations, not with the range
+        range_days = (vacation_end_date - vacation_start_date).days + 1
+        fill_blank_cells = range_days <= VACATION_GRID_FULL_RANGE_DAYS
+        if fill_blank_cells:
+            date_range = [vacation_start_date + timedelta(days=offset) for offset in range(range_days)]
+        else:
+            date_range = sorted(set().union(*(emp['vacation_dates'] for emp in employee_vacations.values())))
+        date_columns = {grid_date: col_idx for col_idx, grid_date in enumerate(date_range, 3)}
         
         # Create headers for vacation table
         vacation_header_row = vacation_table_start_row + 2
@@ -1526,26 +1885,17 @@ def _create_summary_sheet(ws, spvr_reports, start_date, end_date):
         # First two columns: Employee Code and Name
         code_cell = ws.cell(row=vacation_header_row, column=1)
         code_cell.value = 'Employee Code'
-        code_cell.font = header_font
-        code_cell.fill = header_color
-        code_cell.alignment = center_alignment
-        code_cell.border = thin_border
+        code_cell.style = SUMMARY_HEADER
         
         name_cell = ws.cell(row=vacation_header_row, column=2)
         name_cell.value = 'Employee Name'
-        name_cell.font = header_font
-        name_cell.fill = header_color
-        name_cell.alignment = center_alignment
-        name_cell.border = thin_border
+        name_cell.style = SUMMARY_HEADER
         
         # Date columns
         for col_idx, vacation_date in enumerate(date_range, 3):
             date_cell = ws.cell(row=vacation_header_row, column=col_idx)
             date_cell.value = vacation_date.strftime('%Y-%m-%d')
-            date_cell.font = Font(name='Calibri', size=9, bold=True, color='FFFFFF')
-            date_cell.fill = header_color
-            date_cell.alignment = center_alignment
-            date_cell.border = thin_border
+            date_cell.style = SUMMARY_DATE_HEADER
             # Set narrow column width for dates
             ws.column_dimensions[get_column_letter(col_idx)].width = 12
         
@@ -1558,30 +1908,25 @@ def _create_summary_sheet(ws, spvr_reports, start_date, end_date):
             # Employee code
             code_cell = ws.cell(row=vacation_data_row, column=1)
             code_cell.value = emp['code']
-            code_cell.border = thin_border
-            code_cell.alignment = center_alignment
-            code_cell.font = data_font
+            code_cell.style = summary_row('active')
             
             # Employee name
             name_cell = ws.cell(row=vacation_data_row, column=2)
             name_cell.value = emp['name']
-            name_cell.border = thin_border
-            name_cell.alignment = left_alignment
-            name_cell.font = data_font
+            name_cell.style = summary_row('active', 'left')
             
-            # Mark vacation dates
-            for col_idx, check_date in enumerate(date_range, 3):
-                date_cell = ws.cell(row=vacation_data_row, column=col_idx)
-                
-                if check_date in emp['vacation_dates']:
-                    date_cell.value = '✓'
-                    date_cell.fill = vacation_color
-                    date_cell.font = Font(name='Calibri', size=12, bold=True, color='FF8C00')
-                else:
+            # Draw the empty grid for short ranges
+            if fill_blank_cells:
+                for col_idx in range(3, len(date_range) + 3):
+                    date_cell = ws.cell(row=vacation_data_row, column=col_idx)
                     date_cell.value = ''
-                
-                date_cell.border = thin_border
-                date_cell.alignment = center_alignment
+                    date_cell.style = GRID_BLANK
+            
+            # Mark vacation dates
+            for vacation_date in emp['vacation_dates']:
+                date_cell = ws.cell(row=vacation_data_row, column=date_columns[vacation_date])
+                date_cell.value = '✓'
+                date_cell.style = GRID_VACATION_MARK
             
             vacation_data_row += 1
         
@@ -1590,14 +1935,11 @@ def _create_summary_sheet(ws, spvr_reports, start_date, end_date):
         
         legend_cell = ws.cell(row=legend_row, column=1)
         legend_cell.value = 'Legend:'
-        legend_cell.font = Font(name='Calibri', size=10, bold=True)
+        legend_cell.style = SUMMARY_LABEL
         
         legend_vacation_cell = ws.cell(row=legend_row + 1, column=1)
         legend_vacation_cell.value = '✓ = On Vacation'
-        legend_vacation_cell.fill = vacation_color
-        legend_vacation_cell.font = vacation_font
-        legend_vacation_cell.border = thin_border
-        legend_vacation_cell.alignment = center_alignment
+        legend_vacation_cell.style = summary_row('vacation')
         
         print(f"✅ Added vacation details table with {len(sorted_vacation_employees)} employees and {len(date_range)} days")
     else:
@@ -1668,90 +2010,161 @@ def _create_sheet_name(spvr_code, spvr_name, is_multi_spvr, used_names):
     return final_name
 
 
+# Layout of the per-SPVR report sheets, shared by the in-memory and streaming exports
+REPORT_SHEET_COLUMNS = [
+    # AM-SPVR & Store Information
+    {'header': 'Date', 'width': 12},
+    {'header': 'SPVR Code', 'width': 12},
+    {'header': 'SPVR Name', 'width': 20},
+    {'header': 'Shop code', 'width': 12},
+    {'header': 'Shop Name', 'width': 25},
+    {'header': 'Area', 'width': 15},
+    {'header': 'Governorate', 'width': 15},
+    
+    # Sales Movement
+    {'header': 'Samsung', 'width': 35},
+    {'header': 'Competitors', 'width': 35},
+    
+    # Samsung Product Availability
+    {'header': 'TV', 'width': 30},
+    {'header': 'HA', 'width': 30},
+    
+    # Store Activities
+    {'header': 'SFO, PMT', 'width': 25},
+    {'header': 'Display', 'width': 25},
+    {'header': 'Store Issue', 'width': 25},
+    
+    # VOD & Result & Action
+    {'header': 'Complaints, Issues, Requirements', 'width': 40},
+    {'header': 'Store, Member', 'width': 40}
+]
+
+# Row 1: Main Headers
+REPORT_SHEET_MAIN_HEADERS = [
+    {'name': 'AM-SPVR & Store Information', 'start': 1, 'end': 7, 'color': AM_SPVR_COLOR},
+    {'name': 'Sales Movement', 'start': 8, 'end': 9, 'color': SALES_COLOR},
+    {'name': 'Samsung Product Availability', 'start': 10, 'end': 11, 'color': PRODUCT_COLOR},
+    {'name': 'Store Activities', 'start': 12, 'end': 14, 'color': ACTIVITIES_COLOR},
+    {'name': 'VOD', 'start': 15, 'end': 15, 'color': VOD_RESULT_COLOR},
+    {'name': 'Result & Action', 'start': 16, 'end': 16, 'color': VOD_RESULT_COLOR}
+]
+
+# Row 2: Sub Headers
+REPORT_SHEET_SUB_HEADERS = [
+    {'name': 'Member Data', 'start': 1, 'end': 3, 'color': AM_SPVR_COLOR},
+    {'name': 'Shop Data', 'start': 4, 'end': 7, 'color': AM_SPVR_COLOR},
+    {'name': 'Samsung & Competitors (LG, Araby, Others)', 'start': 8, 'end': 9, 'color': SALES_COLOR},
+    {'name': 'Ditributor, Key Model, Flag', 'start': 10, 'end': 10, 'color': PRODUCT_COLOR},
+    {'name': 'Ditributor, Key Model, Flag', 'start': 11, 'end': 11, 'color': PRODUCT_COLOR},
+    {'name': 'Samsung & Competitors', 'start': 12, 'end': 14, 'color': ACTIVITIES_COLOR},
+    {'name': 'Store & Dealer\'s Situation', 'start': 15, 'end': 15, 'color': BRIGHT_YELLOW},
+    {'name': 'What I did ?', 'start': 16, 'end': 16, 'color': BRIGHT_YELLOW}
+]
+
+# Row 3: Column header colors
+REPORT_SHEET_COLUMN_COLORS = [
+    AM_SPVR_COLOR, AM_SPVR_COLOR, AM_SPVR_COLOR, AM_SPVR_COLOR, AM_SPVR_COLOR, AM_SPVR_COLOR, AM_SPVR_COLOR,  # AM-SPVR & Store Information
+    SALES_COLOR, SALES_COLOR,  # Sales Movement
+    PRODUCT_COLOR, PRODUCT_COLOR,  # Samsung Product Availability
+    ACTIVITIES_COLOR, ACTIVITIES_COLOR, ACTIVITIES_COLOR,  # Store Activities (removed Sales)
+    BRIGHT_YELLOW,  # VOD - Combined Complaints, Issues, Requirements
+    BRIGHT_YELLOW   # Result & Action - Combined Store, Member
+]
+
+
+def _report_row_data(report, governorate):
+    """Map a report to the values of one export row (Egypt local time)"""
+    report_date_local = utc_to_egypt_time(report.report_date)
+    
+    return [
+        report_date_local.strftime('%Y-%m-%d') if report_date_local else '',
+        report.employee.employee_code,
+        report.employee.employee_name,
+        report.store.code,
+        report.store.name,
+        report.area.name,
+        governorate,
+        report.samsung_sales or '',
+        report.competitors_sales or '',
+        report.tv_availability or '',
+        report.ha_availability or '',
+        report.sfo_pmt or '',
+        report.display_activities or '',
+        report.store_issues or '',
+        report.complaints or '',  # Combined complaints, issues, requirements
+        report.actions_taken or ''  # Combined store, member
+    ]
+
+
+# Auto-fit limits of the report sheets
+REPORT_SHEET_MAX_COLUMN_WIDTH = 50
+REPORT_SHEET_MAX_ROW_HEIGHT = 100
+
+class _ReportSheetFit:
+    """Measure column widths and row heights while report rows are produced
+    
+    Each value is measured once, when its row is built, and the widest content
+    of every column is kept, so the sheet never has to be read back. This also
+    works for write-only sheets, where cells cannot be read after being written.
+    """
+    
+    def __init__(self, columns, min_height=20):
+        self.predefined_widths = [col_info['width'] for col_info in columns]
+        self.content_widths = [len(col_info['header']) + 3 for col_info in columns]  # Header width + margin
+        self.min_height = min_height
+    
+    def observe_lengths(self, lengths):
+        """Account for content lengths known in advance (None for unknown columns)"""
+        for col_idx, length in enumerate(lengths):
+            if length and length + 3 > self.content_widths[col_idx]:
+                self.content_widths[col_idx] = length + 3
+    
+    def measure(self, values):
+        """Measure one row: update the column widths and return the row height"""
+        max_lines = 1
+        
+        for col_idx, value in enumerate(values):
+            if not value:
+                continue
+            
+            content = str(value)
+            lines = content.split('\n')
+            
+            # For multi-line content, the longest line sets the width
+            content_width = max(len(line) for line in lines) + 3
+            if content_width > self.content_widths[col_idx]:
+                self.content_widths[col_idx] = content_width
+            
+            # Estimate number of lines based on content length and the predefined column width
+            chars_per_line = max(int((self.predefined_widths[col_idx] or 15) * 0.8), 10)  # Conservative estimate
+            estimated_lines = max(1, -(-len(content) // chars_per_line), len(lines))
+            max_lines = max(max_lines, estimated_lines)
+        
+        # Each line needs approximately 15 points, plus padding
+        calculated_height = max(self.min_height, max_lines * 15 + 5)
+        return min(calculated_height, REPORT_SHEET_MAX_ROW_HEIGHT)
+    
+    def column_widths(self):
+        """Fitted widths: content width capped, never below the predefined width"""
+        return [
+            max(min(content_width, REPORT_SHEET_MAX_COLUMN_WIDTH), predefined_width or 10)
+            for content_width, predefined_width in zip(self.content_widths, self.predefined_widths)
+        ]
+
+
 def _format_excel_sheet_enhanced(ws, reports, spvr_name, spvr_code):
     """Apply enhanced professional formatting matching the exact specified layout"""
-    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
     from openpyxl.utils import get_column_letter
     
-    # Define exact colors as specified
-    am_spvr_color = PatternFill(start_color='E2EFDA', end_color='E2EFDA', fill_type='solid')      # #E2EFDA - AM-SPVR & Store Information
-    sales_color = PatternFill(start_color='D9E1F2', end_color='D9E1F2', fill_type='solid')       # #D9E1F2 - Sales Movement
-    product_color = PatternFill(start_color='FCE4D6', end_color='FCE4D6', fill_type='solid')     # #FCE4D6 - Samsung Product Availability
-    activities_color = PatternFill(start_color='FFF2CC', end_color='FFF2CC', fill_type='solid')  # #FFF2CC - Store Activities
-    vod_result_color = PatternFill(start_color='D9E1F2', end_color='D9E1F2', fill_type='solid')  # #D9E1F2 - VOD & Result & Action
-    bright_yellow = PatternFill(start_color='FFFF00', end_color='FFFF00', fill_type='solid')     # #FFFF00 - Bright yellow for specific cells
-    
-    # Fonts
-    main_header_font = Font(name='Calibri', size=11, bold=True, color='000000')  # Larger for main headers
-    header_font = Font(name='Calibri', size=10, bold=True, color='000000')
-    data_font = Font(name='Calibri', size=9, bold=False, color='000000')
-    
-    # Alignment
-    center_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-    data_alignment = Alignment(horizontal='left', vertical='top', wrap_text=True)
-    
-    # Borders
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
+    # Styles are shared by every sheet of the workbook and applied by name
+    register_export_styles(ws.parent)
     
-    # Column definitions matching the exact specified structure
-    columns = [
-        # AM-SPVR & Store Information
-        {'header': 'Date', 'width': 12},
-        {'header': 'SPVR Code', 'width': 12},
-        {'header': 'SPVR Name', 'width': 20},
-        {'header': 'Shop code', 'width': 12},
-        {'header': 'Shop Name', 'width': 25},
-        {'header': 'Area', 'width': 15},
-        {'header': 'Governorate', 'width': 15},
-        
-        # Sales Movement
-        {'header': 'Samsung', 'width': 35},
-        {'header': 'Competitors', 'width': 35},
-        
-        # Samsung Product Availability
-        {'header': 'TV', 'width': 30},
-        {'header': 'HA', 'width': 30},
-        
-        # Store Activities
-        {'header': 'SFO, PMT', 'width': 25},
-        {'header': 'Display', 'width': 25},
-        {'header': 'Store Issue', 'width': 25},
-        
-        # VOD & Result & Action
-        {'header': 'Complaints, Issues, Requirements', 'width': 40},
-        {'header': 'Store, Member', 'width': 40}
-    ]
-    
-    # Define the exact structure as specified
-    # Row 1: Main Headers
-    main_headers = [
-        {'name': 'AM-SPVR & Store Information', 'start': 1, 'end': 7, 'color': am_spvr_color},
-        {'name': 'Sales Movement', 'start': 8, 'end': 9, 'color': sales_color},
-        {'name': 'Samsung Product Availability', 'start': 10, 'end': 11, 'color': product_color},
-        {'name': 'Store Activities', 'start': 12, 'end': 14, 'color': activities_color},
-        {'name': 'VOD', 'start': 15, 'end': 15, 'color': vod_result_color},
-        {'name': 'Result & Action', 'start': 16, 'end': 16, 'color': vod_result_color}
-    ]
-    
-    # Row 2: Sub Headers
-    sub_headers = [
-        {'name': 'Member Data', 'start': 1, 'end': 3, 'color': am_spvr_color},
-        {'name': 'Shop Data', 'start': 4, 'end': 7, 'color': am_spvr_color},
-        {'name': 'Samsung & Competitors (LG, Araby, Others)', 'start': 8, 'end': 9, 'color': sales_color},
-        {'name': 'Ditributor, Key Model, Flag', 'start': 10, 'end': 10, 'color': product_color},
-        {'name': 'Ditributor, Key Model, Flag', 'start': 11, 'end': 11, 'color': product_color},
-        {'name': 'Samsung & Competitors', 'start': 12, 'end': 14, 'color': activities_color},
-        {'name': 'Store & Dealer\'s Situation', 'start': 15, 'end': 15, 'color': bright_yellow},
-        {'name': 'What I did ?', 'start': 16, 'end': 16, 'color': bright_yellow}
-    ]
+    columns = REPORT_SHEET_COLUMNS
     
     # Write and format main headers (Row 1)
-    for header in main_headers:
+    for header in REPORT_SHEET_MAIN_HEADERS:
+        header_style = report_main_header(header['color'])
+        
         # Merge cells for main header
         if header['start'] == header['end']:
             cell = ws.cell(row=1, column=header['start'])
@@ -1760,20 +2173,15 @@ def _format_excel_sheet_enhanced(ws, reports, spvr_name, spvr_code):
             cell = ws.cell(row=1, column=header['start'])
         
         cell.value = header['name']
-        cell.font = main_header_font  # Use larger font for main headers
-        cell.fill = header['color']
-        cell.alignment = center_alignment
-        cell.border = thin_border
         
         # Apply formatting to all merged cells
         for col in range(header['start'], header['end'] + 1):
-            merged_cell = ws.cell(row=1, column=col)
-            merged_cell.border = thin_border
-            merged_cell.fill = header['color']
-            merged_cell.font = main_header_font  # Use larger font for main headers
+            ws.cell(row=1, column=col).style = header_style
     
     # Write and format sub headers (Row 2)
-    for sub_header in sub_headers:
+    for sub_header in REPORT_SHEET_SUB_HEADERS:
+        sub_header_style = report_header(sub_header['color'])
+        
         # Merge cells for sub header
         if sub_header['start'] == sub_header['end']:
             cell = ws.cell(row=2, column=sub_header['start'])
@@ -1782,88 +2190,32 @@ def _format_excel_sheet_enhanced(ws, reports, spvr_name, spvr_code):
             cell = ws.cell(row=2, column=sub_header['start'])
         
         cell.value = sub_header['name']
-        cell.font = header_font
-        cell.fill = sub_header['color']
-        cell.alignment = center_alignment
-        cell.border = thin_border
         
         # Apply formatting to all merged cells
         for col in range(sub_header['start'], sub_header['end'] + 1):
-            merged_cell = ws.cell(row=2, column=col)
-            merged_cell.border = thin_border
-            merged_cell.fill = sub_header['color']
-            merged_cell.font = header_font
+            ws.cell(row=2, column=col).style = sub_header_style
     
     # Write and format column headers (Row 3)
-    column_colors = [
-        am_spvr_color, am_spvr_color, am_spvr_color, am_spvr_color, am_spvr_color, am_spvr_color, am_spvr_color,  # AM-SPVR & Store Information
-        sales_color, sales_color,  # Sales Movement
-        product_color, product_color,  # Samsung Product Availability
-        activities_color, activities_color, activities_color,  # Store Activities (removed Sales)
-        bright_yellow,  # VOD - Combined Complaints, Issues, Requirements
-        bright_yellow   # Result & Action - Combined Store, Member
-    ]
-    
     for col_idx, col_info in enumerate(columns, 1):
         cell = ws.cell(row=3, column=col_idx)
         cell.value = col_info['header']
-        cell.font = header_font
-        cell.alignment = center_alignment
-        cell.border = thin_border
-        cell.fill = column_colors[col_idx - 1] if col_idx - 1 < len(column_colors) else am_spvr_color
+        cell.style = report_header(REPORT_SHEET_COLUMN_COLORS[col_idx - 1] if col_idx - 1 < len(REPORT_SHEET_COLUMN_COLORS) else AM_SPVR_COLOR)
         
         # Set column width
         ws.column_dimensions[get_column_letter(col_idx)].width = col_info['width']
     
-    # Write data rows
+    # Write data rows, measuring widths and heights as each row is produced
+    fit = _ReportSheetFit(columns, min_height=20)
+    governorates = get_governorate_resolver()
     for row_idx, report in enumerate(reports, 4):  # Start from row 4
-        # Get governorate from store, area, or user's branch assignments
-        governorate = ''
-        
-        # First try to get from store
-        if hasattr(report, 'store') and hasattr(report.store, 'governorate') and report.store.governorate:
-            governorate = report.store.governorate
-        # Then try to get from area
-        elif hasattr(report.area, 'governorate') and report.area.governorate:
-            governorate = report.area.governorate
-        # Finally try to get from user's branch assignments
-        else:
-            # Get the first branch with a governorate for this user
-            user_branches = Branch.query.filter_by(owner_user_id=report.user_id).all()
-            for branch in user_branches:
-                if branch.governorate:
-                    governorate = branch.governorate
-                    break
-        
-        # Data mapping with Egypt local time
-        report_date_local = utc_to_egypt_time(report.report_date)
-        
-        row_data = [
-            report_date_local.strftime('%Y-%m-%d') if report_date_local else '',
-            report.employee.employee_code,
-            report.employee.employee_name,
-            report.store.code,
-            report.store.name,
-            report.area.name,
-            governorate,
-            report.samsung_sales or '',
-            report.competitors_sales or '',
-            report.tv_availability or '',
-            report.ha_availability or '',
-            report.sfo_pmt or '',
-            report.display_activities or '',
-            report.store_issues or '',
-            report.complaints or '',  # Combined complaints, issues, requirements
-            report.actions_taken or ''  # Combined store, member
-        ]
+        row_data = _report_row_data(report, governorates.resolve(report))
+        ws.row_dimensions[row_idx].height = fit.measure(row_data)
         
         # Write data to cells
         for col_idx, value in enumerate(row_data, 1):
             cell = ws.cell(row=row_idx, column=col_idx)
             cell.value = value
-            cell.font = data_font
-            cell.border = thin_border
-            cell.alignment = data_alignment
+            cell.style = REPORT_DATA
     
     # Freeze panes (freeze first three rows)
     ws.freeze_panes = 'A4'
@@ -1873,11 +2225,9 @@ def _format_excel_sheet_enhanced(ws, reports, spvr_name, spvr_code):
     ws.row_dimensions[2].height = 25  # Sub headers
     ws.row_dimensions[3].height = 25  # Column headers
     
-    # Auto-adjust row heights for data rows based on content
-    _auto_fit_rows(ws, reports, min_height=20, start_row=4)  # Start from row 4 (data rows)
-    
-    # Auto-adjust column widths based on content
-    _auto_fit_columns(ws, reports, columns, start_row=4)
+    # Auto-adjust column widths based on the measured content
+    for col_idx, width in enumerate(fit.column_widths(), 1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = width
     
     # Add print settings
     ws.page_setup.orientation = ws.ORIENTATION_LANDSCAPE
@@ -1895,78 +2245,77 @@ def _format_excel_sheet_enhanced(ws, reports, spvr_name, spvr_code):
     return ws
 
 
-def _auto_fit_rows(ws, reports, min_height=20, start_row=4):
-    """Auto-fit row heights based on content with minimum height"""
-    from openpyxl.utils import get_column_letter
+def _write_excel_sheet_streaming(ws, reports, spvr_name, spvr_code, content_lengths=None):
+    """Write an SPVR sheet row by row into a write-only worksheet (same layout as the enhanced sheet)
+    
+    Column widths must be set before the first row is written, so they are
+    fitted from content_lengths (longest value per column, measured by the
+    database) instead of the rows themselves.
+    """
+    register_export_styles(ws.parent)
+    
+    fit = _ReportSheetFit(REPORT_SHEET_COLUMNS, min_height=20)
+    if content_lengths:
+        fit.observe_lengths(content_lengths)
+    for col_idx, width in enumerate(fit.column_widths(), 1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = width
     
-    # Calculate row heights for data rows
-    for row_idx in range(start_row, len(reports) + start_row):  # Start from specified row (data rows)
-        max_lines = 1
-        
-        # Check each cell in the row to find the maximum number of lines
-        for col_idx in range(1, ws.max_column + 1):
-            cell = ws.cell(row=row_idx, column=col_idx)
-            if cell.value:
-                # Estimate number of lines based on content length and column width
-                content = str(cell.value)
-                col_letter = get_column_letter(col_idx)
-                col_width = ws.column_dimensions[col_letter].width or 15
-                
-                # Estimate lines needed (rough calculation)
-                chars_per_line = max(int(col_width * 0.8), 10)  # Conservative estimate
-                estimated_lines = max(1, len(content) // chars_per_line + (1 if len(content) % chars_per_line > 0 else 0))
-                
-                # Account for explicit line breaks
-                if '\n' in content:
-                    explicit_lines = content.count('\n') + 1
-                    estimated_lines = max(estimated_lines, explicit_lines)
-                
-                max_lines = max(max_lines, estimated_lines)
-        
-        # Set row height based on content (with minimum height)
-        # Each line needs approximately 15 points, plus padding
-        calculated_height = max(min_height, max_lines * 15 + 5)
-        ws.row_dimensions[row_idx].height = min(calculated_height, 100)  # Cap at 100 points
-
-
-def _auto_fit_columns(ws, reports, columns, start_row=4):
-    """Auto-fit column widths based on content with margin"""
-    from openpyxl.utils import get_column_letter
+    ws.freeze_panes = 'A4'
     
-    # Calculate optimal width for each column
-    for col_idx, col_info in enumerate(columns, 1):
-        col_letter = get_column_letter(col_idx)
-        max_width = len(col_info['header']) + 3  # Start with header width + margin
-        
-        # Check header content
-        header_cell = ws.cell(row=3, column=col_idx)  # Column headers are now in row 3
-        if header_cell.value:
-            header_width = len(str(header_cell.value)) + 3
-            max_width = max(max_width, header_width)
-        
-        # Check data content
-        for row_idx in range(start_row, len(reports) + start_row):
-            cell = ws.cell(row=row_idx, column=col_idx)
-            if cell.value:
-                content = str(cell.value)
-                
-                # For multi-line content, use the longest line
-                if '\n' in content:
-                    lines = content.split('\n')
-                    content_width = max(len(line) for line in lines) + 3
-                else:
-                    content_width = len(content) + 3
-                
-                max_width = max(max_width, content_width)
-        
-        # Apply calculated width with reasonable limits
-        optimal_width = min(max_width, 50)  # Cap at 50 characters
-        
-        # Use the predefined width from columns config as minimum
-        predefined_width = col_info.get('width', 10)
-        optimal_width = max(optimal_width, predefined_width)  # Use predefined width as minimum
+    # Rows 1 and 2: merged main and sub headers
+    for row_idx, headers, header_style, height in (
+        (1, REPORT_SHEET_MAIN_HEADERS, report_main_header, 30),
+        (2, REPORT_SHEET_SUB_HEADERS, report_header, 25)
+    ):
+        ws.row_dimensions[row_idx].height = height
+        row_cells = []
+        for header in headers:
+            style_name = header_style(header['color'])
+            for col in range(header['start'], header['end'] + 1):
+                cell = WriteOnlyCell(ws, value=header['name'] if col == header['start'] else None)
+                cell.style = style_name
+                row_cells.append(cell)
+            if header['start'] != header['end']:
+                ws.merged_cells.add(
+                    f"{get_column_letter(header['start'])}{row_idx}:{get_column_letter(header['end'])}{row_idx}"
+                )
+        ws.append(row_cells)
+    
+    # Row 3: column headers
+    ws.row_dimensions[3].height = 25
+    row_cells = []
+    for col_idx, col_info in enumerate(REPORT_SHEET_COLUMNS):
+        cell = WriteOnlyCell(ws, value=col_info['header'])
+        cell.style = report_header(REPORT_SHEET_COLUMN_COLORS[col_idx])
+        row_cells.append(cell)
+    ws.append(row_cells)
+    
+    # Data rows are written as they are loaded
+    governorates = get_governorate_resolver()
+    row_idx = 3
+    for report in reports:
+        row_idx += 1
+        row_data = _report_row_data(report, governorates.resolve(report))
+        ws.row_dimensions[row_idx].height = fit.measure(row_data)
         
-        ws.column_dimensions[col_letter].width = optimal_width
+        row_cells = []
+        for value in row_data:
+            cell = WriteOnlyCell(ws, value=value)
+            cell.style = REPORT_DATA
+            row_cells.append(cell)
+        ws.append(row_cells)
+    
+    # Add print settings
+    ws.page_setup.orientation = 'landscape'
+    ws.page_setup.paperSize = '9'  # A4
+    ws.page_margins.left = 0.5
+    ws.page_margins.right = 0.5
+    ws.page_margins.top = 0.75
+    ws.page_margins.bottom = 0.75
+    ws.print_area = f'A1:{get_column_letter(len(REPORT_SHEET_COLUMNS))}{row_idx}'
+    
+    return ws
+
 
 # ============================================================================
 # COMMENTS & NOTIFICATIONS SYSTEM
@@ -2004,9 +2353,9 @@ def api_get_report_comments(report_id):
 @bp.route('/api/reports/<int:report_id>/comments', methods=['POST'])
 @admin_required
 def api_add_report_comment(report_id):
-    """Add a comment to a report"""
+    """Add a comment to a report (the owner's notifications are written in the background)"""
     try:
-        from app.models import ReportComment, Notification
+        from app.models import ReportComment
         
         report = Report.query.get_or_404(report_id)
         data = request.get_json()
@@ -2026,44 +2375,21 @@ def api_add_report_comment(report_id):
                 comment_text=comment_text
             )
             db.session.add(comment)
-            
-            # Create notification for new comment
-            admin_user = User.query.get(session['user_id'])
-            notification = Notification(
-                user_id=report.user_id,
-                title='تعليق جديد على تقريرك',
-                message=f'أضاف {admin_user.employee_name} تعليقاً على تقريرك',
-                notification_type='new_comment',
-                related_report_id=report_id
-            )
-            db.session.add(notification)
         
         # Update report status if provided
         new_status = data.get('status')
+        old_status = report.status
         if new_status and new_status in ['new', 'under_review', 'reviewed', 'needs_revision']:
-            old_status = report.status
             report.status = new_status
-            
-            # Create notification for status change
-            if old_status != new_status:
-                status_names = {
-                    'new': 'جديد',
-                    'under_review': 'تحت المراجعة',
-                    'reviewed': 'تمت المراجعة',
-                    'needs_revision': 'يحتاج تعديل'
-                }
-                
-                notification = Notification(
-                    user_id=report.user_id,
-                    title='تغيير حالة التقرير',
-                    message=f'تم تغيير حالة تقريرك من "{status_names.get(old_status, old_status)}" إلى "{status_names.get(new_status, new_status)}"',
-                    notification_type='status_change',
-                    related_report_id=report_id
-                )
-                db.session.add(notification)
         
         db.session.commit()
         
+        # Notify the report owner once the changes are committed
+        if comment:
+            notification_dispatcher.comment_added(report_id, [report.user_id], comment.commenter.employee_name)
+        if report.status != old_status:
+            notification_dispatcher.status_changed(report_id, [report.user_id], old_status, report.status)
+        
         response_data = {
             'success': True,
             'message': 'Updated successfully'
@@ -2151,43 +2477,26 @@ def api_delete_comment(comment_id):
 @bp.route('/api/reports/<int:report_id>/status', methods=['PUT'])
 @admin_required
 def api_update_report_status(report_id):
-    """Update report status and mark as read"""
+    """Update report status and mark as read (the owner is notified in the background)"""
     try:
-        from app.models import Notification
-        
         report = Report.query.get_or_404(report_id)
         data = request.get_json()
         
         new_status = data.get('status')
         mark_as_read = data.get('mark_as_read', False)
         
+        old_status = report.status
         if new_status and new_status in ['new', 'under_review', 'reviewed', 'needs_revision']:
-            old_status = report.status
             report.status = new_status
-            
-            # Create notification for status change
-            if old_status != new_status:
-                status_names = {
-                    'new': 'جديد',
-                    'under_review': 'تحت المراجعة',
-                    'reviewed': 'تمت المراجعة',
-                    'needs_revision': 'يحتاج تعديل'
-                }
-                
-                notification = Notification(
-                    user_id=report.user_id,
-                    title='تغيير حالة التقرير',
-                    message=f'تم تغيير حالة تقريرك من "{status_names.get(old_status, old_status)}" إلى "{status_names.get(new_status, new_status)}"',
-                    notification_type='status_change',
-                    related_report_id=report_id
-                )
-                db.session.add(notification)
         
         if mark_as_read:
             report.is_read = True
         
         db.session.commit()
         
+        if report.status != old_status:
+            notification_dispatcher.status_changed(report_id, [report.user_id], old_status, report.status)
+        
         return jsonify({
             'success': True,
             'message': 'Report status updated successfully',
@@ -2206,8 +2515,8 @@ def api_get_unread_notifications_count():
     try:
         from app.models import Notification
         
-        # For admin, count new reports as notifications
-        new_reports_count = Report.query.filter_by(is_read=False).count()
+        # For admin, count new reports as notifications (a counter lookup, see app/counters.py)
+        new_reports_count = get_counter(UNREAD_REPORTS)
         
         return jsonify({
             'success': True,
@@ -2217,27 +2526,92 @@ def api_get_unread_notifications_count():
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@bp.route('/api/notifications/stream', methods=['GET'])
+@admin_required
+def api_notifications_stream():
+    """Server-sent events stream of new and updated reports"""
+    return stream_response([ADMINS_CHANNEL], {'unread_count': get_counter(UNREAD_REPORTS)})
+
+# Time-bucketed series of the reports stats endpoint
+STATS_SERIES_INTERVALS = ('day', 'week')
+STATS_WEEK_START = 5  # Weeks start on Saturday (date.weekday())
+
+
+def _status_stats(counts, total=None):
+    """Stats payload from {status: count}"""
+    stats = {'total': sum(counts.values()) if total is None else total}
+    stats.update({status: counts.get(status, 0) for status in REPORT_STATUSES})
+    return stats
+
+
+def _report_hour():
+    """report_date truncated to the hour as 'YYYY-MM-DD HH' (UTC)"""
+    if db.session.get_bind().dialect.name == 'mysql':
+        return db.func.date_format(Report.report_date, '%Y-%m-%d %H')
+    return db.func.strftime('%Y-%m-%d %H', Report.report_date)
+
+
+def _status_series(report_query, interval):
+    """Status counts per Egypt-local day or week, and overall, from one grouped query
+    
+    Reports are grouped by UTC hour in the database and the hours are folded
+    into local days here, so buckets follow Egypt time including DST.
+    """
+    hour = _report_hour().label('hour')
+    rows = report_query.query().with_entities(
+        hour, Report.status, db.func.count(Report.id)
+    ).group_by(hour, Report.status).all()
+    
+    totals = {}
+    buckets = {}
+    for hour_value, status, count in rows:
+        period = utc_to_egypt_time(datetime.strptime(hour_value, '%Y-%m-%d %H')).date()
+        if interval == 'week':
+            period -= timedelta(days=(period.weekday() - STATS_WEEK_START) % 7)
+        bucket = buckets.setdefault(period, {})
+        bucket[status] = bucket.get(status, 0) + count
+        totals[status] = totals.get(status, 0) + count
+    
+    series = [{'period': period.isoformat(), **_status_stats(counts)} for period, counts in sorted(buckets.items())]
+    return totals, series
+
+
 @bp.route('/api/reports/stats', methods=['GET'])
 @admin_required
 def api_get_reports_stats():
-    """Get reports statistics by status"""
+    """Get reports statistics by status
+    
+    Accepts the reports listing filters, and series=day|week for per-period
+    counts in the same response.
+    """
     try:
-        total_reports = Report.query.count()
-        new_reports = Report.query.filter_by(status='new').count()
-        under_review = Report.query.filter_by(status='under_review').count()
-        reviewed = Report.query.filter_by(status='reviewed').count()
-        needs_revision = Report.query.filter_by(status='needs_revision').count()
+        report_query = ReportQuery.from_request(request.args)
+        interval = request.args.get('series', '').strip()
+        if interval and interval not in STATS_SERIES_INTERVALS:
+            return jsonify({
+                'success': False,
+                'message': f"series must be one of: {', '.join(STATS_SERIES_INTERVALS)}"
+            }), 400
         
-        return jsonify({
-            'success': True,
-            'stats': {
-                'total': total_reports,
-                'new': new_reports,
-                'under_review': under_review,
-                'reviewed': reviewed,
-                'needs_revision': needs_revision
-            }
-        })
+        if not interval and not report_query.is_filtered:
+            # Unfiltered totals are precomputed (see app/counters.py)
+            counters = get_counters()
+            counts = {status: counters[status_counter(status)] for status in REPORT_STATUSES}
+            return jsonify({'success': True, 'stats': _status_stats(counts, counters[TOTAL_REPORTS])})
+        
+        stats_key = f'stats:{report_query.cache_key}:{interval}'
+        cached = result_cache.get(REPORTS_NAMESPACE, stats_key)
+        if cached is not None:
+            return jsonify({'success': True, **cached})
+        
+        if interval:
+            counts, series = _status_series(report_query, interval)
+            result = {'stats': _status_stats(counts), 'interval': interval, 'series': series}
+        else:
+            result = {'stats': _status_stats(report_query.status_counts())}
+        
+        result_cache.set(REPORTS_NAMESPACE, stats_key, result)
+        return jsonify({'success': True, **result})
         
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
@@ -0,0 +1,142 @@
+"""
+Result Cache - cache serialized admin listing pages between polls
+
+Entries live in an in-process LRU cache with a TTL, or in a shared backend
+configured with RESULT_CACHE_BACKEND. Keys include a generation counter that
+is stored in the database and bumped in the same transaction as every write
+that changes a listing (report created, updated or deleted, comment added or
+removed), so every gunicorn worker stops serving stale pages at once.
+"""
+
+import importlib
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models import Report, ReportComment, CacheGeneration, db
+
+REPORTS_NAMESPACE = 'reports'
+
+
+class MemoryCacheBackend:
+    """Thread-safe in-process LRU cache with per-entry expiry"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class ResultCache:
+    """Generation-keyed cache of serialized results
+
+    A shared backend is any object with get(key) and set(key, value, ttl)
+    methods; RESULT_CACHE_BACKEND names its class as 'module:ClassName' and
+    the class is created with the app.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.ttl = 60
+        self.backend = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read settings from the app config and create the backend"""
+        self.enabled = app.config['RESULT_CACHE_ENABLED']
+        self.ttl = app.config['RESULT_CACHE_TTL']
+
+        backend_path = app.config.get('RESULT_CACHE_BACKEND')
+        if backend_path:
+            module_name, class_name = backend_path.split(':', 1)
+            self.backend = getattr(importlib.import_module(module_name), class_name)(app)
+        else:
+            self.backend = MemoryCacheBackend(app.config['RESULT_CACHE_MAX_ENTRIES'])
+
+        app.extensions['result_cache'] = self
+
+    def _key(self, namespace, key):
+        return f'{namespace}:{get_generation(namespace)}:{key}'
+
+    def get(self, namespace, key):
+        """Cached value for the current generation of a namespace, or None"""
+        if not self.enabled:
+            return None
+        return self.backend.get(self._key(namespace, key))
+
+    def set(self, namespace, key, value):
+        if self.enabled:
+            self.backend.set(self._key(namespace, key), value, self.ttl)
+
+
+def get_generation(namespace):
+    """Current generation of a namespace (one primary key lookup)"""
+    return db.session.query(CacheGeneration.value).filter_by(name=namespace).scalar() or 0
+
+
+def bump_generation(namespace, connection=None):
+    """Invalidate every cached result of a namespace
+
+    Runs on the given connection (or the session's) so the bump commits or
+    rolls back together with the write that caused it.
+    """
+    connection = connection or db.session.connection()
+    table = CacheGeneration.__table__
+
+    result = connection.execute(
+        table.update().where(table.c.name == namespace).values(value=table.c.value + 1)
+    )
+    if result.rowcount:
+        return
+
+    # First bump of this namespace
+    try:
+        with connection.begin_nested():
+            connection.execute(table.insert().values(name=namespace, value=1))
+    except IntegrityError:
+        connection.execute(
+            table.update().where(table.c.name == namespace).values(value=table.c.value + 1)
+        )
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_reports_generation(session, flush_context):
+    """Bump the reports generation when a flush touches reports or comments"""
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, ReportComment) or (
+            isinstance(instance, Report) and (instance not in session.dirty or session.is_modified(instance))
+        ):
+            bump_generation(REPORTS_NAMESPACE, session.connection())
+            return
+
+
+result_cache = ResultCache()
@@ -0,0 +1,345 @@
+"""
+Dashboard Counters - precomputed totals for the admin dashboard and report stats
+
+The dashboard used to run COUNT queries over users and reports, COUNT(DISTINCT)
+over branch codes and region names, and one COUNT per report status on every
+poll. The totals are now stored in the dashboard_counter table: report and
+user counts are adjusted in the same transaction as each flush that inserts,
+deletes or changes a report or a user, and the distinct branch/region counts
+are recounted when a flush touches a branch or a region. Reads are a single
+SELECT of a few rows; every counter is recounted from the source tables when
+it is older than DASHBOARD_COUNTERS_RECONCILE_INTERVAL, which also repairs
+drift from writes that bypass the ORM.
+
+The unread badges work the same way: the number of unread reports is a
+dashboard counter, and each user's unread notifications are kept in the
+notification_counter table, so reading a badge is a primary key lookup.
+"""
+
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models import User, Report, Branch, Region, Notification, DashboardCounter, NotificationCounter, db
+
+TOTAL_USERS = 'total_users'
+TOTAL_REPORTS = 'total_reports'
+TOTAL_BRANCHES = 'total_branches'
+TOTAL_REGIONS = 'total_regions'
+UNREAD_REPORTS = 'unread_reports'
+REPORT_STATUSES = ('new', 'under_review', 'reviewed', 'needs_revision')
+
+
+def status_counter(status):
+    """Counter name of the reports with a status"""
+    return f'status:{status}'
+
+
+def _is_unread(is_read):
+    """Whether an is_read value counts as unread (NULL does not, as in SQL)"""
+    return is_read is not None and not is_read
+
+
+COUNTER_NAMES = (
+    TOTAL_USERS, TOTAL_REPORTS, TOTAL_BRANCHES, TOTAL_REGIONS, UNREAD_REPORTS,
+    *(status_counter(status) for status in REPORT_STATUSES)
+)
+
+
+def _recount(connection, names):
+    """Count the given counters from the source tables"""
+    names = set(names)
+    values = {}
+
+    if TOTAL_USERS in names:
+        values[TOTAL_USERS] = connection.execute(
+            db.select(db.func.count(User.id)).where(User.is_admin == False)
+        ).scalar() or 0
+
+    if TOTAL_REPORTS in names:
+        values[TOTAL_REPORTS] = connection.execute(db.select(db.func.count(Report.id))).scalar() or 0
+
+    if UNREAD_REPORTS in names:
+        values[UNREAD_REPORTS] = connection.execute(
+            db.select(db.func.count(Report.id)).where(Report.is_read == False)
+        ).scalar() or 0
+
+    if names & {status_counter(status) for status in REPORT_STATUSES}:
+        by_status = dict(connection.execute(
+            db.select(Report.status, db.func.count(Report.id)).group_by(Report.status)
+        ).all())
+        for status in REPORT_STATUSES:
+            values[status_counter(status)] = by_status.get(status, 0)
+
+    # Unique branches by code and regions by name (not duplicates per supervisor)
+    if TOTAL_BRANCHES in names:
+        values[TOTAL_BRANCHES] = connection.execute(
+            db.select(db.func.count(db.func.distinct(Branch.code)))
+        ).scalar() or 0
+
+    if TOTAL_REGIONS in names:
+        values[TOTAL_REGIONS] = connection.execute(
+            db.select(db.func.count(db.func.distinct(Region.name)))
+        ).scalar() or 0
+
+    return {name: value for name, value in values.items() if name in names}
+
+
+def _store(connection, values, reconciled_at=None, model=DashboardCounter):
+    """Set counters to the given values, creating missing rows
+
+    values is keyed by the primary key of the model: the counter name, or the
+    user id for NotificationCounter.
+    """
+    table = model.__table__
+    key = table.primary_key.columns[0]
+
+    for name, value in values.items():
+        changes = {'value': value}
+        if reconciled_at is not None:
+            changes['reconciled_at'] = reconciled_at
+
+        result = connection.execute(table.update().where(key == name).values(**changes))
+        if result.rowcount:
+            continue
+
+        try:
+            with connection.begin_nested():
+                connection.execute(table.insert().values(
+                    {key.name: name, 'value': value, 'reconciled_at': reconciled_at or datetime.utcnow()}
+                ))
+        except IntegrityError:
+            connection.execute(table.update().where(key == name).values(**changes))
+
+
+def _adjust(connection, deltas, model=DashboardCounter):
+    """Add deltas to existing counters (missing rows are created by the next reconcile)"""
+    table = model.__table__
+    key = table.primary_key.columns[0]
+    for name, delta in deltas.items():
+        if delta:
+            connection.execute(
+                table.update().where(key == name).values(value=table.c.value + delta)
+            )
+
+
+def _recount_unread(connection, user_ids):
+    """Count the unread notifications of the given users"""
+    counts = dict(connection.execute(
+        db.select(Notification.user_id, db.func.count(Notification.id)).where(
+            Notification.user_id.in_(user_ids),
+            Notification.is_read == False
+        ).group_by(Notification.user_id)
+    ).all())
+    return {user_id: counts.get(user_id, 0) for user_id in user_ids}
+
+
+def refresh_counters(names=None, connection=None):
+    """Recount counters from the source tables
+
+    Call this after bulk writes that bypass the ORM (query.delete(), Core
+    inserts); it runs on the given connection (or the session's) so it commits
+    together with the write.
+    """
+    connection = connection or db.session.connection()
+    _store(connection, _recount(connection, names or COUNTER_NAMES), datetime.utcnow())
+
+
+def adjust_counters(deltas, connection=None):
+    """Add {name: delta} to counters after bulk writes whose effect is known"""
+    _adjust(connection or db.session.connection(), deltas)
+
+
+def refresh_unread_notifications(user_ids, connection=None):
+    """Recount the unread notification counters of users (see refresh_counters)"""
+    connection = connection or db.session.connection()
+    _store(connection, _recount_unread(connection, list(user_ids)), datetime.utcnow(), NotificationCounter)
+
+
+def adjust_unread_notifications(deltas, connection=None):
+    """Add {user_id: delta} to unread notification counters after bulk writes"""
+    _adjust(connection or db.session.connection(), deltas, NotificationCounter)
+
+
+def _read_counters(model, keys, recount, label):
+    """{key: value} of counter rows, reconciling missing and stale ones first"""
+    interval = current_app.config['DASHBOARD_COUNTERS_RECONCILE_INTERVAL']
+    stale_before = datetime.utcnow() - timedelta(seconds=interval)
+    key = model.__table__.primary_key.columns[0]
+
+    rows = db.session.execute(
+        db.select(key, model.value, model.reconciled_at).where(key.in_(keys))
+    ).all()
+    counters = {row[0]: row.value for row in rows}
+    stale = [name for name in keys if name not in counters]
+    stale.extend(row[0] for row in rows if row.reconciled_at < stale_before)
+
+    if stale:
+        try:
+            connection = db.session.connection()
+            values = recount(connection, stale)
+            _store(connection, values, datetime.utcnow(), model)
+            db.session.commit()
+            counters.update(values)
+            print(f"🔄 Reconciled {label}: {', '.join(sorted(str(name) for name in values))}")
+        except Exception as e:
+            db.session.rollback()
+            print(f"⚠️ Could not reconcile {label}: {e}")
+            counters.update(recount(db.session.connection(), stale))
+
+    return counters
+
+
+def get_counters():
+    """All dashboard counters as {name: value}, reconciling stale ones first"""
+    return _read_counters(DashboardCounter, COUNTER_NAMES, _recount, 'dashboard counters')
+
+
+def get_counter(name):
+    """One dashboard counter (a primary key lookup), reconciled first if stale"""
+    return _read_counters(DashboardCounter, [name], _recount, 'dashboard counters')[name]
+
+
+def get_unread_notifications(user_ids):
+    """{user_id: unread notifications}, reconciling missing and stale counters first"""
+    return _read_counters(NotificationCounter, list(user_ids), _recount_unread, 'unread notification counters')
+
+
+def _read_delta(history, name, deltas, recount):
+    """Adjust an unread counter for a changed is_read attribute"""
+    if not history.added:
+        return
+    if not history.deleted:
+        # Previous value was not loaded: recount instead
+        recount.add(name)
+        return
+    delta = _is_unread(history.added[0]) - _is_unread(history.deleted[0])
+    deltas[name] = deltas.get(name, 0) + delta
+
+
+def _report_deltas(session, deltas, recount):
+    """Adjust the report totals, the per-status counts and the unread reports"""
+    for report in session.new:
+        if isinstance(report, Report):
+            deltas[TOTAL_REPORTS] = deltas.get(TOTAL_REPORTS, 0) + 1
+            name = status_counter(report.status or 'new')
+            deltas[name] = deltas.get(name, 0) + 1
+            if _is_unread(report.is_read):
+                deltas[UNREAD_REPORTS] = deltas.get(UNREAD_REPORTS, 0) + 1
+
+    for report in session.deleted:
+        if isinstance(report, Report):
+            history = inspect(report).attrs.status.history
+            status = history.deleted[0] if history.deleted else report.status
+            deltas[TOTAL_REPORTS] = deltas.get(TOTAL_REPORTS, 0) - 1
+            name = status_counter(status)
+            deltas[name] = deltas.get(name, 0) - 1
+
+            history = inspect(report).attrs.is_read.history
+            if _is_unread(history.deleted[0] if history.deleted else report.is_read):
+                deltas[UNREAD_REPORTS] = deltas.get(UNREAD_REPORTS, 0) - 1
+
+    for report in session.dirty:
+        if isinstance(report, Report):
+            _read_delta(inspect(report).attrs.is_read.history, UNREAD_REPORTS, deltas, recount)
+
+            history = inspect(report).attrs.status.history
+            if not history.added:
+                continue
+            if not history.deleted:
+                # Previous status was not loaded: recount the statuses instead
+                recount.update(status_counter(status) for status in REPORT_STATUSES)
+                continue
+            old_name, new_name = status_counter(history.deleted[0]), status_counter(history.added[0])
+            deltas[old_name] = deltas.get(old_name, 0) - 1
+            deltas[new_name] = deltas.get(new_name, 0) + 1
+
+
+def _user_deltas(session, deltas, recount):
+    """Adjust the employee total (admins are not counted)"""
+    for user in session.new:
+        if isinstance(user, User) and not user.is_admin:
+            deltas[TOTAL_USERS] = deltas.get(TOTAL_USERS, 0) + 1
+
+    for user in session.deleted:
+        if isinstance(user, User):
+            history = inspect(user).attrs.is_admin.history
+            was_admin = history.deleted[0] if history.deleted else user.is_admin
+            if not was_admin:
+                deltas[TOTAL_USERS] = deltas.get(TOTAL_USERS, 0) - 1
+
+    for user in session.dirty:
+        if isinstance(user, User) and inspect(user).attrs.is_admin.history.has_changes():
+            recount.add(TOTAL_USERS)
+
+
+@event.listens_for(Session, 'after_flush')
+def _update_dashboard_counters(session, flush_context):
+    """Keep the counters in step with the reports, users, branches and regions of a flush"""
+    deltas = {}
+    recount = set()
+
+    _report_deltas(session, deltas, recount)
+    _user_deltas(session, deltas, recount)
+
+    # Distinct counts cannot be adjusted by +/-1: recount them (branch and
+    # region writes are rare admin actions)
+    for instance in (*session.new, *session.deleted, *session.dirty):
+        if isinstance(instance, Branch) and (
+            instance not in session.dirty or inspect(instance).attrs.code.history.has_changes()
+        ):
+            recount.add(TOTAL_BRANCHES)
+        elif isinstance(instance, Region) and (
+            instance not in session.dirty or inspect(instance).attrs.name.history.has_changes()
+        ):
+            recount.add(TOTAL_REGIONS)
+
+    if not deltas and not recount:
+        return
+
+    connection = session.connection()
+    _adjust(connection, {name: delta for name, delta in deltas.items() if name not in recount})
+    if recount:
+        table = DashboardCounter.__table__
+        existing = {row[0] for row in connection.execute(
+            db.select(table.c.name).where(table.c.name.in_(recount))
+        )}
+        # Only refresh existing rows; missing ones are created by the next reconcile
+        _store(connection, _recount(connection, recount & existing))
+
+
+@event.listens_for(Session, 'after_flush')
+def _update_unread_notifications(session, flush_context):
+    """Keep the per-user unread notification counters in step with a flush"""
+    deltas = {}
+    recount = set()
+
+    for notification in session.new:
+        if isinstance(notification, Notification) and _is_unread(notification.is_read):
+            deltas[notification.user_id] = deltas.get(notification.user_id, 0) + 1
+
+    for notification in session.deleted:
+        if isinstance(notification, Notification):
+            history = inspect(notification).attrs.is_read.history
+            if _is_unread(history.deleted[0] if history.deleted else notification.is_read):
+                deltas[notification.user_id] = deltas.get(notification.user_id, 0) - 1
+
+    for notification in session.dirty:
+        if isinstance(notification, Notification):
+            _read_delta(inspect(notification).attrs.is_read.history, notification.user_id, deltas, recount)
+
+    if not deltas and not recount:
+        return
+
+    connection = session.connection()
+    _adjust(connection, {user_id: delta for user_id, delta in deltas.items() if user_id not in recount},
+            NotificationCounter)
+    if recount:
+        table = NotificationCounter.__table__
+        existing = {row[0] for row in connection.execute(
+            db.select(table.c.user_id).where(table.c.user_id.in_(recount))
+        )}
+        _store(connection, _recount_unread(connection, recount & existing), model=NotificationCounter)
@@ -1,8 +1,16 @@
 from flask import render_template, request, redirect, url_for, session, flash, jsonify, send_file
 from app.employee import bp
 from app.models import User, Area, Store, Report, Region, Branch, db
+from app.search import matching_ids
+from app.pagination import encode_report_cursor, decode_report_cursor, page_limit, after_cursor
+from app.cache import bump_generation, REPORTS_NAMESPACE
+from app.counters import adjust_counters, adjust_unread_notifications, get_unread_notifications, status_counter, TOTAL_REPORTS, UNREAD_REPORTS
+from app.events import notification_events, stream_response, user_channel
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import contains_eager
 from functools import wraps
 from datetime import datetime, date
+import re
 import pytz
 from zoneinfo import ZoneInfo
 
@@ -96,6 +104,25 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+# Client-generated submission keys (e.g. crypto.randomUUID()) make retried
+# submissions safe: a key that was already saved replays the original result
+IDEMPOTENCY_KEY_PATTERN = re.compile(r'^[A-Za-z0-9_-]{8,50}$')
+
+def get_idempotency_key(payload):
+    """Submission key from the Idempotency-Key header or the payload, or None"""
+    key = (request.headers.get('Idempotency-Key') or payload.get('idempotency_key') or '').strip()
+    if key and not IDEMPOTENCY_KEY_PATTERN.match(key):
+        print(f"⚠️ Ignoring invalid idempotency key: {key[:64]}")
+        return None
+    return key or None
+
+def count_submitted_reports(user_id, idempotency_keys):
+    """Number of reports of the user already saved under these submission keys"""
+    return db.session.query(db.func.count(Report.id)).filter(
+        Report.user_id == user_id,
+        Report.idempotency_key.in_(idempotency_keys)
+    ).scalar() or 0
+
 @bp.route('/dashboard')
 @login_required
 def dashboard():
@@ -155,6 +182,13 @@ def create_report():
             print(f"📝 POST request received from user {user.employee_name}")
             print(f"📋 Form data keys: {list(request.form.keys())}")
             
+            # A retried submission that was already saved gets the original result
+            idempotency_key = get_idempotency_key(request.form)
+            if idempotency_key and count_submitted_reports(user.id, [idempotency_key]):
+                print(f"🔁 Submission {idempotency_key} was already saved, skipping")
+                flash('Report submitted successfully!', 'success')
+                return redirect(url_for('employee.dashboard'))
+            
             # Get form data - now using branch instead of area/store
             branch_id = request.form.get('branch_id')
             print(f"🏢 Branch ID received: {branch_id}")
@@ -282,14 +316,25 @@ def create_report():
                 store_issues=store_issues,
                 vod_notes=vod_notes,
                 complaints=complaints_issues_requirements,  # Combined field
-                actions_taken=store_member_combined  # Combined field
+                actions_taken=store_member_combined,  # Combined field
+                idempotency_key=idempotency_key
             )
             
             print(f"💾 Saving report for branch: {branch.name}")
             db.session.add(report)
-            db.session.commit()
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # A concurrent retry of the same submission was saved first
+                db.session.rollback()
+                if not (idempotency_key and count_submitted_reports(user.id, [idempotency_key])):
+                    raise
+                print(f"🔁 Submission {idempotency_key} was saved by a concurrent request")
+                flash('Report submitted successfully!', 'success')
+                return redirect(url_for('employee.dashboard'))
             
             print(f"✅ Report saved successfully with ID: {report.id}")
+            notification_events.wake()
             flash('Report submitted successfully!', 'success')
             return redirect(url_for('employee.dashboard'))
             
@@ -343,6 +388,21 @@ def submit_batch_reports():
         print(f"📝 Batch submission from user {user.employee_name}")
         print(f"📋 Number of reports: {len(reports_data)}")
         
+        # Each report of the batch is saved under '<key>:<index>'; a retried
+        # batch that was already saved gets the original result
+        idempotency_key = get_idempotency_key(data)
+        report_keys = [f'{idempotency_key}:{i}' for i in range(len(reports_data))] if idempotency_key else None
+        if report_keys:
+            submitted_count = count_submitted_reports(user.id, report_keys)
+            if submitted_count:
+                print(f"🔁 Batch {idempotency_key} was already saved ({submitted_count} reports), skipping")
+                return jsonify({
+                    'success': True,
+                    'message': f'Successfully submitted {submitted_count} reports',
+                    'count': submitted_count,
+                    'replayed': True
+                })
+        
         # Get report date from request or use business date
         report_date_str = data.get('report_date', '')
         egypt_tz = get_egypt_timezone()
@@ -385,65 +445,115 @@ def submit_batch_reports():
         print(f"⏰ Current time: {current_time.strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"📝 Report datetime: {report_date.strftime('%Y-%m-%d %H:%M:%S')}")
         
-        created_reports = []
+        # Resolve every branch (with its region), area and store of the batch
+        # with one set query each
+        branch_ids = set()
+        for report_data in reports_data:
+            try:
+                branch_ids.add(int(report_data.get('branch_id')))
+            except (TypeError, ValueError):
+                pass
+        
+        branches = {
+            branch.id: (branch, region_name)
+            for branch, region_name in db.session.query(Branch, Region.name).outerjoin(
+                Region, Branch.region_id == Region.id
+            ).filter(Branch.id.in_(branch_ids))
+        }
         
+        batch_branches = []
         for i, report_data in enumerate(reports_data):
             branch_id = report_data.get('branch_id')
             
             if not branch_id:
                 return jsonify({'success': False, 'message': f'No shop selected for report {i+1}'})
             
-            # Get branch and validate ownership
-            branch = Branch.query.get(branch_id)
-            if not branch:
+            # Validate branch and ownership
+            try:
+                branch, region_name = branches[int(branch_id)]
+            except (KeyError, TypeError, ValueError):
                 return jsonify({'success': False, 'message': f'Invalid shop for report {i+1}'})
             
             if branch.owner_user_id != user.id:
                 return jsonify({'success': False, 'message': f'You do not have access to shop in report {i+1}'})
             
-            # Create area and store for backward compatibility
-            region_name = branch.region.name if branch.region else 'Default Region'
-            area = Area.query.filter_by(name=region_name).first()
-            if not area:
-                area = Area(name=region_name)
-                db.session.add(area)
-                db.session.flush()
-            
-            store = Store.query.filter_by(code=branch.code).first()
+            batch_branches.append((branch, region_name or 'Default Region'))
+        
+        # Create missing areas and stores for backward compatibility (through
+        # the ORM so the search index picks up new stores)
+        region_names = {region_name for _, region_name in batch_branches}
+        areas = {area.name: area for area in Area.query.filter(Area.name.in_(region_names))}
+        missing_areas = [Area(name=name) for name in region_names if name not in areas]
+        if missing_areas:
+            db.session.add_all(missing_areas)
+            db.session.flush()
+            areas.update((area.name, area) for area in missing_areas)
+        
+        branch_codes = {branch.code for branch, _ in batch_branches}
+        stores = {store.code: store for store in Store.query.filter(Store.code.in_(branch_codes))}
+        missing_stores = []
+        for branch, region_name in batch_branches:
+            area = areas[region_name]
+            store = stores.get(branch.code)
             if not store:
                 store = Store(name=branch.name, code=branch.code, area_id=area.id)
-                db.session.add(store)
-                db.session.flush()
+                stores[branch.code] = store
+                missing_stores.append(store)
             else:
                 if store.name != branch.name:
                     store.name = branch.name
                 if store.area_id != area.id:
                     store.area_id = area.id
-            
-            # Create report
-            report = Report(
-                user_id=user.id,
-                area_id=area.id,
-                store_id=store.id,
-                report_date=report_date,
-                samsung_sales=report_data.get('samsung_sales', ''),
-                competitors_sales=report_data.get('competitors_sales', ''),
-                tv_availability=report_data.get('tv_availability', ''),
-                ha_availability=report_data.get('ha_availability', ''),
-                sfo_pmt=report_data.get('sfo_pmt', ''),
-                display_activities=report_data.get('display_activities', ''),
-                store_issues=report_data.get('store_issues', ''),
-                vod_notes=report_data.get('vod_notes', ''),
-                complaints=report_data.get('complaints_issues_requirements', ''),  # Combined field
-                actions_taken=report_data.get('store_member_combined', '')  # Combined field
-            )
-            
-            db.session.add(report)
-            created_reports.append(report)
+        if missing_stores:
+            db.session.add_all(missing_stores)
+        db.session.flush()
         
-        db.session.commit()
+        # Insert every report with one bulk statement
+        created_reports = []
+        for i, (report_data, (branch, region_name)) in enumerate(zip(reports_data, batch_branches)):
+            created_reports.append({
+                'user_id': user.id,
+                'area_id': areas[region_name].id,
+                'store_id': stores[branch.code].id,
+                'report_date': report_date,
+                'samsung_sales': report_data.get('samsung_sales', ''),
+                'competitors_sales': report_data.get('competitors_sales', ''),
+                'tv_availability': report_data.get('tv_availability', ''),
+                'ha_availability': report_data.get('ha_availability', ''),
+                'sfo_pmt': report_data.get('sfo_pmt', ''),
+                'display_activities': report_data.get('display_activities', ''),
+                'store_issues': report_data.get('store_issues', ''),
+                'vod_notes': report_data.get('vod_notes', ''),
+                'complaints': report_data.get('complaints_issues_requirements', ''),  # Combined field
+                'actions_taken': report_data.get('store_member_combined', ''),  # Combined field
+                'idempotency_key': report_keys[i] if report_keys else None
+            })
+        
+        try:
+            db.session.execute(Report.__table__.insert(), created_reports)
+            
+            # The bulk insert bypasses the flush events: update the dashboard
+            # counters and the admin listing cache here
+            adjust_counters({TOTAL_REPORTS: len(created_reports), status_counter('new'): len(created_reports),
+                             UNREAD_REPORTS: len(created_reports)})
+            bump_generation(REPORTS_NAMESPACE)
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent retry of the same batch was saved first
+            db.session.rollback()
+            submitted_count = count_submitted_reports(user.id, report_keys) if report_keys else 0
+            if not submitted_count:
+                raise
+            print(f"🔁 Batch {idempotency_key} was saved by a concurrent request")
+            return jsonify({
+                'success': True,
+                'message': f'Successfully submitted {submitted_count} reports',
+                'count': submitted_count,
+                'replayed': True
+            })
         
         print(f"✅ Successfully created {len(created_reports)} reports")
+        notification_events.wake()
         
         return jsonify({
             'success': True, 
@@ -637,7 +747,7 @@ def my_reports():
             query = query.filter(Report.report_date <= end_datetime)
     
     if store_name:
-        query = query.filter(Store.name.contains(store_name))
+        query = query.filter(Report.store_id.in_(matching_ids('store_name', store_name)))
     
     reports = query.order_by(Report.created_at.desc()).all()
     
@@ -657,10 +767,34 @@ def report_preview(report_id):
     
     return render_template('employee/report_preview.html', report=report)
 
+def _history_page(query, cursor, limit):
+    """One keyset page of a supervisor's reports, newest first
+    
+    Returns (reports, total, has_more, next_cursor) or None for an invalid
+    cursor; the total is only counted for the first page.
+    """
+    total = None
+    if not cursor:
+        total = query.with_entities(db.func.count(Report.id)).scalar() or 0
+    else:
+        position = decode_report_cursor(cursor)
+        if position is None:
+            return None
+        query = after_cursor(query, position)
+    
+    # Fetch one extra row to know whether another page exists
+    reports = query.options(contains_eager(Report.store), contains_eager(Report.area)).order_by(
+        Report.created_at.desc(), Report.id.desc()
+    ).limit(limit + 1).all()
+    has_more = len(reports) > limit
+    reports = reports[:limit]
+    
+    return reports, total, has_more, encode_report_cursor(reports[-1]) if has_more else None
+
 @bp.route('/api/my_reports')
 @login_required
 def api_my_reports():
-    """API endpoint for SPVR's own reports"""
+    """API endpoint for SPVR's own reports (paginated with cursor/limit)"""
     user = User.query.get(session['user_id'])
     
     # Get filter parameters
@@ -669,7 +803,7 @@ def api_my_reports():
     store_name = request.args.get('store_name', '')
     
     # Build query
-    query = Report.query.filter_by(user_id=user.id).join(Store)
+    query = Report.query.filter_by(user_id=user.id).join(Store).join(Area)
     
     # Fixed date filtering with proper timezone handling
     if start_date:
@@ -683,9 +817,13 @@ def api_my_reports():
             query = query.filter(Report.report_date <= end_datetime)
     
     if store_name:
-        query = query.filter(Store.name.contains(store_name))
+        query = query.filter(Report.store_id.in_(matching_ids('store_name', store_name)))
     
-    reports = query.order_by(Report.created_at.desc()).all()
+    limit = page_limit(request.args.get('limit'))
+    page = _history_page(query, request.args.get('cursor', ''), limit)
+    if page is None:
+        return jsonify({'success': False, 'message': 'Invalid cursor'}), 400
+    reports, total, has_more, next_cursor = page
     
     reports_data = []
     for report in reports:
@@ -702,7 +840,14 @@ def api_my_reports():
             'created_at': created_at_local.strftime('%Y-%m-%d %H:%M') if created_at_local else ''
         })
     
-    return jsonify(reports_data)
+    return jsonify({
+        'success': True,
+        'reports': reports_data,
+        'total': total,
+        'limit': limit,
+        'has_more': has_more,
+        'next_cursor': next_cursor
+    })
 
 @bp.route('/view_reports')
 @login_required
@@ -718,7 +863,7 @@ def view_reports():
 @bp.route('/api/view_reports')
 @login_required
 def api_view_reports():
-    """API endpoint for filtered reports view"""
+    """API endpoint for filtered reports view (paginated with cursor/limit)"""
     user = User.query.get(session['user_id'])
     
     # Get filter parameters
@@ -746,7 +891,14 @@ def api_view_reports():
         if branch and branch.owner_user_id == user.id:
             query = query.filter(Store.code == branch.code)
     
-    reports = query.order_by(Report.created_at.desc()).all()
+    limit = page_limit(request.args.get('limit'))
+    page = _history_page(query, request.args.get('cursor', ''), limit)
+    if page is None:
+        return jsonify({'success': False, 'message': 'Invalid cursor'}), 400
+    reports, total, has_more, next_cursor = page
+    
+    # Branch names of the user's shops by code, loaded once per request
+    branch_names = dict(db.session.query(Branch.code, Branch.name).filter(Branch.owner_user_id == user.id).all())
     
     reports_data = []
     for report in reports:
@@ -754,26 +906,27 @@ def api_view_reports():
         report_date_local = utc_to_egypt_time(report.report_date)
         created_at_local = utc_to_egypt_time(report.created_at)
         
-        # Find the branch for this report
-        branch_name = ''
-        branch = Branch.query.filter_by(code=report.store.code, owner_user_id=user.id).first()
-        if branch:
-            branch_name = branch.name
-        
         reports_data.append({
             'id': report.id,
             'store_name': report.store.name,
             'store_code': report.store.code,
             'area': report.area.name,
-            'branch_name': branch_name,
-            'spvr_name': report.employee.employee_name,
+            'branch_name': branch_names.get(report.store.code, ''),
+            'spvr_name': user.employee_name,
             'report_date': report_date_local.strftime('%Y-%m-%d') if report_date_local else 'N/A',
             'report_time': report_date_local.strftime('%H:%M') if report_date_local else 'N/A',
             'created_at': created_at_local.strftime('%Y-%m-%d %H:%M') if created_at_local else 'N/A',
             'submitted_time': created_at_local.strftime('%H:%M') if created_at_local else 'N/A'
         })
     
-    return jsonify(reports_data)
+    return jsonify({
+        'success': True,
+        'reports': reports_data,
+        'total': total,
+        'limit': limit,
+        'has_more': has_more,
+        'next_cursor': next_cursor
+    })
 
 @bp.route('/view_report/<int:report_id>')
 @login_required
@@ -834,12 +987,10 @@ def api_get_notifications():
 @bp.route('/api/notifications/unread-count', methods=['GET'])
 @login_required
 def api_get_unread_count():
-    """Get count of unread notifications"""
+    """Get count of unread notifications (a counter lookup, see app/counters.py)"""
     try:
-        from app.models import Notification
-        
-        user = User.query.get(session['user_id'])
-        unread_count = Notification.query.filter_by(user_id=user.id, is_read=False).count()
+        user_id = session['user_id']
+        unread_count = get_unread_notifications([user_id])[user_id]
         
         return jsonify({
             'success': True,
@@ -849,6 +1000,14 @@ def api_get_unread_count():
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@bp.route('/api/notifications/stream', methods=['GET'])
+@login_required
+def api_notifications_stream():
+    """Server-sent events stream of the current user's new notifications"""
+    user_id = session['user_id']
+    unread_count = get_unread_notifications([user_id])[user_id]
+    return stream_response([user_channel(user_id)], {'unread_count': unread_count})
+
 @bp.route('/api/notifications/<int:notification_id>/read', methods=['PUT'])
 @login_required
 def api_mark_notification_read(notification_id):
@@ -879,7 +1038,9 @@ def api_mark_all_notifications_read():
         from app.models import Notification
         
         user = User.query.get(session['user_id'])
-        Notification.query.filter_by(user_id=user.id, is_read=False).update({'is_read': True})
+        marked = Notification.query.filter_by(user_id=user.id, is_read=False).update({'is_read': True})
+        # The bulk update bypasses the flush events: update the unread counter here
+        adjust_unread_notifications({user.id: -marked})
         db.session.commit()
         
         return jsonify({
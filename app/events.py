@@ -0,0 +1,241 @@
+"""
+Notification Events - push new notifications and reports to open pages
+
+The navbar badge used to poll the unread-count endpoints every 30 seconds from
+every open tab. Pages now keep a server-sent events stream open
+(/employee/api/notifications/stream, /admin/api/notifications/stream) that is
+fed by an in-process publish/subscribe broker. A single relay thread per
+process reads the notifications and reports committed since its last pass (two
+primary-key range queries, whichever gunicorn worker wrote them), reads the
+unread counters once per batch of events and fans the events out to the local
+subscribers, so the database work does not grow with the number of open tabs.
+The notification dispatcher (app/notifier.py) and the report submission
+handlers wake the relay after they commit so their own worker's clients are
+notified immediately.
+"""
+
+import json
+import queue
+import threading
+import time
+
+from flask import Response, jsonify
+
+from app.counters import get_counter, get_unread_notifications, UNREAD_REPORTS
+from app.models import Notification, Report, db
+
+ADMINS_CHANNEL = 'admins'
+RELAY_BATCH_SIZE = 500  # Rows read per relay pass
+SUBSCRIBER_QUEUE_SIZE = 100  # Events buffered per stream before they are dropped
+
+
+def user_channel(user_id):
+    """Channel of one user's notifications"""
+    return f'user:{user_id}'
+
+
+class EventBroker:
+    """Fan events out to the streams open in this process"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.enabled = False
+        self.max_clients = 24
+        self.interval = 1.0
+        self.timeout = 300
+        self.heartbeat = 20
+        self._subscribers = {}  # channel -> set of queues
+        self._clients = 0
+        self._relay = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read settings from the app config"""
+        self.app = app
+        self.enabled = app.config['NOTIFICATION_STREAM_ENABLED']
+        self.max_clients = app.config['NOTIFICATION_STREAM_MAX_CLIENTS']
+        self.interval = app.config['NOTIFICATION_RELAY_INTERVAL']
+        self.timeout = app.config['NOTIFICATION_STREAM_TIMEOUT']
+        self.heartbeat = app.config['NOTIFICATION_STREAM_HEARTBEAT']
+        app.extensions['notification_events'] = self
+
+    def subscribe(self, channels):
+        """Queue receiving the events of the channels, or None at the stream limit
+
+        Each open stream holds a server thread, so streams are capped per
+        process; clients past the limit keep polling.
+        """
+        with self._lock:
+            if not self.enabled or self._clients >= self.max_clients:
+                return None
+
+            subscriber = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+            subscriber.channels = tuple(channels)
+            subscriber.closed = False
+            for channel in subscriber.channels:
+                self._subscribers.setdefault(channel, set()).add(subscriber)
+            self._clients += 1
+
+            # The relay runs only while this process has open streams
+            if self._relay is None:
+                self._relay = threading.Thread(target=self._run_relay, name='notification-relay', daemon=True)
+                self._relay.start()
+
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            if subscriber.closed:
+                return
+            subscriber.closed = True
+            for channel in subscriber.channels:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscriber)
+                    if not subscribers:
+                        del self._subscribers[channel]
+            self._clients -= 1
+
+    def publish(self, channel, event, data):
+        """Fan an event out to the subscribers of a channel (no database work)"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait((event, data))
+            except queue.Full:
+                pass  # Stalled client: it gets fresh counts when it reconnects
+
+    def wake(self):
+        """Run the relay now instead of at its next interval (call after commit)"""
+        self._wake.set()
+
+    def _subscribed_users(self, user_ids):
+        with self._lock:
+            return {user_id for user_id in user_ids if user_channel(user_id) in self._subscribers}
+
+    def _has_admins(self):
+        with self._lock:
+            return ADMINS_CHANNEL in self._subscribers
+
+    def _run_relay(self):
+        """Relay committed rows to the local subscribers until the last stream closes"""
+        with self.app.app_context():
+            try:
+                # Start from the newest rows: streams get the current counts when they open
+                last_notification_id = db.session.query(db.func.max(Notification.id)).scalar() or 0
+                last_report_id = db.session.query(db.func.max(Report.id)).scalar() or 0
+            except Exception as e:
+                print(f"⚠️ Notification relay could not start: {e}")
+                with self._lock:
+                    self._relay = None
+                return
+            finally:
+                db.session.remove()
+
+            while True:
+                with self._lock:
+                    if not self._clients:
+                        self._relay = None
+                        return
+
+                self._wake.wait(self.interval)
+                self._wake.clear()
+
+                try:
+                    last_notification_id = self._relay_notifications(last_notification_id)
+                    last_report_id = self._relay_reports(last_report_id)
+                except Exception as e:
+                    print(f"⚠️ Notification relay failed: {e}")
+                finally:
+                    db.session.remove()
+
+    def _relay_notifications(self, last_id):
+        """Publish the notifications created after last_id, returns the new last id"""
+        notifications = db.session.query(
+            Notification.id, Notification.user_id, Notification.title, Notification.message,
+            Notification.notification_type, Notification.related_report_id
+        ).filter(Notification.id > last_id).order_by(Notification.id).limit(RELAY_BATCH_SIZE).all()
+        if not notifications:
+            return last_id
+
+        users = self._subscribed_users({notification.user_id for notification in notifications})
+        unread_counts = get_unread_notifications(users) if users else {}
+
+        for notification in notifications:
+            if notification.user_id in users:
+                self.publish(user_channel(notification.user_id), 'notification', {
+                    'id': notification.id,
+                    'title': notification.title,
+                    'message': notification.message,
+                    'type': notification.notification_type,
+                    'related_report_id': notification.related_report_id,
+                    'unread_count': unread_counts.get(notification.user_id, 0)
+                })
+            if notification.related_report_id and notification.notification_type == 'status_change':
+                self.publish(ADMINS_CHANNEL, 'report_updated', {'report_id': notification.related_report_id})
+
+        return notifications[-1].id
+
+    def _relay_reports(self, last_id):
+        """Publish one event for the reports created after last_id, returns the new last id"""
+        new_count, max_id = db.session.query(
+            db.func.count(Report.id), db.func.max(Report.id)
+        ).filter(Report.id > last_id).one()
+        if not new_count:
+            return last_id
+
+        if self._has_admins():
+            self.publish(ADMINS_CHANNEL, 'new_report', {'count': new_count, 'unread_count': get_counter(UNREAD_REPORTS)})
+
+        return max_id
+
+
+def _format_event(event, data):
+    return f'event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n'
+
+
+def stream_response(channels, initial=None):
+    """Server-sent events response for the channels
+
+    initial is sent first as an 'unread' event. The stream closes after
+    NOTIFICATION_STREAM_TIMEOUT seconds and the browser reconnects by itself;
+    clients past the per-process limit get a 503 and keep polling.
+    """
+    broker = notification_events
+    subscriber = broker.subscribe(channels)
+    if subscriber is None:
+        return jsonify({'success': False, 'message': 'Notification stream unavailable'}), 503
+
+    # Release the database connection: the stream stays open for minutes
+    db.session.remove()
+
+    def generate():
+        yield f'retry: {int(broker.heartbeat * 1000)}\n\n'
+        if initial is not None:
+            yield _format_event('unread', initial)
+
+        closes_at = time.monotonic() + broker.timeout
+        while time.monotonic() < closes_at:
+            try:
+                event, data = subscriber.get(timeout=broker.heartbeat)
+            except queue.Empty:
+                yield ': keep-alive\n\n'
+                continue
+            yield _format_event(event, data)
+
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Stop nginx from buffering the stream
+    })
+    # Runs when the server closes the response, also if the client left early
+    response.call_on_close(lambda: broker.unsubscribe(subscriber))
+    return response
+
+
+notification_events = EventBroker()
@@ -0,0 +1,158 @@
+"""
+Excel Styles - named cell styles shared by all Excel export sheet builders
+
+Building Font/Fill/Border/Alignment objects for every cell makes openpyxl
+hash and deduplicate them one by one. Instead, every style used by the
+exports is defined once here, registered once per workbook with
+register_export_styles(), and applied to cells by name.
+"""
+
+from openpyxl.styles import NamedStyle, Font, PatternFill, Alignment, Border, Side
+
+# Section colors of the report sheets
+AM_SPVR_COLOR = 'E2EFDA'       # AM-SPVR & Store Information
+SALES_COLOR = 'D9E1F2'         # Sales Movement
+PRODUCT_COLOR = 'FCE4D6'       # Samsung Product Availability
+ACTIVITIES_COLOR = 'FFF2CC'    # Store Activities
+VOD_RESULT_COLOR = 'D9E1F2'    # VOD & Result & Action
+BRIGHT_YELLOW = 'FFFF00'       # Bright yellow for specific cells
+
+SECTION_COLORS = (AM_SPVR_COLOR, SALES_COLOR, PRODUCT_COLOR, ACTIVITIES_COLOR, VOD_RESULT_COLOR, BRIGHT_YELLOW)
+
+# Summary sheet colors
+SUMMARY_HEADER_COLOR = '4472C4'   # Blue header
+SUMMARY_ACTIVE_COLOR = 'E2EFDA'   # Light green for active employees
+SUMMARY_MISSING_COLOR = 'FFE6E6'  # Light red for missing employees
+SUMMARY_VACATION_COLOR = 'FFF2CC' # Light yellow for vacation
+
+# Style names
+REPORT_DATA = 'report_data'
+SUMMARY_TITLE = 'summary_title'
+SUMMARY_HEADER = 'summary_header'
+SUMMARY_DATE_HEADER = 'summary_date_header'
+SUMMARY_SECTION_TITLE = 'summary_section_title'
+SUMMARY_STATUS_ACTIVE = 'summary_status_active'
+SUMMARY_LABEL = 'summary_label'
+SUMMARY_VALUE = 'summary_value'
+SUMMARY_VALUE_VACATION = 'summary_value_vacation'
+SUMMARY_VALUE_MISSING = 'summary_value_missing'
+GRID_BLANK = 'grid_blank'
+GRID_VACATION_MARK = 'grid_vacation_mark'
+
+
+def report_main_header(color):
+    """Name of the row-1 header style for a section color"""
+    return f'report_main_header_{color}'
+
+
+def report_header(color):
+    """Name of the row-2/row-3 header style for a section color"""
+    return f'report_header_{color}'
+
+
+def summary_row(state, align='center'):
+    """Name of a summary row style: state is active, vacation or missing"""
+    return f'summary_{state}_{align}'
+
+
+def _solid_fill(color):
+    return PatternFill(start_color=color, end_color=color, fill_type='solid')
+
+
+_thin_border = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+_center_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+_left_alignment = Alignment(horizontal='left', vertical='center', wrap_text=True)
+_data_alignment = Alignment(horizontal='left', vertical='top', wrap_text=True)
+
+_data_font = Font(name='Calibri', size=10, bold=False, color='000000')
+_missing_font = Font(name='Calibri', size=10, bold=True, color='CC0000')  # Red bold for missing
+_vacation_font = Font(name='Calibri', size=10, bold=True, color='FF8C00')  # Orange bold for vacation
+
+
+def _build_style_definitions():
+    """Return {style name: NamedStyle keyword arguments} for every export style"""
+    definitions = {
+        REPORT_DATA: dict(
+            font=Font(name='Calibri', size=9, bold=False, color='000000'),
+            border=_thin_border, alignment=_data_alignment
+        ),
+        SUMMARY_TITLE: dict(
+            font=Font(name='Calibri', size=14, bold=True, color='000000'),
+            alignment=_center_alignment
+        ),
+        SUMMARY_HEADER: dict(
+            font=Font(name='Calibri', size=12, bold=True, color='FFFFFF'),
+            fill=_solid_fill(SUMMARY_HEADER_COLOR), border=_thin_border, alignment=_center_alignment
+        ),
+        SUMMARY_DATE_HEADER: dict(
+            font=Font(name='Calibri', size=9, bold=True, color='FFFFFF'),
+            fill=_solid_fill(SUMMARY_HEADER_COLOR), border=_thin_border, alignment=_center_alignment
+        ),
+        SUMMARY_SECTION_TITLE: dict(
+            font=Font(name='Calibri', size=12, bold=True, color='000000'),
+            alignment=_center_alignment
+        ),
+        SUMMARY_STATUS_ACTIVE: dict(
+            font=_data_font, fill=_solid_fill(SUMMARY_ACTIVE_COLOR),
+            border=_thin_border, alignment=_center_alignment
+        ),
+        SUMMARY_LABEL: dict(
+            font=Font(name='Calibri', size=10, bold=True), alignment=_left_alignment
+        ),
+        SUMMARY_VALUE: dict(font=_data_font, alignment=_center_alignment),
+        SUMMARY_VALUE_VACATION: dict(font=_vacation_font, alignment=_center_alignment),
+        SUMMARY_VALUE_MISSING: dict(font=_missing_font, alignment=_center_alignment),
+        GRID_BLANK: dict(
+            font=Font(name='Calibri', size=11), border=_thin_border, alignment=_center_alignment
+        ),
+        GRID_VACATION_MARK: dict(
+            font=Font(name='Calibri', size=12, bold=True, color='FF8C00'),
+            fill=_solid_fill(SUMMARY_VACATION_COLOR), border=_thin_border, alignment=_center_alignment
+        ),
+    }
+
+    for color in set(SECTION_COLORS):
+        definitions[report_main_header(color)] = dict(
+            font=Font(name='Calibri', size=11, bold=True, color='000000'),
+            fill=_solid_fill(color), border=_thin_border, alignment=_center_alignment
+        )
+        definitions[report_header(color)] = dict(
+            font=Font(name='Calibri', size=10, bold=True, color='000000'),
+            fill=_solid_fill(color), border=_thin_border, alignment=_center_alignment
+        )
+
+    # Summary rows: active employees, employees on vacation, missing employees
+    for state, font, fill in (
+        ('active', _data_font, None),
+        ('vacation', _vacation_font, _solid_fill(SUMMARY_VACATION_COLOR)),
+        ('missing', _missing_font, _solid_fill(SUMMARY_MISSING_COLOR))
+    ):
+        for align, alignment in (('center', _center_alignment), ('left', _left_alignment)):
+            style = dict(font=font, border=_thin_border, alignment=alignment)
+            if fill is not None:
+                style['fill'] = fill
+            definitions[summary_row(state, align)] = style
+
+    return definitions
+
+
+# Module-level registry, built once per process
+EXPORT_STYLE_DEFINITIONS = _build_style_definitions()
+
+
+def register_export_styles(wb):
+    """Register every export style on a workbook (once per workbook)
+
+    A NamedStyle object is bound to the workbook it is added to, so fresh
+    instances are created for each workbook from the shared definitions.
+    """
+    registered = set(wb.named_styles)
+    for name, definition in EXPORT_STYLE_DEFINITIONS.items():
+        if name not in registered:
+            wb.add_named_style(NamedStyle(name=name, **definition))
+    return wb
@@ -0,0 +1,185 @@
+"""
+Background Export Jobs - build large Excel exports outside the request cycle
+"""
+
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ExportJobManager:
+    """Run export jobs on a local worker pool and keep their files until they expire
+
+    Job state is stored as a small JSON file next to the generated workbook so
+    that any gunicorn worker can answer status and download requests, not only
+    the worker that runs the job.
+    """
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+
+    _job_id_pattern = re.compile(r'^[0-9a-f]{32}$')
+
+    def __init__(self, app=None):
+        self.app = None
+        self.folder = None
+        self.ttl = 3600
+        self.max_workers = 2
+        self._executor = None
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read settings from the app config and prepare the export folder"""
+        self.app = app
+        self.folder = app.config['EXPORT_JOB_FOLDER']
+        self.ttl = app.config['EXPORT_JOB_TTL']
+        self.max_workers = app.config['EXPORT_JOB_WORKERS']
+        os.makedirs(self.folder, exist_ok=True)
+        app.extensions['export_jobs'] = self
+
+    def _get_executor(self):
+        """Create the worker pool lazily so forked workers never share threads"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='export-job'
+                )
+            return self._executor
+
+    def submit(self, build_func, params, owner_id=None, filename='export.xlsx', kind='export'):
+        """Queue a job. build_func(params, path, progress) writes the file to path
+
+        Jobs of another kind (e.g. 'delete') use the same worker pool and
+        progress tracking but do not produce a file.
+        """
+        self.purge_expired()
+
+        job = {
+            'id': uuid.uuid4().hex,
+            'kind': kind,
+            'status': self.STATUS_QUEUED,
+            'owner_id': owner_id,
+            'params': params,
+            'filename': filename,
+            'progress': 0,
+            'processed': 0,
+            'total': None,
+            'error': None,
+            'created_at': time.time(),
+            'finished_at': None,
+            'expires_at': None
+        }
+        self._save(job)
+
+        self._get_executor().submit(self._run, job['id'], build_func, params)
+        return job
+
+    def _run(self, job_id, build_func, params):
+        """Execute a job inside an application context and record the outcome"""
+        path = self.file_path(job_id)
+        self._update(job_id, status=self.STATUS_RUNNING)
+
+        def progress(processed, total):
+            percent = int(processed * 100 / total) if total else 100
+            self._update(job_id, processed=processed, total=total, progress=min(percent, 99))
+
+        try:
+            with self.app.app_context():
+                build_func(params, path, progress)
+        except Exception as e:
+            print(f"❌ Background job {job_id} failed: {e}")
+            if os.path.exists(path):
+                os.remove(path)
+            now = time.time()
+            self._update(job_id, status=self.STATUS_FAILED, error=str(e),
+                         finished_at=now, expires_at=now + self.ttl)
+            return
+
+        now = time.time()
+        self._update(job_id, status=self.STATUS_COMPLETED, progress=100,
+                     finished_at=now, expires_at=now + self.ttl)
+        print(f"✅ Background job {job_id} completed")
+
+    def get(self, job_id, kind='export'):
+        """Return the job state, or None if it does not exist, has expired or is of another kind"""
+        if not self._job_id_pattern.match(job_id or ''):
+            return None
+
+        job = self._load(job_id)
+        if job and job['expires_at'] and job['expires_at'] < time.time():
+            self._remove(job_id)
+            return None
+        if job and job.get('kind', 'export') != kind:
+            return None
+        return job
+
+    def file_path(self, job_id):
+        """Path of the generated workbook for a job"""
+        return os.path.join(self.folder, f'{job_id}.xlsx')
+
+    def purge_expired(self):
+        """Delete expired jobs and their files, returns the number removed"""
+        removed = 0
+        now = time.time()
+
+        for name in os.listdir(self.folder):
+            if not name.endswith('.json'):
+                continue
+            job_id = name[:-len('.json')]
+            job = self._load(job_id)
+            if job and job['expires_at'] and job['expires_at'] < now:
+                self._remove(job_id)
+                removed += 1
+
+        return removed
+
+    def shutdown(self, wait=True):
+        """Stop the worker pool, optionally waiting for running jobs"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+    def _state_path(self, job_id):
+        return os.path.join(self.folder, f'{job_id}.json')
+
+    def _load(self, job_id):
+        try:
+            with open(self._state_path(job_id), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, job):
+        # Write to a temp file and rename so readers never see a partial file
+        tmp_path = f"{self._state_path(job['id'])}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(job, f)
+        os.replace(tmp_path, self._state_path(job['id']))
+
+    def _update(self, job_id, **changes):
+        with self._lock:
+            job = self._load(job_id)
+            if job is None:
+                return None
+            job.update(changes)
+            self._save(job)
+            return job
+
+    def _remove(self, job_id):
+        for path in (self.file_path(job_id), self._state_path(job_id)):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+export_jobs = ExportJobManager()
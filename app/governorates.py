@@ -0,0 +1,74 @@
+"""
+Governorate Resolution - resolve report governorates from prefetched maps
+
+A report's governorate comes from its store, or else from the first branch
+of its employee that has one. Instead of querying the branches for every
+report, the governorates are loaded in bulk into two maps that live for the
+duration of the request (or background job).
+"""
+
+from flask import g
+from app.models import User, Store, Branch, Report, db
+
+
+class GovernorateResolver:
+    """Request-scoped store -> governorate and user -> first governorate maps"""
+
+    def __init__(self):
+        self.store_governorates = {}
+        self.user_governorates = {}
+
+    def prefetch(self, store_ids, user_ids):
+        """Load the governorates of stores and users, given as ids or as subqueries of ids"""
+        if isinstance(store_ids, (list, set, tuple)):
+            store_ids = [store_id for store_id in store_ids if store_id not in self.store_governorates]
+        if isinstance(user_ids, (list, set, tuple)):
+            user_ids = [user_id for user_id in user_ids if user_id not in self.user_governorates]
+
+        if not isinstance(store_ids, list) or store_ids:
+            rows = db.session.query(Store.id, Store.governorate).filter(Store.id.in_(store_ids))
+            for store_id, governorate in rows:
+                self.store_governorates[store_id] = governorate or None
+
+        if not isinstance(user_ids, list) or user_ids:
+            # Outer join so users without a governorate are remembered as well
+            rows = db.session.query(User.id, Branch.governorate).outerjoin(
+                Branch,
+                db.and_(
+                    Branch.owner_user_id == User.id,
+                    Branch.governorate.isnot(None),
+                    Branch.governorate != ''
+                )
+            ).filter(User.id.in_(user_ids)).order_by(User.id, Branch.id)
+            for user_id, governorate in rows:
+                self.user_governorates.setdefault(user_id, governorate)
+
+    def prefetch_reports(self, reports):
+        """Load the governorates needed by already fetched reports (two queries)"""
+        self.prefetch({report.store_id for report in reports}, {report.user_id for report in reports})
+
+    def prefetch_query(self, query):
+        """Load the governorates needed by every report matched by a reports query (two queries)"""
+        self.prefetch(
+            query.with_entities(Report.store_id).scalar_subquery(),
+            query.with_entities(Report.user_id).scalar_subquery()
+        )
+
+    def resolve(self, report):
+        """Governorate of a report: its store's, else its employee's first branch's"""
+        if report.store_id not in self.store_governorates or report.user_id not in self.user_governorates:
+            # Reports that were not prefetched are loaded on demand
+            self.prefetch([report.store_id], [report.user_id])
+
+        return (
+            self.store_governorates.get(report.store_id)
+            or self.user_governorates.get(report.user_id)
+            or ''
+        )
+
+
+def get_governorate_resolver():
+    """Return the governorate resolver of the current request or app context"""
+    if 'governorate_resolver' not in g:
+        g.governorate_resolver = GovernorateResolver()
+    return g.governorate_resolver
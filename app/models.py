@@ -127,9 +127,22 @@ class Report(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Client-generated key of the submission, so retried submissions are saved once
+    idempotency_key = db.Column(db.String(64), nullable=True)
+    
     store = db.relationship('Store', backref='reports')
     area = db.relationship('Area', backref='reports')
     comments = db.relationship('ReportComment', backref='report', lazy=True, cascade='all, delete-orphan')
+    
+    # Indexes for the hot filter/sort paths (see migrations/add_report_indexes.py)
+    __table_args__ = (
+        db.Index('ix_report_user_id_report_date', 'user_id', 'report_date'),  # Employee views: user + date range
+        db.Index('ix_report_report_date', 'report_date'),  # Admin listing, preview and export date filters
+        db.Index('ix_report_created_at_id', 'created_at', 'id'),  # Newest-first ordering and keyset pagination
+        db.Index('ix_report_user_id_created_at_id', 'user_id', 'created_at', 'id'),  # Supervisor history pages
+        db.Index('ix_report_status_is_read', 'status', 'is_read'),  # Status and unread counters
+        db.Index('ux_report_user_idempotency_key', 'user_id', 'idempotency_key', unique=True),  # Replayed submissions (see migrations/add_report_idempotency_key.py)
+    )
 
 class ReportComment(db.Model):
     """تعليقات الإدارة على التقارير"""
@@ -157,6 +170,12 @@ class Notification(db.Model):
     # Relationships
     user = db.relationship('User', backref='notifications')
     related_report = db.relationship('Report', backref='notifications')
+    
+    # Indexes for the per-user lookups (see migrations/add_notification_indexes.py)
+    __table_args__ = (
+        db.Index('ix_notification_user_id_is_read_created_at', 'user_id', 'is_read', 'created_at'),  # Unread counts and mark-all-read
+        db.Index('ix_notification_user_id_created_at', 'user_id', 'created_at'),  # Newest-first notification list
+    )
 
 class AuditLog(db.Model):
     """سجل النشاطات الأمنية"""
@@ -169,4 +188,53 @@ class AuditLog(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     
     # Relationship
-    user = db.relationship('User', backref='audit_logs')
\ No newline at end of file
+    user = db.relationship('User', backref='audit_logs')
+
+class Vacation(db.Model):
+    """إجازات الموظفين"""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    vacation_date = db.Column(db.Date, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Relationship
+    user = db.relationship('User', backref='vacations')
+    
+    # One vacation per user per day
+    __table_args__ = (db.UniqueConstraint('user_id', 'vacation_date', name='unique_vacation_per_day'),)
+
+class SearchEntry(db.Model):
+    """القيم المطبّعة للبحث النصي (اسم/كود الموظف والفرع)"""
+    field = db.Column(db.String(30), primary_key=True)  # employee_name, employee_code, store_name, store_code
+    entity_id = db.Column(db.Integer, primary_key=True)  # User.id or Store.id
+    value = db.Column(db.String(200), nullable=False)  # Normalized value (see app/search.py)
+
+class SearchToken(db.Model):
+    """فهرس المقاطع الثلاثية (trigrams) للبحث النصي"""
+    id = db.Column(db.Integer, primary_key=True)
+    field = db.Column(db.String(30), nullable=False)
+    token = db.Column(db.String(12), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    
+    # Not unique: case/accent-insensitive collations may treat distinct trigrams as equal
+    __table_args__ = (
+        db.Index('ix_search_token_lookup', 'field', 'token', 'entity_id'),
+        db.Index('ix_search_token_entity', 'field', 'entity_id'),
+    )
+
+class CacheGeneration(db.Model):
+    """عدّادات إبطال ذاكرة التخزين المؤقت (تزداد مع كل تعديل على البيانات)"""
+    name = db.Column(db.String(50), primary_key=True)  # e.g. reports
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+class DashboardCounter(db.Model):
+    """عدّادات لوحة التحكم المحسوبة مسبقاً (تُحدَّث مع كل تعديل وتُطابق دورياً)"""
+    name = db.Column(db.String(50), primary_key=True)  # e.g. total_reports, status:new
+    value = db.Column(db.Integer, nullable=False, default=0)
+    reconciled_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # Last full recount
+
+class NotificationCounter(db.Model):
+    """عدد الإشعارات غير المقروءة لكل مستخدم (يُحدَّث مع كل تعديل ويُطابق دورياً)"""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)  # Unread notifications
+    reconciled_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # Last full recount
@@ -0,0 +1,195 @@
+"""
+Notification Dispatcher - write report notifications outside the request
+
+Commenting on a report or changing its status used to add one Notification
+row per event inside the request. The handlers now hand the event to the
+dispatcher and return; a background thread per process collects the events
+for NOTIFICATION_DISPATCH_INTERVAL seconds, coalesces bursts (several status
+changes of one report become a single "from the first to the last status"
+notification, and one that ends where it started is dropped; several comments
+become one notification) and writes each batch with one bulk insert, retrying
+a failed batch NOTIFICATION_DISPATCH_RETRIES times before dropping it.
+Pending events live in memory: they are flushed at exit, but lost if the
+process is killed.
+"""
+
+import atexit
+import threading
+import time
+from datetime import datetime
+
+from app.counters import adjust_unread_notifications
+from app.events import notification_events
+from app.models import User, Report, Notification, db
+
+STATUS_NAMES = {
+    'new': 'جديد',
+    'under_review': 'تحت المراجعة',
+    'reviewed': 'تمت المراجعة',
+    'needs_revision': 'يحتاج تعديل'
+}
+
+
+def _status_change_row(event):
+    """Notification row of coalesced status changes, None when the status is back where it started"""
+    if event['old_status'] == event['new_status']:
+        return None
+    old_name = STATUS_NAMES.get(event['old_status'], event['old_status'])
+    new_name = STATUS_NAMES.get(event['new_status'], event['new_status'])
+    return {
+        'title': 'تغيير حالة التقرير',
+        'message': f'تم تغيير حالة تقريرك من "{old_name}" إلى "{new_name}"'
+    }
+
+
+def _comment_row(event):
+    """Notification row of coalesced comments"""
+    names = '، '.join(event['commenters'])
+    if event['count'] == 1:
+        message = f'أضاف {names} تعليقاً على تقريرك'
+    else:
+        message = f'أضاف {names} {event["count"]} تعليقات على تقريرك'
+    return {'title': 'تعليق جديد على تقريرك', 'message': message}
+
+
+_RENDERERS = {
+    'status_change': _status_change_row,
+    'new_comment': _comment_row,
+}
+
+
+class NotificationDispatcher:
+    """Queue notification events in memory and insert them in batches"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.interval = 0.5
+        self.retries = 3
+        self.max_pending = 10000
+        self._pending = {}  # (user_id, notification_type, report_id) -> event, in arrival order
+        self._thread = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read settings from the app config"""
+        self.app = app
+        self.interval = app.config['NOTIFICATION_DISPATCH_INTERVAL']
+        self.retries = app.config['NOTIFICATION_DISPATCH_RETRIES']
+        self.max_pending = app.config['NOTIFICATION_DISPATCH_MAX_PENDING']
+        app.extensions['notification_dispatcher'] = self
+        atexit.register(self.flush)
+
+    def status_changed(self, report_id, user_ids, old_status, new_status):
+        """Queue a status change notification for the users"""
+        for user_id in user_ids:
+            self._enqueue((user_id, 'status_change', report_id),
+                          {'old_status': old_status, 'new_status': new_status},
+                          lambda event: event.update(new_status=new_status))
+
+    def comment_added(self, report_id, user_ids, commenter_name):
+        """Queue a new comment notification for the users"""
+        def merge(event):
+            event['count'] += 1
+            if commenter_name not in event['commenters']:
+                event['commenters'].append(commenter_name)
+
+        for user_id in user_ids:
+            self._enqueue((user_id, 'new_comment', report_id),
+                          {'count': 1, 'commenters': [commenter_name]},
+                          merge)
+
+    def _enqueue(self, key, event, merge):
+        """Add an event, or merge it into the pending event with the same key"""
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None:
+                merge(pending)
+                pending['created_at'] = datetime.utcnow()
+            elif len(self._pending) >= self.max_pending:
+                print(f"⚠️ Notification queue is full, dropped a {key[1]} notification")
+                return
+            else:
+                event['created_at'] = datetime.utcnow()
+                self._pending[key] = event
+
+            # The thread is started lazily so forked workers never share it
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='notification-dispatcher', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Insert the pending events now, returns the number of notifications written"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            rows = []
+            for (user_id, notification_type, report_id), event in pending.items():
+                row = _RENDERERS[notification_type](event)
+                if row is not None:
+                    row.update(user_id=user_id, notification_type=notification_type,
+                               related_report_id=report_id, is_read=False, created_at=event['created_at'])
+                    rows.append(row)
+            if not rows:
+                return 0
+
+            for attempt in range(1, self.retries + 1):
+                try:
+                    with self.app.app_context():
+                        try:
+                            written = self._insert(rows)
+                        finally:
+                            db.session.remove()
+                    break
+                except Exception as e:
+                    if attempt == self.retries:
+                        print(f"❌ Dropped {len(rows)} notifications after {attempt} attempts: {e}")
+                        return 0
+                    print(f"⚠️ Notification batch failed (attempt {attempt}), retrying: {e}")
+                    time.sleep(0.5 * 2 ** attempt)
+
+            # Let this worker's notification streams pick the rows up now
+            notification_events.wake()
+            return written
+
+    def _insert(self, rows):
+        """Insert one batch and its unread counter changes in one transaction, returns the rows written"""
+        try:
+            # Skip users and reports deleted since the events were queued
+            user_ids = {row['user_id'] for row in rows}
+            report_ids = {row['related_report_id'] for row in rows}
+            existing_users = {row[0] for row in db.session.query(User.id).filter(User.id.in_(user_ids))}
+            existing_reports = {row[0] for row in db.session.query(Report.id).filter(Report.id.in_(report_ids))}
+            rows = [row for row in rows
+                    if row['user_id'] in existing_users and row['related_report_id'] in existing_reports]
+            if not rows:
+                return 0
+
+            db.session.execute(Notification.__table__.insert(), rows)
+
+            # The bulk insert bypasses the flush events (see app/counters.py)
+            unread = {}
+            for row in rows:
+                unread[row['user_id']] = unread.get(row['user_id'], 0) + 1
+            adjust_unread_notifications(unread)
+            db.session.commit()
+            return len(rows)
+        except Exception:
+            db.session.rollback()
+            raise
+
+
+notification_dispatcher = NotificationDispatcher()
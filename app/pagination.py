@@ -0,0 +1,50 @@
+"""
+Keyset Pagination - newest-first pages of reports
+
+A page starts after the (created_at, id) position of the last report of the
+previous page instead of at an OFFSET, so every page costs the same on the
+(created_at, id) indexes however long the history is, and reports submitted
+while paging do not shift the following pages.
+"""
+
+import base64
+from datetime import datetime
+
+from app.models import Report, db
+
+REPORTS_PAGE_SIZE = 50
+REPORTS_MAX_PAGE_SIZE = 200
+
+
+def encode_report_cursor(report):
+    """Encode the (created_at, id) position of a report as an opaque cursor"""
+    raw = f"{report.created_at.isoformat()}|{report.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_report_cursor(cursor):
+    """Decode a cursor into (created_at, id), or None if it is invalid"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at_str, report_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at_str), int(report_id)
+    except (ValueError, TypeError):
+        return None
+
+
+def page_limit(value):
+    """Page size from a request argument, clamped to REPORTS_MAX_PAGE_SIZE"""
+    try:
+        limit = int(value or REPORTS_PAGE_SIZE)
+    except ValueError:
+        limit = REPORTS_PAGE_SIZE
+    return max(1, min(limit, REPORTS_MAX_PAGE_SIZE))
+
+
+def after_cursor(query, position):
+    """Restrict a newest-first reports query to the reports after a decoded cursor"""
+    cursor_created_at, cursor_id = position
+    return query.filter(db.or_(
+        Report.created_at < cursor_created_at,
+        db.and_(Report.created_at == cursor_created_at, Report.id < cursor_id)
+    ))
@@ -0,0 +1,108 @@
+"""
+Data Retention - move old notifications and audit logs out of the hot tables
+
+Read notifications older than NOTIFICATION_RETENTION_DAYS and audit log rows
+older than AUDIT_LOG_RETENTION_DAYS are appended to gzip-compressed JSON
+Lines files, one per table and month of creation
+(ARCHIVE_FOLDER/notification-2025-01.jsonl.gz), and deleted from the
+database. Rows are handled in batches of ARCHIVE_BATCH_SIZE: each batch is
+written and synced to its archive files before it is deleted in its own
+transaction, so a run can be stopped at any point without losing rows. A run
+interrupted between the two steps archives that batch again on the next run,
+so readers of the archive should keep one row per id.
+
+Unread notifications are never archived, so the unread counters are not
+affected. Run it from one scheduler at a time (see archive_old_records.py).
+"""
+
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from app.models import Notification, AuditLog, db
+
+
+def _archive_path(table_name, month):
+    return os.path.join(current_app.config['ARCHIVE_FOLDER'], f'{table_name}-{month}.jsonl.gz')
+
+
+def _serialize(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _append_to_archives(table, rows):
+    """Append rows to the monthly archive files of a table and sync them to disk"""
+    by_month = {}
+    for row in rows:
+        by_month.setdefault(row['created_at'].strftime('%Y-%m'), []).append(row)
+
+    for month, month_rows in by_month.items():
+        # Each append adds a gzip member; gzip readers read them as one stream
+        with open(_archive_path(table.name, month), 'ab') as f:
+            with gzip.GzipFile(fileobj=f, mode='ab') as archive:
+                for row in month_rows:
+                    line = json.dumps({key: _serialize(value) for key, value in row.items()}, ensure_ascii=False)
+                    archive.write(line.encode('utf-8') + b'\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def archive_rows(model, condition, batch_size=None, max_batches=None, dry_run=False):
+    """Archive and delete the rows of a model matching condition, returns the number archived
+
+    dry_run only counts the matching rows.
+    """
+    table = model.__table__
+    if dry_run:
+        return db.session.query(db.func.count(table.c.id)).filter(condition).scalar() or 0
+
+    batch_size = batch_size or current_app.config['ARCHIVE_BATCH_SIZE']
+    os.makedirs(current_app.config['ARCHIVE_FOLDER'], exist_ok=True)
+
+    archived = 0
+    batches = 0
+    last_id = 0
+    while max_batches is None or batches < max_batches:
+        rows = [dict(row._mapping) for row in db.session.execute(
+            db.select(table).where(condition, table.c.id > last_id).order_by(table.c.id).limit(batch_size)
+        )]
+        if not rows:
+            break
+        last_id = rows[-1]['id']
+
+        try:
+            _append_to_archives(table, rows)
+            db.session.execute(table.delete().where(table.c.id.in_([row['id'] for row in rows])))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        archived += len(rows)
+        batches += 1
+
+    return archived
+
+
+def run_retention(notification_days=None, audit_days=None, batch_size=None, max_batches=None, dry_run=False):
+    """Archive old read notifications and audit logs, returns {table name: rows archived}"""
+    config = current_app.config
+    notification_days = config['NOTIFICATION_RETENTION_DAYS'] if notification_days is None else notification_days
+    audit_days = config['AUDIT_LOG_RETENTION_DAYS'] if audit_days is None else audit_days
+    now = datetime.utcnow()
+
+    results = {}
+    results[Notification.__tablename__] = archive_rows(
+        Notification,
+        db.and_(Notification.is_read == True, Notification.created_at < now - timedelta(days=notification_days)),
+        batch_size, max_batches, dry_run
+    )
+    results[AuditLog.__tablename__] = archive_rows(
+        AuditLog,
+        AuditLog.created_at < now - timedelta(days=audit_days),
+        batch_size, max_batches, dry_run
+    )
+    return results
@@ -0,0 +1,187 @@
+"""
+Text Search - indexed substring search on employee and store names and codes
+
+The report filters used to compile to LIKE '%term%' on the user and store
+tables, which cannot use an index. Each searchable value is now normalized
+(case, Arabic letter forms, diacritics, digits) and split into trigrams that
+are stored in the search_token table; a search takes the candidates of the
+rarest trigram of the term and confirms them against the normalized value. The tables are
+kept up to date by mapper events, so every code path that writes a User or a
+Store maintains the index. Terms shorter than a trigram scan the (small)
+normalized value table instead.
+"""
+
+import re
+import unicodedata
+
+from sqlalchemy import event, inspect
+
+from app.models import User, Store, SearchEntry, SearchToken, db
+
+TOKEN_SIZE = 3
+TOKEN_PROBE_COUNT = 8  # Trigrams of a term probed to find the rarest one
+TOKEN_PROBE_LIMIT = 1000  # Postings counted per probe
+
+# Searchable fields: name -> (model, attribute)
+SEARCH_FIELDS = {
+    'employee_name': (User, 'employee_name'),
+    'employee_code': (User, 'employee_code'),
+    'store_name': (Store, 'name'),
+    'store_code': (Store, 'code'),
+}
+
+# Arabic letter variants folded to one form so spelling variants match
+_ARABIC_FOLDING = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي', 'ئ': 'ي',
+    'ؤ': 'و',
+    'ة': 'ه',
+    'ـ': None,  # Tatweel
+    '٠': '0', '١': '1', '٢': '2', '٣': '3', '٤': '4',
+    '٥': '5', '٦': '6', '٧': '7', '٨': '8', '٩': '9',
+})
+_ARABIC_DIACRITICS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed]')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize(text):
+    """Normalize a value or search term for matching"""
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKC', str(text)).casefold()
+    text = _ARABIC_DIACRITICS.sub('', text).translate(_ARABIC_FOLDING)
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+def tokenize(normalized):
+    """Distinct trigrams of a normalized value"""
+    return {normalized[i:i + TOKEN_SIZE] for i in range(len(normalized) - TOKEN_SIZE + 1)}
+
+
+def _posting_size(field, token):
+    """Number of values containing a trigram, counted up to TOKEN_PROBE_LIMIT"""
+    postings = db.select(SearchToken.id).where(
+        SearchToken.field == field,
+        SearchToken.token == token
+    ).limit(TOKEN_PROBE_LIMIT).subquery()
+    return db.session.execute(db.select(db.func.count()).select_from(postings)).scalar()
+
+
+def matching_ids(field, term):
+    """Select the ids of the users/stores whose field contains the term
+
+    Returns a SELECT to be used with in_(), e.g.
+    Report.user_id.in_(matching_ids('employee_name', name)).
+    """
+    normalized = normalize(term)
+    query = db.select(SearchEntry.entity_id).where(
+        SearchEntry.field == field,
+        SearchEntry.value.contains(normalized, autoescape=True)
+    )
+
+    tokens = sorted(tokenize(normalized))
+    if tokens:
+        # Candidates come from the posting list of the rarest trigram (probed on
+        # the token index) and are confirmed against the normalized value
+        step = max(1, len(tokens) // TOKEN_PROBE_COUNT)
+        rarest = min(tokens[::step], key=lambda token: _posting_size(field, token))
+        candidates = db.select(SearchToken.entity_id).where(
+            SearchToken.field == field,
+            SearchToken.token == rarest
+        )
+        query = query.where(SearchEntry.entity_id.in_(candidates))
+
+    return query
+
+
+def _index_rows(field, entity_id, value):
+    """Entry and token rows for one value"""
+    normalized = normalize(value)[:200]
+    entry = {'field': field, 'entity_id': entity_id, 'value': normalized}
+    tokens = [{'field': field, 'token': token, 'entity_id': entity_id} for token in tokenize(normalized)]
+    return entry, tokens
+
+
+def _delete_rows(connection, field, entity_ids):
+    for model in (SearchEntry, SearchToken):
+        connection.execute(model.__table__.delete().where(
+            model.__table__.c.field == field,
+            model.__table__.c.entity_id.in_(entity_ids)
+        ))
+
+
+def _index_values(connection, field, values):
+    """Replace the indexed values of a field: values is {entity_id: value}"""
+    if not values:
+        return
+
+    _delete_rows(connection, field, list(values))
+
+    entries = []
+    tokens = []
+    for entity_id, value in values.items():
+        entry, entity_tokens = _index_rows(field, entity_id, value)
+        entries.append(entry)
+        tokens.extend(entity_tokens)
+
+    connection.execute(SearchEntry.__table__.insert(), entries)
+    if tokens:
+        connection.execute(SearchToken.__table__.insert(), tokens)
+
+
+def rebuild_search_index(batch_size=1000):
+    """Rebuild the whole search index from the users and stores tables"""
+    connection = db.session.connection()
+    connection.execute(SearchEntry.__table__.delete())
+    connection.execute(SearchToken.__table__.delete())
+
+    indexed = 0
+    for field, (model, attribute) in SEARCH_FIELDS.items():
+        last_id = 0
+        while True:
+            rows = db.session.query(model.id, getattr(model, attribute)).filter(
+                model.id > last_id
+            ).order_by(model.id).limit(batch_size).all()
+            if not rows:
+                break
+            _index_values(connection, field, dict(rows))
+            indexed += len(rows)
+            last_id = rows[-1][0]
+
+    db.session.commit()
+    return indexed
+
+
+def remove_from_index(model, entity_ids, connection=None):
+    """Drop users or stores from the index after bulk deletes that bypass the ORM"""
+    connection = connection or db.session.connection()
+    for field, (field_model, _) in SEARCH_FIELDS.items():
+        if field_model is model:
+            _delete_rows(connection, field, list(entity_ids))
+
+
+def _register_index_events(model, fields):
+    """Keep the index of a model's fields in sync on insert, update and delete"""
+
+    @event.listens_for(model, 'after_insert')
+    def index_after_insert(mapper, connection, target):
+        for field, attribute in fields:
+            _index_values(connection, field, {target.id: getattr(target, attribute)})
+
+    @event.listens_for(model, 'after_update')
+    def index_after_update(mapper, connection, target):
+        state = inspect(target)
+        for field, attribute in fields:
+            if state.attrs[attribute].history.has_changes():
+                _index_values(connection, field, {target.id: getattr(target, attribute)})
+
+    @event.listens_for(model, 'after_delete')
+    def index_after_delete(mapper, connection, target):
+        for field, _ in fields:
+            _delete_rows(connection, field, [target.id])
+
+
+for _model in (User, Store):
+    _register_index_events(_model, [
+        (field, attribute) for field, (model, attribute) in SEARCH_FIELDS.items() if model is _model
+    ])
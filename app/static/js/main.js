@@ -157,6 +157,39 @@ function debounce(func, wait) {
     };
 }
 
+// Key of one report submission: the server saves a submission once per key,
+// so retries after a dropped connection do not create duplicate reports
+function newSubmissionKey() {
+    if (window.crypto && crypto.randomUUID) {
+        return crypto.randomUUID();
+    }
+    return Date.now().toString(36) + '-' + Math.random().toString(36).slice(2, 12);
+}
+
+// Listen to a notification stream: handlers maps event names to callbacks.
+// onUnavailable runs when streams are not supported or the server refused the
+// stream (e.g. too many open streams), so the page can fall back to polling
+function openNotificationStream(url, handlers, onUnavailable) {
+    if (!window.EventSource) {
+        onUnavailable();
+        return null;
+    }
+    
+    const source = new EventSource(url);
+    Object.keys(handlers).forEach(function(event) {
+        source.addEventListener(event, function(e) {
+            handlers[event](JSON.parse(e.data));
+        });
+    });
+    source.onerror = function() {
+        // The browser reconnects by itself unless the stream was refused
+        if (source.readyState === EventSource.CLOSED) {
+            onUnavailable();
+        }
+    };
+    return source;
+}
+
 // Export function for reports
 function exportToExcel(data, filename) {
     var csv = convertToCSV(data);
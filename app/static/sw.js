@@ -39,8 +39,82 @@ self.addEventListener('install', event => {
   );
 });
 
+// Report submissions that carry an Idempotency-Key are queued when the network
+// fails and replayed by background sync; the key makes replays safe
+const OUTBOX_DB = 'daily-report-outbox';
+const OUTBOX_STORE = 'submissions';
+const QUEUED_SUBMISSION_PATHS = ['/employee/submit-batch-reports'];
+
+function openOutbox() {
+  return new Promise((resolve, reject) => {
+    const request = indexedDB.open(OUTBOX_DB, 1);
+    request.onupgradeneeded = () => request.result.createObjectStore(OUTBOX_STORE, { keyPath: 'key' });
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+  });
+}
+
+async function outboxTransaction(mode, action) {
+  const db = await openOutbox();
+  return new Promise((resolve, reject) => {
+    const transaction = db.transaction(OUTBOX_STORE, mode);
+    const result = action(transaction.objectStore(OUTBOX_STORE));
+    transaction.oncomplete = () => resolve(result.result);
+    transaction.onerror = () => reject(transaction.error);
+  });
+}
+
+async function submitOrQueue(request) {
+  const queued = request.clone();
+  try {
+    return await fetch(request);
+  } catch (error) {
+    const key = queued.headers.get('Idempotency-Key');
+    const body = await queued.text();
+    await outboxTransaction('readwrite', store => store.put({
+      key: key,
+      url: queued.url,
+      contentType: queued.headers.get('Content-Type'),
+      body: body
+    }));
+    if (self.registration.sync) {
+      await self.registration.sync.register('background-sync');
+    }
+    console.log('Submission queued for background sync:', key);
+    return new Response(JSON.stringify({
+      success: false,
+      queued: true,
+      message: 'No connection. Your reports were saved on this device and will be sent automatically when you are back online.'
+    }), { status: 202, headers: { 'Content-Type': 'application/json' } });
+  }
+}
+
+async function replayQueuedSubmissions() {
+  const submissions = await outboxTransaction('readonly', store => store.getAll());
+  for (const submission of submissions) {
+    const response = await fetch(submission.url, {
+      method: 'POST',
+      credentials: 'same-origin',
+      headers: { 'Content-Type': submission.contentType, 'Idempotency-Key': submission.key },
+      body: submission.body
+    });
+    // Server errors are retried by the next sync; anything else is final
+    if (response.status < 500) {
+      await outboxTransaction('readwrite', store => store.delete(submission.key));
+      console.log('Queued submission sent:', submission.key, response.status);
+    }
+  }
+}
+
 // Fetch event - serve from cache when offline
 self.addEventListener('fetch', event => {
+  const request = event.request;
+  if (request.method === 'POST' && request.headers.get('Idempotency-Key') &&
+      QUEUED_SUBMISSION_PATHS.includes(new URL(request.url).pathname)) {
+    event.respondWith(submitOrQueue(request));
+    return;
+  }
+  
   event.respondWith(
     caches.match(event.request)
       .then(response => {
@@ -79,7 +153,7 @@ self.addEventListener('activate', event => {
 self.addEventListener('sync', event => {
   if (event.tag === 'background-sync') {
     console.log('Background sync triggered');
-    // Handle offline form submissions here if needed
+    event.waitUntil(replayQueuedSubmissions());
   }
 });
 
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Archive Old Records
+Moves read notifications older than NOTIFICATION_RETENTION_DAYS and audit log
+rows older than AUDIT_LOG_RETENTION_DAYS into monthly .jsonl.gz files in
+ARCHIVE_FOLDER and deletes them from the database (see app/retention.py)
+
+Usage:
+    python archive_old_records.py [--dry-run] [--max-batches N]
+                                  [--notification-days N] [--audit-days N]
+
+Schedule it daily from one host only, e.g. with cron:
+    30 3 * * * cd /app && python archive_old_records.py --max-batches 200
+"""
+
+import argparse
+import time
+
+from app import create_app
+from app.retention import run_retention
+
+
+def main():
+    """Parse the options and run one retention pass"""
+    parser = argparse.ArgumentParser(description='Archive old notifications and audit logs')
+    parser.add_argument('--dry-run', action='store_true', help='only count the rows that would be archived')
+    parser.add_argument('--max-batches', type=int, help='stop each table after this many batches')
+    parser.add_argument('--notification-days', type=int, help='override NOTIFICATION_RETENTION_DAYS')
+    parser.add_argument('--audit-days', type=int, help='override AUDIT_LOG_RETENTION_DAYS')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        print("\n" + "="*60)
+        print(f"🗄️ ARCHIVE OLD RECORDS{' (dry run)' if args.dry_run else ''}")
+        print("="*60)
+
+        started = time.perf_counter()
+        results = run_retention(
+            notification_days=args.notification_days,
+            audit_days=args.audit_days,
+            max_batches=args.max_batches,
+            dry_run=args.dry_run
+        )
+
+        verb = 'would be archived' if args.dry_run else 'archived'
+        for table_name, count in results.items():
+            print(f"   {table_name}: {count} rows {verb}")
+        if not args.dry_run:
+            print(f"\n📁 Archive folder: {app.config['ARCHIVE_FOLDER']}")
+        print(f"✅ Done in {time.perf_counter() - started:.1f}s")
+        print("="*60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Excel Export Styles Benchmark
+Compares per-cell style objects with the shared named styles on a 50k-row export
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, Border, Side
+
+from app.excel_styles import register_export_styles, REPORT_DATA
+
+ROWS = 50000
+COLUMNS = 16
+
+
+def sample_row(row_idx):
+    """One synthetic report row with the same shape as the export rows"""
+    return [f'Value {row_idx}-{col_idx} ' * (1 + col_idx % 4) for col_idx in range(COLUMNS)]
+
+
+def style_per_cell(cell):
+    """The previous approach: new style objects for every cell"""
+    cell.font = Font(name='Calibri', size=9, bold=False, color='000000')
+    cell.border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    cell.alignment = Alignment(horizontal='left', vertical='top', wrap_text=True)
+
+
+def style_by_name(cell):
+    """The shared registry: one named style applied by name"""
+    cell.style = REPORT_DATA
+
+
+def run(apply_style, write_only, rows):
+    """Build and save a workbook, returns (build seconds, save seconds)"""
+    wb = Workbook(write_only=write_only)
+    register_export_styles(wb)
+    ws = wb.create_sheet(title='Reports') if write_only else wb.active
+
+    started = time.perf_counter()
+    for row_idx in range(1, rows + 1):
+        values = sample_row(row_idx)
+        if write_only:
+            row_cells = []
+            for value in values:
+                cell = WriteOnlyCell(ws, value=value)
+                apply_style(cell)
+                row_cells.append(cell)
+            ws.append(row_cells)
+        else:
+            for col_idx, value in enumerate(values, 1):
+                cell = ws.cell(row=row_idx, column=col_idx, value=value)
+                apply_style(cell)
+    built = time.perf_counter()
+
+    fd, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(fd)
+    try:
+        wb.save(path)
+    finally:
+        os.remove(path)
+
+    return built - started, time.perf_counter() - built
+
+
+def main():
+    """Run every combination and print cells per second"""
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    cells = rows * COLUMNS
+
+    print("\n" + "="*60)
+    print(f"📊 EXCEL STYLES BENCHMARK - {rows} rows x {COLUMNS} columns")
+    print("="*60)
+
+    for write_only in (False, True):
+        mode = 'write-only' if write_only else 'regular'
+        for label, apply_style in (('per-cell styles', style_per_cell), ('named styles', style_by_name)):
+            build_time, save_time = run(apply_style, write_only, rows)
+            total_time = build_time + save_time
+            print(f"   {mode:<11} {label:<16} "
+                  f"build {build_time:6.2f}s  save {save_time:6.2f}s  "
+                  f"{cells / total_time:>10,.0f} cells/sec")
+
+    print("="*60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Report Indexes Benchmark
+Compares query plans and latencies of the hot report queries with and without
+the Report indexes, on a seeded dataset (1M reports by default)
+
+Usage:
+    python benchmark_report_indexes.py [reports]
+
+Runs against BENCHMARK_DATABASE_URL, or a scratch SQLite file in instance/
+(recreated on every run) when it is not set. DATABASE_URL is ignored, and the
+script refuses to run if the report table already has rows: it seeds data and
+drops and recreates the indexes it measures.
+"""
+
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+SCRATCH_DATABASE = os.path.join(basedir, 'instance', 'benchmark_indexes.db')
+
+# Never fall back to DATABASE_URL, which points at the real database
+BENCHMARK_DATABASE_URL = os.environ.get('BENCHMARK_DATABASE_URL')
+os.environ['DATABASE_URL'] = BENCHMARK_DATABASE_URL or f"sqlite:///{SCRATCH_DATABASE}"
+
+from sqlalchemy import inspect, text
+from werkzeug.security import generate_password_hash
+
+from app import create_app, db
+from app.models import User, Area, Store, Report
+
+REPORTS = 1000000
+USERS = 200
+STORES = 2000
+DAYS = 730
+BATCH_SIZE = 10000
+RUNS = 5
+
+# The indexes measured (and dropped/recreated) by this benchmark; other
+# Report indexes, such as the unique idempotency key, are left alone
+BENCHMARK_INDEXES = (
+    'ix_report_user_id_report_date',
+    'ix_report_report_date',
+    'ix_report_created_at_id',
+    'ix_report_status_is_read',
+)
+
+# Representative queries of the admin listing, preview/export and employee views
+QUERIES = [
+    ('Admin listing, newest first', """
+        SELECT report.id FROM report
+        ORDER BY report.created_at DESC, report.id DESC
+        LIMIT 50
+    """),
+    ('Admin listing, one week', """
+        SELECT report.id FROM report
+        WHERE report.report_date >= :week_start AND report.report_date <= :end
+        ORDER BY report.created_at DESC, report.id DESC
+        LIMIT 50
+    """),
+    ('Export count, one month', """
+        SELECT COUNT(report.id) FROM report
+        WHERE report.report_date >= :month_start AND report.report_date <= :end
+    """),
+    ('Employee history, one month', """
+        SELECT report.id FROM report
+        WHERE report.user_id = :user_id
+          AND report.report_date >= :month_start AND report.report_date <= :end
+        ORDER BY report.report_date DESC
+    """),
+    ('Unread new reports count', """
+        SELECT COUNT(report.id) FROM report
+        WHERE report.status = 'new' AND report.is_read = :false
+    """),
+]
+
+
+def seed(total_reports):
+    """Insert users, stores and total_reports reports into the empty database"""
+    print(f"⏳ Creating {USERS} users and {STORES} stores...")
+    password_hash = generate_password_hash('benchmark')
+    db.session.execute(User.__table__.insert(), [
+        {'employee_name': f'مشرف {i}', 'employee_code': f'BENCH{i}', 'username': f'bench_{i}',
+         'password_hash': password_hash, 'is_admin': False, 'created_at': datetime.utcnow()}
+        for i in range(USERS)
+    ])
+    area = Area(name='Benchmark Area')
+    db.session.add(area)
+    db.session.flush()
+    db.session.execute(Store.__table__.insert(), [
+        {'name': f'Store {i}', 'code': f'BENCH-S{i}', 'area_id': area.id, 'created_at': datetime.utcnow()}
+        for i in range(STORES)
+    ])
+    db.session.commit()
+
+    user_ids = [row[0] for row in db.session.query(User.id).filter(User.username.like('bench_%'))]
+    store_ids = [row[0] for row in db.session.query(Store.id).filter(Store.code.like('BENCH-S%'))]
+    area_id = Area.query.filter_by(name='Benchmark Area').first().id
+
+    print(f"⏳ Seeding {total_reports} reports...")
+    started = time.perf_counter()
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    statuses = ['new', 'under_review', 'reviewed', 'needs_revision']
+
+    for offset in range(0, total_reports, BATCH_SIZE):
+        rows = []
+        for _ in range(min(BATCH_SIZE, total_reports - offset)):
+            report_date = now - timedelta(days=rng.randrange(DAYS), seconds=rng.randrange(86400))
+            rows.append({
+                'user_id': rng.choice(user_ids),
+                'store_id': rng.choice(store_ids),
+                'area_id': area_id,
+                'report_date': report_date,
+                'status': rng.choice(statuses),
+                'is_read': rng.random() < 0.9,
+                'samsung_sales': 'Benchmark report',
+                'created_at': report_date,
+                'updated_at': report_date
+            })
+        db.session.execute(Report.__table__.insert(), rows)
+        db.session.commit()
+        print(f"   {offset + len(rows)}/{total_reports}", end='\r')
+
+    print(f"\n✅ Seeded in {time.perf_counter() - started:.1f}s")
+
+
+def query_params():
+    """Parameters shared by the benchmark queries"""
+    end = datetime.utcnow()
+    user_id = db.session.query(User.id).filter(User.username == 'bench_0').scalar()
+    return {
+        'end': end,
+        'week_start': end - timedelta(days=7),
+        'month_start': end - timedelta(days=30),
+        'user_id': user_id,
+        'false': False
+    }
+
+
+def explain(sql, params):
+    """Return the query plan as a single line"""
+    dialect = db.engine.dialect.name
+    prefix = 'EXPLAIN QUERY PLAN ' if dialect == 'sqlite' else 'EXPLAIN '
+    rows = db.session.execute(text(prefix + sql), params).fetchall()
+
+    if dialect == 'sqlite':
+        return ' | '.join(row[-1] for row in rows)
+    if dialect == 'mysql':
+        # table, type, key, rows, Extra
+        return ' | '.join(f"{row[2]}: type={row[4]} key={row[6]} rows={row[9]} {row[11] or ''}" for row in rows)
+    return ' | '.join(str(row) for row in rows)
+
+
+def measure(sql, params):
+    """Median latency in milliseconds over RUNS executions"""
+    timings = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        db.session.execute(text(sql), params).fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def run_queries(params):
+    """Plan and latency of every benchmark query"""
+    results = {}
+    for name, sql in QUERIES:
+        latency = measure(sql, params)
+        results[name] = (explain(sql, params), latency)
+    return results
+
+
+def main():
+    """Seed the dataset, then compare the queries without and with the indexes"""
+    total_reports = int(sys.argv[1]) if len(sys.argv) > 1 else REPORTS
+
+    if not BENCHMARK_DATABASE_URL and os.path.exists(SCRATCH_DATABASE):
+        os.remove(SCRATCH_DATABASE)
+
+    app = create_app()
+    with app.app_context():
+        print("\n" + "="*60)
+        print(f"📊 REPORT INDEXES BENCHMARK - {db.engine.url.render_as_string(hide_password=True)}")
+        print("="*60)
+
+        db.create_all()
+        if db.session.query(db.func.count(Report.id)).scalar():
+            print("❌ The report table already has rows: run the benchmark on an empty scratch database")
+            sys.exit(1)
+
+        seed(total_reports)
+        params = query_params()
+        indexes = [index for index in Report.__table__.indexes if index.name in BENCHMARK_INDEXES]
+
+        # Index changes go through the session connection and are committed so
+        # the following queries are planned against the new schema
+        existing = {index['name'] for index in inspect(db.engine).get_indexes('report')}
+        for index in indexes:
+            if index.name in existing:
+                index.drop(db.session.connection())
+        db.session.commit()
+        print("\n⏳ Running queries without indexes...")
+        without_indexes = run_queries(params)
+
+        print("⏳ Creating indexes...")
+        started = time.perf_counter()
+        for index in indexes:
+            index.create(db.session.connection())
+        db.session.commit()
+        print(f"✅ Indexes created in {time.perf_counter() - started:.1f}s")
+        print("⏳ Running queries with indexes...")
+        with_indexes = run_queries(params)
+
+        print("\n" + "="*60)
+        for name, _ in QUERIES:
+            plan_before, latency_before = without_indexes[name]
+            plan_after, latency_after = with_indexes[name]
+            print(f"\n🔍 {name}")
+            print(f"   without indexes: {latency_before:9.2f} ms   {plan_before}")
+            print(f"   with indexes:    {latency_after:9.2f} ms   {plan_after}")
+            print(f"   speedup:         {latency_before / max(latency_after, 0.001):9.1f}x")
+        print("\n" + "="*60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Users API Benchmark
+Checks that GET /admin/api/users runs a constant number of queries however
+many supervisors, regions and branches there are (500 supervisors with 10k
+branches by default), and compares it with the previous per-user queries
+
+Usage:
+    python benchmark_users_api.py [supervisors] [branches_per_supervisor]
+
+Runs against BENCHMARK_DATABASE_URL, or a scratch SQLite file in instance/
+(recreated on every run) when it is not set. DATABASE_URL is ignored, and the
+script refuses to run if the user table already has rows: it seeds data.
+"""
+
+import os
+import sys
+import time
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+SCRATCH_DATABASE = os.path.join(basedir, 'instance', 'benchmark_users.db')
+
+# Never fall back to DATABASE_URL, which points at the real database
+BENCHMARK_DATABASE_URL = os.environ.get('BENCHMARK_DATABASE_URL')
+os.environ['DATABASE_URL'] = BENCHMARK_DATABASE_URL or f"sqlite:///{SCRATCH_DATABASE}"
+
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash
+
+from app import create_app, db
+from app.models import User, Region, Branch
+
+SUPERVISORS = 500
+BRANCHES_PER_SUPERVISOR = 20
+REGIONS_PER_SUPERVISOR = 4
+
+
+class QueryCounter:
+    """Count the statements sent to the database"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __enter__(self):
+        event.listen(db.engine, 'before_cursor_execute', self._count)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(db.engine, 'before_cursor_execute', self._count)
+
+    def _count(self, *args, **kwargs):
+        self.count += 1
+
+
+def seed(supervisors, branches_per_supervisor):
+    """Create the supervisors, with their regions and branches, that are not there yet"""
+    existing = User.query.filter(User.username.like('bench_users_%'), User.is_admin == False).count()
+    if existing >= supervisors:
+        print(f"✅ Using existing dataset: {existing} supervisors")
+        return
+
+    print(f"⏳ Creating {supervisors - existing} supervisors with {branches_per_supervisor} branches each...")
+    started = time.perf_counter()
+    password_hash = generate_password_hash('benchmark')
+
+    for index in range(existing, supervisors):
+        user = User(
+            employee_name=f'مشرف {index}',
+            employee_code=f'BENCH-U{index}',
+            username=f'bench_users_{index}',
+            password_hash=password_hash
+        )
+        db.session.add(user)
+        db.session.flush()
+
+        regions = [Region(name=f'Region {index}-{r}', owner_user_id=user.id) for r in range(REGIONS_PER_SUPERVISOR)]
+        db.session.add_all(regions)
+        db.session.flush()
+
+        db.session.execute(Branch.__table__.insert(), [
+            {'name': f'Branch {index}-{b}', 'code': f'BENCH-B{index}-{b}', 'governorate': 'القاهرة',
+             'region_id': regions[b % REGIONS_PER_SUPERVISOR].id, 'owner_user_id': user.id}
+            for b in range(branches_per_supervisor)
+        ])
+
+        if index % 100 == 99:
+            db.session.commit()
+    db.session.commit()
+
+    if not User.query.filter_by(username='bench_users_admin').first():
+        db.session.add(User(employee_name='Benchmark Admin', employee_code='BENCH-ADMIN',
+                            username='bench_users_admin', password_hash=password_hash, is_admin=True))
+        db.session.commit()
+
+    print(f"✅ Seeded in {time.perf_counter() - started:.1f}s")
+
+
+def previous_users_payload():
+    """The previous implementation: one region query per user and one branch query per region"""
+    users_data = []
+    for user in User.query.filter_by(is_admin=False).all():
+        regions_data = []
+        for region in Region.query.filter_by(owner_user_id=user.id).all():
+            branches = Branch.query.filter_by(owner_user_id=user.id, region_id=region.id).all()
+            regions_data.append({
+                'id': region.id,
+                'name': region.name,
+                'branches': [{'id': branch.id, 'name': branch.name, 'code': branch.code,
+                              'governorate': branch.governorate} for branch in branches]
+            })
+        users_data.append({
+            'id': user.id,
+            'spvr_name': user.employee_name,
+            'spvr_code': user.employee_code,
+            'username': user.username,
+            'created_at': user.created_at.isoformat(),
+            'regions': regions_data
+        })
+    return users_data
+
+
+def timed_request(client, url):
+    """(response json, query count, milliseconds) of a GET request"""
+    db.session.remove()
+    with QueryCounter() as counter:
+        started = time.perf_counter()
+        response = client.get(url)
+        elapsed = (time.perf_counter() - started) * 1000
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response.get_json(), counter.count, elapsed
+
+
+def main():
+    """Seed the dataset, then measure the endpoint at two sizes and compare query counts"""
+    supervisors = int(sys.argv[1]) if len(sys.argv) > 1 else SUPERVISORS
+    branches_per_supervisor = int(sys.argv[2]) if len(sys.argv) > 2 else BRANCHES_PER_SUPERVISOR
+
+    if not BENCHMARK_DATABASE_URL and os.path.exists(SCRATCH_DATABASE):
+        os.remove(SCRATCH_DATABASE)
+
+    app = create_app()
+    with app.app_context():
+        print("\n" + "="*60)
+        print(f"📊 USERS API BENCHMARK - {db.engine.url.render_as_string(hide_password=True)}")
+        print("="*60)
+
+        db.create_all()
+        if db.session.query(db.func.count(User.id)).scalar():
+            print("❌ The user table already has rows: run the benchmark on an empty scratch database")
+            sys.exit(1)
+
+        small = max(1, supervisors // 10)
+
+        # Measure a tenth of the roster first, then the whole roster, so the
+        # query counts of both sizes can be compared
+        seed(small, branches_per_supervisor)
+        admin = User.query.filter_by(username='bench_users_admin').first()
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['user_id'] = admin.id
+            session['is_admin'] = True
+
+        small_users, small_queries, small_ms = timed_request(client, '/admin/api/users')
+        small_page, small_page_queries, _ = timed_request(client, '/admin/api/users?page=1&limit=50')
+
+        seed(supervisors, branches_per_supervisor)
+        users, queries, elapsed = timed_request(client, '/admin/api/users')
+        page, page_queries, page_ms = timed_request(client, '/admin/api/users?page=2&limit=50')
+        search, search_queries, search_ms = timed_request(client, '/admin/api/users?search=BENCH-U1&page=1')
+
+        db.session.remove()
+        with QueryCounter() as counter:
+            started = time.perf_counter()
+            previous = previous_users_payload()
+            previous_ms = (time.perf_counter() - started) * 1000
+
+        branches = sum(len(region['branches']) for user in users for region in user['regions'])
+        print(f"\n👥 {len(users)} supervisors, {branches} branches")
+        print(f"   previous implementation: {counter.count:6d} queries {previous_ms:9.1f} ms")
+        print(f"   full roster:             {queries:6d} queries {elapsed:9.1f} ms"
+              f"   ({len(small_users)} supervisors: {small_queries} queries, {small_ms:.1f} ms)")
+        print(f"   page of 50:              {page_queries:6d} queries {page_ms:9.1f} ms"
+              f"   ({small_page_queries} queries on the small roster)")
+        print(f"   search, first page:      {search_queries:6d} queries {search_ms:9.1f} ms"
+              f"   ({search['total']} matches)")
+
+        assert users == previous, 'Bulk-loaded payload differs from the previous implementation'
+        assert queries == small_queries, f'Full roster query count grew: {small_queries} -> {queries}'
+        assert page_queries == small_page_queries, f'Page query count grew: {small_page_queries} -> {page_queries}'
+        assert len(page['users']) == min(50, max(0, page['total'] - 50))
+        print("\n✅ Query count is constant and the payload matches the previous implementation")
+        print("="*60)
+
+
+if __name__ == '__main__':
+    main()
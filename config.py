@@ -41,6 +41,44 @@ class Config:
     UPLOAD_FOLDER = os.path.join(basedir, 'uploads')
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'pdf'}
     
+    # Excel Export Settings
+    EXPORT_STREAMING_THRESHOLD = int(os.environ.get('EXPORT_STREAMING_THRESHOLD', 2000))  # Reports above this use the streaming export
+    EXPORT_CHUNK_SIZE = 500  # Reports loaded per chunk by the streaming export
+    EXPORT_JOB_FOLDER = os.path.join(basedir, 'instance', 'exports')  # Background export files
+    EXPORT_JOB_WORKERS = int(os.environ.get('EXPORT_JOB_WORKERS', 2))  # Background export threads per process
+    EXPORT_JOB_TTL = 3600  # Seconds a finished export stays downloadable
+    
+    # Bulk Report Deletion
+    REPORT_DELETE_CHUNK_SIZE = 500  # Reports deleted per transaction
+    REPORT_DELETE_SYNC_LIMIT = int(os.environ.get('REPORT_DELETE_SYNC_LIMIT', 5000))  # Larger deletions run as background jobs
+    
+    # Result Cache Settings (admin listings)
+    RESULT_CACHE_ENABLED = os.environ.get('RESULT_CACHE_ENABLED', 'true').lower() == 'true'
+    RESULT_CACHE_TTL = int(os.environ.get('RESULT_CACHE_TTL', 60))  # Seconds a cached page is served
+    RESULT_CACHE_MAX_ENTRIES = 256  # Pages kept by the in-process cache
+    RESULT_CACHE_BACKEND = os.environ.get('RESULT_CACHE_BACKEND')  # Optional shared backend as 'module:ClassName'
+    
+    # Dashboard Counters
+    DASHBOARD_COUNTERS_RECONCILE_INTERVAL = int(os.environ.get('DASHBOARD_COUNTERS_RECONCILE_INTERVAL', 600))  # Seconds between full recounts
+    
+    # Notification Streams (server-sent events)
+    NOTIFICATION_STREAM_ENABLED = os.environ.get('NOTIFICATION_STREAM_ENABLED', 'true').lower() == 'true'
+    NOTIFICATION_STREAM_MAX_CLIENTS = int(os.environ.get('NOTIFICATION_STREAM_MAX_CLIENTS', 24))  # Open streams per process, each holds a thread
+    NOTIFICATION_STREAM_TIMEOUT = 300  # Seconds before a stream closes and the browser reconnects
+    NOTIFICATION_STREAM_HEARTBEAT = 20  # Seconds between keep-alive comments
+    NOTIFICATION_RELAY_INTERVAL = float(os.environ.get('NOTIFICATION_RELAY_INTERVAL', 1.0))  # Seconds between relay passes
+    
+    # Notification Dispatcher (comment and status change notifications)
+    NOTIFICATION_DISPATCH_INTERVAL = float(os.environ.get('NOTIFICATION_DISPATCH_INTERVAL', 0.5))  # Seconds events are coalesced before a bulk insert
+    NOTIFICATION_DISPATCH_RETRIES = 3  # Attempts per batch before it is dropped
+    NOTIFICATION_DISPATCH_MAX_PENDING = 10000  # Queued events per process; further events are dropped
+    
+    # Data Retention (see archive_old_records.py)
+    NOTIFICATION_RETENTION_DAYS = int(os.environ.get('NOTIFICATION_RETENTION_DAYS', 90))  # Read notifications kept in the database
+    AUDIT_LOG_RETENTION_DAYS = int(os.environ.get('AUDIT_LOG_RETENTION_DAYS', 365))  # Audit log rows kept in the database
+    ARCHIVE_FOLDER = os.environ.get('ARCHIVE_FOLDER', os.path.join(basedir, 'instance', 'archive'))  # Monthly .jsonl.gz archives
+    ARCHIVE_BATCH_SIZE = 1000  # Rows archived per transaction
+    
     # Rate Limiting
     RATELIMIT_ENABLED = True
     RATELIMIT_STORAGE_URL = 'memory://'
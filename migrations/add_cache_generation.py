@@ -0,0 +1,45 @@
+"""
+Migration script to add the cache generation counters of the result cache
+Run this script before deploying the result cache: every report or comment
+write bumps a row of this table
+"""
+
+from app import create_app, db
+from app.models import CacheGeneration
+from app.cache import REPORTS_NAMESPACE
+
+def upgrade():
+    """Create the cache_generation table and seed the reports generation"""
+    app = create_app()
+    
+    with app.app_context():
+        print("🔄 Starting database migration...")
+        
+        from sqlalchemy import inspect
+        inspector = inspect(db.engine)
+        
+        if 'cache_generation' in inspector.get_table_names():
+            print("✅ Table 'cache_generation' already exists")
+        else:
+            try:
+                CacheGeneration.__table__.create(db.engine)
+                print("✅ Created table: CacheGeneration")
+            except Exception as e:
+                print(f"❌ Error creating table 'cache_generation': {e}")
+                return
+        
+        try:
+            if db.session.get(CacheGeneration, REPORTS_NAMESPACE) is None:
+                db.session.add(CacheGeneration(name=REPORTS_NAMESPACE, value=0))
+                db.session.commit()
+                print(f"✅ Seeded generation '{REPORTS_NAMESPACE}'")
+            else:
+                print(f"✅ Generation '{REPORTS_NAMESPACE}' already exists")
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error seeding generation '{REPORTS_NAMESPACE}': {e}")
+        
+        print("✅ Migration completed!")
+
+if __name__ == '__main__':
+    upgrade()
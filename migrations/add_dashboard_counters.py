@@ -0,0 +1,36 @@
+"""
+Migration script to add the precomputed dashboard counters
+Run this script to create the counters table and count the existing data
+"""
+
+from app import create_app, db
+from app.models import DashboardCounter
+from app.counters import refresh_counters
+
+def upgrade():
+    """Create the counters table and fill it from the source tables"""
+    app = create_app()
+    
+    with app.app_context():
+        print("🔄 Starting database migration...")
+        
+        # Create the counters table if it doesn't exist
+        db.create_all()
+        print("✅ Created table: DashboardCounter")
+        
+        try:
+            print("⏳ Counting users, reports, branches and regions...")
+            refresh_counters()
+            db.session.commit()
+            for counter in DashboardCounter.query.order_by(DashboardCounter.name).all():
+                print(f"   {counter.name}: {counter.value}")
+            print("✅ Dashboard counters are up to date")
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error counting dashboard totals: {e}")
+        
+        print("✅ Migration completed!")
+        print("\n📝 Counters are recounted automatically every DASHBOARD_COUNTERS_RECONCILE_INTERVAL seconds")
+
+if __name__ == '__main__':
+    upgrade()
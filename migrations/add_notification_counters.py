@@ -0,0 +1,45 @@
+"""
+Migration script to add the unread notification and unread report counters
+Run this script to create the counters table and count the existing unread rows
+"""
+
+from app import create_app, db
+from app.models import User, NotificationCounter
+from app.counters import refresh_counters, refresh_unread_notifications, get_counter, UNREAD_REPORTS
+
+BATCH_SIZE = 500
+
+def upgrade():
+    """Create the counters table and fill it from the notifications and reports"""
+    app = create_app()
+    
+    with app.app_context():
+        print("🔄 Starting database migration...")
+        
+        # Create the counters table if it doesn't exist
+        db.create_all()
+        print("✅ Created table: NotificationCounter")
+        
+        try:
+            print("⏳ Counting unread notifications per user...")
+            user_ids = [row[0] for row in db.session.query(User.id).order_by(User.id).all()]
+            for start in range(0, len(user_ids), BATCH_SIZE):
+                refresh_unread_notifications(user_ids[start:start + BATCH_SIZE])
+                db.session.commit()
+            print(f"   {NotificationCounter.query.count()} users, "
+                  f"{db.session.query(db.func.sum(NotificationCounter.value)).scalar() or 0} unread notifications")
+            
+            print("⏳ Counting unread reports...")
+            refresh_counters([UNREAD_REPORTS])
+            db.session.commit()
+            print(f"   {UNREAD_REPORTS}: {get_counter(UNREAD_REPORTS)}")
+            print("✅ Unread counters are up to date")
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error counting unread rows: {e}")
+        
+        print("✅ Migration completed!")
+        print("\n📝 Counters are recounted automatically every DASHBOARD_COUNTERS_RECONCILE_INTERVAL seconds")
+
+if __name__ == '__main__':
+    upgrade()
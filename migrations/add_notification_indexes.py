@@ -0,0 +1,50 @@
+"""
+Migration script to add indexes on the Notification table for the per-user lookups
+Run this script to update your database schema
+"""
+
+from app import create_app, db
+from app.models import Notification
+
+def upgrade():
+    """Create the Notification indexes that do not exist yet"""
+    app = create_app()
+
+    with app.app_context():
+        print("🔄 Starting database migration...")
+
+        from sqlalchemy import inspect
+        inspector = inspect(db.engine)
+        existing = {index['name'] for index in inspector.get_indexes('notification')}
+
+        for index in Notification.__table__.indexes:
+            if index.name in existing:
+                print(f"✅ Index '{index.name}' already exists")
+                continue
+
+            try:
+                columns = ', '.join(column.name for column in index.columns)
+                print(f"⏳ Creating index '{index.name}' on notification ({columns})...")
+                index.create(db.engine)
+                print(f"✅ Created index '{index.name}'")
+            except Exception as e:
+                print(f"❌ Error creating index '{index.name}': {e}")
+
+        print("✅ Migration completed!")
+
+def downgrade():
+    """Drop the Notification indexes added by upgrade()"""
+    app = create_app()
+
+    with app.app_context():
+        from sqlalchemy import inspect
+        inspector = inspect(db.engine)
+        existing = {index['name'] for index in inspector.get_indexes('notification')}
+
+        for index in Notification.__table__.indexes:
+            if index.name in existing:
+                index.drop(db.engine)
+                print(f"🗑️ Dropped index '{index.name}'")
+
+if __name__ == '__main__':
+    upgrade()
@@ -0,0 +1,59 @@
+"""
+Migration script to add the idempotency key of report submissions
+Run this script to update your database schema
+"""
+
+from app import create_app, db
+from app.models import Report
+
+def upgrade():
+    """Add the idempotency_key column and its unique index to the Report table"""
+    app = create_app()
+    
+    with app.app_context():
+        print("🔄 Starting database migration...")
+        
+        from sqlalchemy import inspect, text
+        inspector = inspect(db.engine)
+        columns = [col['name'] for col in inspector.get_columns('report')]
+        
+        if 'idempotency_key' in columns:
+            print("✅ Column 'idempotency_key' already exists")
+        else:
+            try:
+                with db.engine.begin() as conn:
+                    conn.execute(text("ALTER TABLE report ADD COLUMN idempotency_key VARCHAR(64)"))
+                print("✅ Added column 'idempotency_key'")
+            except Exception as e:
+                print(f"❌ Error adding column 'idempotency_key': {e}")
+                print("   Please add manually: ALTER TABLE report ADD COLUMN idempotency_key VARCHAR(64);")
+                return
+        
+        existing = {index['name'] for index in inspect(db.engine).get_indexes('report')}
+        index = next(index for index in Report.__table__.indexes if index.name == 'ux_report_user_idempotency_key')
+        if index.name in existing:
+            print(f"✅ Index '{index.name}' already exists")
+        else:
+            try:
+                index.create(db.engine)
+                print(f"✅ Created unique index '{index.name}' on report (user_id, idempotency_key)")
+            except Exception as e:
+                print(f"❌ Error creating index '{index.name}': {e}")
+        
+        print("✅ Migration completed!")
+        print("\n📝 Existing reports keep an empty key; only new submissions are deduplicated")
+
+def downgrade():
+    """Drop the unique index added by upgrade() (the column is left in place)"""
+    app = create_app()
+    
+    with app.app_context():
+        from sqlalchemy import inspect
+        existing = {index['name'] for index in inspect(db.engine).get_indexes('report')}
+        index = next(index for index in Report.__table__.indexes if index.name == 'ux_report_user_idempotency_key')
+        if index.name in existing:
+            index.drop(db.engine)
+            print(f"🗑️ Dropped index '{index.name}'")
+
+if __name__ == '__main__':
+    upgrade()
@@ -0,0 +1,63 @@
+"""
+Migration script to add indexes on the Report table for the hot filter/sort paths
+Run this script to update your database schema
+"""
+
+from app import create_app, db
+from app.models import Report
+
+# The indexes owned by this migration; other Report indexes, such as the
+# unique idempotency key, belong to their own migrations
+REPORT_INDEXES = (
+    'ix_report_user_id_report_date',
+    'ix_report_report_date',
+    'ix_report_created_at_id',
+    'ix_report_user_id_created_at_id',
+    'ix_report_status_is_read',
+)
+
+def _indexes():
+    return [index for index in Report.__table__.indexes if index.name in REPORT_INDEXES]
+
+def upgrade():
+    """Create the Report indexes that do not exist yet"""
+    app = create_app()
+
+    with app.app_context():
+        print("🔄 Starting database migration...")
+
+        from sqlalchemy import inspect
+        inspector = inspect(db.engine)
+        existing = {index['name'] for index in inspector.get_indexes('report')}
+
+        for index in _indexes():
+            if index.name in existing:
+                print(f"✅ Index '{index.name}' already exists")
+                continue
+
+            try:
+                columns = ', '.join(column.name for column in index.columns)
+                print(f"⏳ Creating index '{index.name}' on report ({columns})...")
+                index.create(db.engine)
+                print(f"✅ Created index '{index.name}'")
+            except Exception as e:
+                print(f"❌ Error creating index '{index.name}': {e}")
+
+        print("✅ Migration completed!")
+
+def downgrade():
+    """Drop the Report indexes added by upgrade()"""
+    app = create_app()
+
+    with app.app_context():
+        from sqlalchemy import inspect
+        inspector = inspect(db.engine)
+        existing = {index['name'] for index in inspector.get_indexes('report')}
+
+        for index in _indexes():
+            if index.name in existing:
+                index.drop(db.engine)
+                print(f"🗑️ Dropped index '{index.name}'")
+
+if __name__ == '__main__':
+    upgrade()
@@ -0,0 +1,33 @@
+"""
+Migration script to add the text search index for employee and store names and codes
+Run this script to create the search tables and index the existing users and stores
+"""
+
+from app import create_app, db
+from app.models import SearchEntry, SearchToken
+from app.search import rebuild_search_index
+
+def upgrade():
+    """Create the search tables and build the index"""
+    app = create_app()
+    
+    with app.app_context():
+        print("🔄 Starting database migration...")
+        
+        # Create the search tables if they don't exist
+        db.create_all()
+        print("✅ Created tables: SearchEntry, SearchToken")
+        
+        try:
+            print("⏳ Indexing users and stores...")
+            indexed = rebuild_search_index()
+            print(f"✅ Indexed {indexed} values")
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error building the search index: {e}")
+        
+        print("✅ Migration completed!")
+        print("\n📝 Run this script again to rebuild the index after bulk imports that bypass the app")
+
+if __name__ == '__main__':
+    upgrade()
@@ -0,0 +1,55 @@
+"""
+Shared pytest fixtures: the app runs against a scratch SQLite file
+"""
+
+import os
+import tempfile
+
+import pytest
+
+_db_dir = tempfile.mkdtemp(prefix='drs-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ['RESULT_CACHE_ENABLED'] = 'false'  # Every request must reach the database
+
+from sqlalchemy import event
+
+from app import create_app, db
+
+
+@pytest.fixture
+def app():
+    """The app with empty tables; requests run in their own app context, as in production"""
+    app = create_app()
+    app.config['TESTING'] = True
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+class QueryCounter:
+    """Count the statements sent to the database"""
+
+    def __init__(self, app):
+        with app.app_context():
+            self.engine = db.engine
+        self.count = 0
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._count)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, 'before_cursor_execute', self._count)
+
+    def _count(self, *args, **kwargs):
+        self.count += 1
+
+
+@pytest.fixture
+def query_counter():
+    return QueryCounter
@@ -0,0 +1,73 @@
+"""
+GET /admin/api/reports must run a fixed number of queries whatever the row count
+"""
+
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import User, Area, Store, Report, ReportComment
+
+# Count query + page query (reports, employees, stores, areas and comment
+# counts in one statement) + two governorate prefetch queries
+REPORTS_API_QUERY_BUDGET = 4
+
+
+def seed_reports(report_count, employees=5, stores=8, areas=3):
+    """Create an admin and report_count reports with comments spread over employees, stores and areas"""
+    admin = User(employee_name='Admin', employee_code='ADMIN', username='admin',
+                 password_hash='x', is_admin=True)
+    db.session.add(admin)
+
+    area_rows = [Area(name=f'Area {i}') for i in range(areas)]
+    db.session.add_all(area_rows)
+    db.session.flush()
+
+    employee_rows = [User(employee_name=f'Employee {i}', employee_code=f'E{i}', username=f'employee{i}',
+                          password_hash='x') for i in range(employees)]
+    store_rows = [Store(name=f'Store {i}', code=f'S{i}', area_id=area_rows[i % areas].id,
+                        governorate='Cairo' if i % 2 else None) for i in range(stores)]
+    db.session.add_all(employee_rows + store_rows)
+    db.session.flush()
+
+    base = datetime(2025, 1, 1)
+    for i in range(report_count):
+        store = store_rows[i % stores]
+        report = Report(user_id=employee_rows[i % employees].id, store_id=store.id, area_id=store.area_id,
+                        report_date=base + timedelta(days=i % 30), created_at=base + timedelta(minutes=i))
+        db.session.add(report)
+        db.session.flush()
+        for c in range(i % 3):
+            db.session.add(ReportComment(report_id=report.id, user_id=admin.id, comment_text=f'Comment {c}'))
+
+    db.session.commit()
+    return admin.id
+
+
+def count_reports_api_queries(app, query_counter, report_count):
+    """Seed a fresh database and count the queries of one GET /admin/api/reports"""
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        admin_id = seed_reports(report_count)
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = admin_id
+        session['is_admin'] = True
+
+    with query_counter(app) as counter:
+        response = client.get('/admin/api/reports')
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['total'] == report_count
+    assert len(data['reports']) == min(report_count, data['limit'])
+    return counter.count
+
+
+def test_reports_api_query_count_does_not_grow_with_rows(app, query_counter):
+    small = count_reports_api_queries(app, query_counter, 10)
+    large = count_reports_api_queries(app, query_counter, 200)
+
+    assert small == large, f'Query count grew with the row count: {small} -> {large}'
+    assert large <= REPORTS_API_QUERY_BUDGET, f'{large} queries, budget is {REPORTS_API_QUERY_BUDGET}'